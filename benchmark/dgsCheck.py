@@ -0,0 +1,144 @@
+"""#################################################################################################
+        Check of the DGS export against the DGS reader and the import via the PowerFactory API
+####################################################################################################"""
+# Usage: python dgsCheck.py <SimBench folder>
+# The compiled DGS model of a folder is written with writeDGS and read back with readDGS: every object must be read
+# with the same attributes (pointers as DGS IDs). The model is then compared with the objects the import via the API
+# created in the in-memory stand-in: the same number of objects of every class and the same attribute values,
+# matched by class and name (cubicles and characteristic references also by the name of their parent).
+import os
+import sys
+import tempfile
+
+BENCHMARKDIR = os.path.dirname(os.path.abspath(__file__))
+CONVERTERDIR = os.path.join(os.path.dirname(BENCHMARKDIR), "simBench2PowerFactory")
+sys.path.insert(0, CONVERTERDIR)
+sys.path.insert(0, BENCHMARKDIR)
+
+import powerfactory as pf
+import DGSExporter as dgs
+
+# classes that only one of the paths creates: the DGS file contains its own grid, the API imports into the existing
+# grid; study cases and graphic objects are not part of a DGS file (DGSImport.py creates the study cases after the
+# import and draws the diagram with the auto-layout)
+DGS_ONLY = ("ElmNet",)
+API_ONLY = ("IntScenario", "IntGrf", "IntGrfcon")
+# prefixes of the classes of the grid data created by the import (the stand-in also contains the project folders)
+GRID_CLASSES = ("Elm", "Typ", "Sta", "Cha")
+# classes whose objects are matched by the name of their parent as well
+PARENT_CLASSES = ("StaCubic", "ChaRef")
+TOLERANCE = 1e-6
+
+
+def _equal(a, b):
+    if a == "":
+        a = None
+    if b == "":
+        b = None
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)) and not isinstance(a, bool):
+        return abs(a - b) <= TOLERANCE
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+# value of a DGS attribute as it is written to the file: objects as their DGS ID
+def _dgsID(value):
+    if isinstance(value, dgs.DGSObject):
+        return value.id
+    if isinstance(value, list):
+        return [_dgsID(item) for item in value]
+    return value
+
+# written and read DGS file: [(class, name, attribute, written value, read value)]
+def roundTrip(model, dgsfile):
+    dgs.writeDGS(model, dgsfile)
+    tables = dgs.readDGS(dgsfile)
+    differences = []
+    general = dict((record["Descr"], record["Val"]) for record in tables.pop("General", []))
+    if general.get("Version") != dgs.DGS_VERSION:
+        differences.append(("General", None, "Version", dgs.DGS_VERSION, general.get("Version")))
+    for pfclass in sorted(set(model.tables) | set(tables)):
+        objects = model.objects(pfclass)
+        records = tables.get(pfclass, [])
+        if len(objects) != len(records):
+            differences.append((pfclass, None, "objects", len(objects), len(records)))
+            continue
+        for dgsobject, record in zip(objects, records):
+            if record.get("ID") != dgsobject.id:
+                differences.append((pfclass, dgsobject["loc_name"], "ID", dgsobject.id, record.get("ID")))
+            for attribute, value in dgsobject.attributes.items():
+                if not _equal(_dgsID(value), record.get(attribute)):
+                    differences.append((pfclass, dgsobject["loc_name"], attribute, _dgsID(value),
+                                        record.get(attribute)))
+    return differences
+
+# value of a DGS attribute or of a stand-in attribute with objects replaced by their names
+def _named(value):
+    if isinstance(value, dgs.DGSObject):
+        return value["loc_name"]
+    if isinstance(value, pf.DataObject):
+        return value._attrs.get("loc_name")
+    if isinstance(value, list):
+        return [_named(item) for item in value]
+    return value
+
+def _parentName(parent):
+    return _named(parent) if parent is not None else None
+
+# DGS model against the objects of the stand-in after the import via the API: [(class, name, attribute, DGS value,
+# API value)]
+def compareWithAPI(model, app):
+    differences = []
+    apiclasses = set(name for name in app._objects
+                     if any(name.startswith(prefix.lower()) for prefix in GRID_CLASSES))
+    pfclasses = sorted((set(model.tables) | set(obj._class for name in apiclasses for obj in app.objects(name)))
+                       - set(DGS_ONLY) - set(API_ONLY))
+    for pfclass in pfclasses:
+        apiobjects = [obj for obj in app.objects(pfclass) if not obj._deleted]
+        dgsobjects = model.objects(pfclass)
+        if len(apiobjects) != len(dgsobjects):
+            differences.append((pfclass, None, "objects", len(dgsobjects), len(apiobjects)))
+        byname = {}
+        for obj in apiobjects:
+            parent = _parentName(obj._parent) if pfclass in PARENT_CLASSES else None
+            byname[(obj._attrs.get("loc_name"), parent)] = obj
+        for dgsobject in dgsobjects:
+            parent = _parentName(dgsobject.get("fold_id")) if pfclass in PARENT_CLASSES else None
+            obj = byname.get((dgsobject["loc_name"], parent))
+            if obj is None:
+                differences.append((pfclass, dgsobject["loc_name"], "missing in the API import", None, None))
+                continue
+            for attribute, value in dgsobject.attributes.items():
+                if attribute == "fold_id":
+                    continue
+                if not _equal(_named(value), _named(obj._read(attribute))):
+                    differences.append((pfclass, dgsobject["loc_name"], attribute, _named(value),
+                                        _named(obj._read(attribute))))
+    return differences
+
+# both checks for a SimBench folder, "app" is the stand-in after the import of the folder via the API
+def checkFolder(folder, app):
+    model = dgs.compileDGS(folder)
+    handle, dgsfile = tempfile.mkstemp(suffix=".dgs")
+    os.close(handle)
+    try:
+        roundtrip = roundTrip(model, dgsfile)
+    finally:
+        os.remove(dgsfile)
+    return {"roundTrip": roundtrip, "api": compareWithAPI(model, app)}
+
+def printDifferences(name, result, limit = 20):
+    for check in ("roundTrip", "api"):
+        differences = result[check]
+        print("{0} DGS {1}: {2} difference(s)".format(name, check, len(differences)))
+        for pfclass, objname, attribute, dgsvalue, other in differences[:limit]:
+            print("  {0} {1} {2}: {3!r} != {4!r}".format(pfclass, objname or "", attribute, dgsvalue, other))
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python dgsCheck.py <SimBench folder>")
+        sys.exit(1)
+    import runBenchmark
+    result = checkFolder(sys.argv[1], runBenchmark.runImport(sys.argv[1])["app"])
+    printDifferences(sys.argv[1], result)
+    sys.exit(1 if result["roundTrip"] or result["api"] else 0)
@@ -0,0 +1,368 @@
+"""#################################################################################################
+        In-memory stand-in for the PowerFactory Python API ("import powerfactory as pf")
+####################################################################################################"""
+# Implements the part of the API used by the converter scripts, so they can run (and be benchmarked) without
+# PowerFactory. Every call into the API is counted. Output lines of the form "=======START <stage>=======" split
+# the counters into stages.
+import time
+import fnmatch
+from collections import Counter, OrderedDict
+
+# connection attributes of branch and shunt elements, setting them connects the element to a cubicle
+CONNECTION_ATTRIBUTES = ("bus1", "bus2", "bushv", "buslv")
+
+# values of attributes that have not been set (PowerFactory returns the default value of the attribute)
+DEFAULT_VALUES = {"iUsage": 0, "uline": 0.0, "uknom": 0.0, "vtarget": 1.0, "outserv": 0, "desc": [], "cCategory": "",
+                  "av_mode": "", "bustp": "", "plini": 0.0, "qlini": 0.0, "pgini": 0.0, "qgini": 0.0, "usetp": 1.0,
+                  "on_off": 1}
+
+_application = None
+
+def GetApplication():
+    return _application
+
+# create a new (empty) PowerFactory application; "scriptparameters" are the input parameters of the ComPython object
+def resetApplication(**scriptparameters):
+    global _application
+    _application = Application(scriptparameters)
+    return _application
+
+def _splitPattern(pattern):
+    if "." in pattern:
+        name, pfclass = pattern.rsplit(".", 1)
+    else:
+        name, pfclass = pattern, "*"
+    return (name or "*").lower(), (pfclass or "*").lower()
+
+def _matches(obj, namepattern, classpattern):
+    return fnmatch.fnmatchcase(obj._class.lower(), classpattern) and \
+           (namepattern == "*" or fnmatch.fnmatchcase(str(obj._attrs.get("loc_name")).lower(), namepattern))
+
+
+class DataObject(object):
+    def __init__(self, app, pfclass, name, parent):
+        d = self.__dict__
+        d["_app"] = app
+        d["_class"] = pfclass
+        d["_parent"] = parent
+        d["_children"] = []
+        d["_names"] = Counter()     # (class, loc_name) of the children, for renaming duplicates
+        d["_attrs"] = {"loc_name": name}
+        d["_deleted"] = False
+
+    # --- attribute access: every read and write of a PowerFactory attribute is an API call
+    def __getattr__(self, attribute):
+        if attribute.startswith("__"):
+            raise AttributeError(attribute)
+        self._app._count("GetAttribute")
+        return self._read(attribute)
+
+    def __setattr__(self, attribute, value):
+        self._app._count("SetAttribute")
+        self._write(attribute, value)
+
+    def _read(self, attribute):
+        if attribute == "cpSubstat":
+            parent = self._parent
+            return parent if parent is not None and parent._class == "ElmSubstat" else None
+        if attribute in self._attrs:
+            return self._attrs[attribute]
+        return DEFAULT_VALUES.get(attribute)
+
+    def _write(self, attribute, value):
+        scenario = self._app._scenario
+        if scenario is not None and attribute != "loc_name" and self._class.startswith("Elm"):
+            scenario._record(self, attribute)
+        if attribute == "loc_name" and self._parent is not None:
+            self._parent._names[(self._class, self._attrs.get("loc_name"))] -= 1
+            self._parent._names[(self._class, value)] += 1
+        if attribute in CONNECTION_ATTRIBUTES:
+            old = self._attrs.get(attribute)
+            if old is not None and old._attrs.get("obj_id") is self:
+                old._attrs["obj_id"] = None
+            if value is not None:
+                value._attrs["obj_id"] = self
+        self._attrs[attribute] = value
+
+    def GetAttribute(self, attribute):
+        self._app._count("GetAttribute")
+        return self._read(attribute)
+
+    def SetAttribute(self, attribute, value):
+        self._app._count("SetAttribute")
+        self._write(attribute, value)
+
+    # --- object tree
+    def CreateObject(self, pfclass, name = None):
+        self._app._count("CreateObject")
+        if name is not None:
+            # PowerFactory renames new objects if an object with the same name and class exists in the folder
+            if self._names[(pfclass, name)] > 0:
+                index = 1
+                while self._names[(pfclass, "{0}({1})".format(name, index))] > 0:
+                    index += 1
+                name = "{0}({1})".format(name, index)
+        newobject = _CLASSES.get(pfclass, DataObject)(self._app, pfclass, name, self)
+        self._children.append(newobject)
+        self._names[(pfclass, name)] += 1
+        self._app._register(newobject)
+        return newobject
+
+    def GetContents(self, pattern = "*", recursive = 0):
+        self._app._count("GetContents")
+        namepattern, classpattern = _splitPattern(pattern)
+        result = []
+        stack = list(reversed(self._children))
+        while stack:
+            child = stack.pop()
+            if _matches(child, namepattern, classpattern):
+                result.append(child)
+            if recursive:
+                stack.extend(reversed(child._children))
+        return result
+
+    def GetParent(self):
+        self._app._count("GetParent")
+        return self._parent
+
+    def GetClassName(self):
+        self._app._count("GetClassName")
+        return self._class
+
+    def GetFullName(self):
+        self._app._count("GetFullName")
+        names = []
+        obj = self
+        while obj is not None:
+            names.append("{0}.{1}".format(obj._attrs.get("loc_name"), obj._class))
+            obj = obj._parent
+        return "\\".join(reversed(names))
+
+    def Delete(self):
+        self._app._count("Delete")
+        stack = list(self._children)
+        while stack:
+            child = stack.pop()
+            stack.extend(child._children)
+            self._app._unregister(child)
+            child.__dict__["_deleted"] = True
+        if self._parent is not None:
+            self._parent._children.remove(self)
+            self._parent._names[(self._class, self._attrs.get("loc_name"))] -= 1
+        self._app._unregister(self)
+        self.__dict__["_deleted"] = True
+        return 0
+
+    def IsDeleted(self):
+        self._app._count("IsDeleted")
+        return self._deleted
+
+    def Execute(self):
+        self._app._count("Execute")
+        return 0
+
+    def __repr__(self):
+        return "<{0} {1}>".format(self._class, self._attrs.get("loc_name"))
+
+
+class IntCase(DataObject):
+    def SetStudyTime(self, seconds):
+        self._app._count("SetStudyTime")
+        self._attrs["iStudyTime"] = seconds
+
+
+# Operation scenario: while it is active, all changed attributes of network elements are stored in the scenario,
+# deactivating it restores the values the elements had before
+class IntScenario(DataObject):
+    def __init__(self, app, pfclass, name, parent):
+        DataObject.__init__(self, app, pfclass, name, parent)
+        self.__dict__["_base"] = OrderedDict()    # (object, attribute) -> value before activation
+        self.__dict__["_values"] = OrderedDict()  # (object, attribute) -> value of the scenario
+
+    def _record(self, obj, attribute):
+        key = (obj, attribute)
+        if key not in self._base:
+            self._base[key] = obj._attrs.get(attribute, DEFAULT_VALUES.get(attribute))
+
+    def Activate(self):
+        self._app._count("Activate")
+        if self._app._scenario is not None:
+            self._app._scenario._deactivate()
+        for (obj, attribute), value in self._values.items():
+            self._record(obj, attribute)
+            obj._attrs[attribute] = value
+        self._app.__dict__["_scenario"] = self
+        return 0
+
+    def Save(self):
+        self._app._count("Save")
+        for obj, attribute in self._base:
+            self._values[(obj, attribute)] = obj._attrs.get(attribute)
+        return 0
+
+    def _deactivate(self):
+        for (obj, attribute), value in self._base.items():
+            obj._attrs[attribute] = value
+        self._base.clear()
+        self._app.__dict__["_scenario"] = None
+
+    def Deactivate(self):
+        self._app._count("Deactivate")
+        if self._app._scenario is self:
+            self._deactivate()
+        return 0
+
+    def scenarioValues(self):
+        return dict(((obj._attrs.get("loc_name"), attribute), value) for (obj, attribute), value in self._values.items())
+
+
+_CLASSES = {"IntCase": IntCase, "IntScenario": IntScenario}
+
+
+class Application(object):
+    def __init__(self, scriptparameters):
+        self._scenario = None
+        self.output = []                    # (message type, text) of all messages printed to the output window
+        self.stages = OrderedDict()         # stage -> {"time": s, "calls": Counter, "created": Counter}
+        self._objects = {}                  # lowercase class name -> OrderedDict of objects (id -> object)
+        self._stage = None
+        self._stageStart = time.perf_counter()
+        self._calls = Counter()
+        self._created = Counter()
+        self._startStage("setup")
+        # project structure
+        self.user = DataObject(self, "IntUser", "benchmark", None)
+        self.project = self.user.CreateObject("IntPrj", "SimBench")
+        netmod = self.project.CreateObject("IntPrjfolder", "Network Model")
+        self.netdat = netmod.CreateObject("IntPrjfolder", "Network Data")
+        self.netdat.CreateObject("ElmNet", "Summary Grid")
+        self.netdat.CreateObject("ElmNet", "Grid")
+        self.diagram = netmod.CreateObject("IntPrjfolder", "Diagrams").CreateObject("IntGrfnet", "Grid")
+        self.dataFolders = {}
+        for pfclass, foldername in (("ElmArea", "Areas"), ("ElmZone", "Zones"), ("ElmFeeder", "Feeders")):
+            self.dataFolders[pfclass] = self.netdat.CreateObject("IntFolder", foldername)
+        library = self.project.CreateObject("IntPrjfolder", "Library")
+        self.projectFolders = {"equip": library.CreateObject("IntPrjfolder", "Equipment Type Library"),
+                               "chars": library.CreateObject("IntPrjfolder", "Characteristics"),
+                               "scen": netmod.CreateObject("IntPrjfolder", "Operation Scenarios"),
+                               "study": self.project.CreateObject("IntPrjfolder", "Study Cases")}
+        self.studycase = self.projectFolders["study"].CreateObject("IntCase", "Study Case")
+        self.script = self.projectFolders["study"].CreateObject("ComPython", "SimBench2PowerFactory")
+        for name, value in scriptparameters.items():
+            self.script._attrs[name] = value
+        self._calls.clear()
+        self._created.clear()
+
+    # --- bookkeeping
+    def _count(self, call):
+        self._calls[call] += 1
+
+    def _register(self, obj):
+        self._objects.setdefault(obj._class.lower(), OrderedDict())[id(obj)] = obj
+        self._created[obj._class] += 1
+
+    def _unregister(self, obj):
+        self._objects.get(obj._class.lower(), {}).pop(id(obj), None)
+
+    def _startStage(self, stage):
+        now = time.perf_counter()
+        if self._stage is not None:
+            record = self.stages.setdefault(self._stage, {"time": 0.0, "calls": Counter(), "created": Counter()})
+            record["time"] += now - self._stageStart
+            record["calls"].update(self._calls)
+            record["created"].update(self._created)
+        self._calls = Counter()
+        self._created = Counter()
+        self._stage = stage
+        self._stageStart = now
+
+    # closes the current stage, the results are in self.stages
+    def finish(self):
+        self._startStage(None)
+        return self.stages
+
+    def _print(self, kind, text):
+        self.output.append((kind, text))
+        # the converter prints "=======START <stage>=======" and "=======FINISHED <stage>=======" banners
+        banner = str(text).strip().strip("=")
+        if str(text).startswith("=======") and banner.startswith("START "):
+            self._startStage(banner[len("START "):].strip().lower())
+        elif str(text).startswith("=======") and banner.split(" ", 1)[0] in ("FINISHED", "END"):
+            self._startStage("after " + banner.split(" ", 1)[1].strip().lower())
+
+    def objects(self, pfclass):
+        return list(self._objects.get(pfclass.lower(), {}).values())
+
+    # --- PowerFactory API
+    def GetCurrentUser(self):
+        self._count("GetCurrentUser")
+        return self.user
+
+    def GetActiveProject(self):
+        self._count("GetActiveProject")
+        return self.project
+
+    def GetCurrentScript(self):
+        self._count("GetCurrentScript")
+        return self.script
+
+    def GetActiveStudyCase(self):
+        self._count("GetActiveStudyCase")
+        return self.studycase
+
+    def GetFromStudyCase(self, pfclass):
+        self._count("GetFromStudyCase")
+        found = [child for child in self.studycase._children if child._class == pfclass]
+        if found:
+            return found[0]
+        # PowerFactory creates missing commands in the study case
+        newcommand = _CLASSES.get(pfclass, DataObject)(self, pfclass, pfclass, self.studycase)
+        self.studycase._children.append(newcommand)
+        self._register(newcommand)
+        return newcommand
+
+    def GetCurrentDiagram(self):
+        self._count("GetCurrentDiagram")
+        return self.diagram
+
+    def GetDataFolder(self, pfclass, create = 0):
+        self._count("GetDataFolder")
+        return self.dataFolders.get(pfclass)
+
+    def GetProjectFolder(self, foldertype):
+        self._count("GetProjectFolder")
+        return self.projectFolders.get(foldertype)
+
+    def GetCalcRelevantObjects(self, pattern = "*", includeOutOfService = 1):
+        self._count("GetCalcRelevantObjects")
+        namepattern, classpattern = _splitPattern(pattern)
+        result = []
+        for pfclass, objects in self._objects.items():
+            if fnmatch.fnmatchcase(pfclass, classpattern):
+                result.extend(obj for obj in objects.values() if _matches(obj, namepattern, "*"))
+        return result
+
+    def ClearOutputWindow(self):
+        self._count("ClearOutputWindow")
+
+    def EchoOff(self):
+        self._count("EchoOff")
+
+    def EchoOn(self):
+        self._count("EchoOn")
+
+    def PrintPlain(self, text):
+        self._count("PrintPlain")
+        self._print("plain", text)
+
+    def PrintInfo(self, text):
+        self._count("PrintInfo")
+        self._print("info", text)
+
+    def PrintWarn(self, text):
+        self._count("PrintWarn")
+        self._print("warn", text)
+
+    def PrintError(self, text):
+        self._count("PrintError")
+        self._print("error", text)
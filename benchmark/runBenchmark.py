@@ -0,0 +1,134 @@
+"""#################################################################################################
+    Benchmark of the SimBench to PowerFactory converter, using the in-memory PowerFactory stand-in
+####################################################################################################"""
+# Usage: python runBenchmark.py [lv mv hv ehv] [--script SimBench2PowerFactory.py] [--json report.json]
+#                               [--folder <SimBench folder>] [--keep] [--budget budget.json] [--writes] [--dgs]
+# Runs the complete import for synthetic SimBench-shaped data sets (or a real SimBench folder) and reports wall time,
+# API calls and created objects per stage and the attribute write calls per created object of every PowerFactory
+# class, checked against the write budget (see AttributeWriter.py). With --dgs the DGS export of every data set is
+# checked as well (see dgsCheck.py).
+import os
+import sys
+import json
+import time
+import runpy
+import shutil
+import argparse
+import tempfile
+from collections import Counter
+
+BENCHMARKDIR = os.path.dirname(os.path.abspath(__file__))
+CONVERTERDIR = os.path.join(os.path.dirname(BENCHMARKDIR), "simBench2PowerFactory")
+# the stand-in must be found before a real PowerFactory installation
+sys.path.insert(0, CONVERTERDIR)
+sys.path.insert(0, BENCHMARKDIR)
+
+import powerfactory as pf
+import syntheticGrid
+import dgsCheck
+import PFObjectCreator as pfoc
+
+# run one converter script for the SimBench data set in "folder", returns the stage records of the stand-in
+def runImport(folder, script = "SimBench2PowerFactory.py", **scriptparameters):
+    app = pf.resetApplication(folder=folder, **scriptparameters)
+    start = time.perf_counter()
+    runpy.run_path(os.path.join(CONVERTERDIR, script), run_name="__main__")
+    walltime = time.perf_counter() - start
+    stages = app.finish()
+    errors = [text for kind, text in app.output if kind == "error"]
+    return {"walltime": walltime, "stages": stages, "errors": errors, "writes": pfoc.writer.rows(), "app": app}
+
+def summarize(result):
+    rows = []
+    for stage, record in result["stages"].items():
+        rows.append({"stage": stage,
+                     "time": record["time"],
+                     "calls": sum(record["calls"].values()),
+                     "created": sum(record["created"].values()),
+                     "callsByType": dict(record["calls"]),
+                     "createdByClass": dict(record["created"])})
+    return rows
+
+def printSummary(name, result):
+    rows = summarize(result)
+    print("\n{0}: {1:.3f} s".format(name, result["walltime"]))
+    print("{0:<40} {1:>10} {2:>12} {3:>10}".format("stage", "time [s]", "API calls", "created"))
+    for row in rows:
+        # skip the gaps between two stages that only contain the banner output
+        if row["time"] >= 0.001 or row["calls"] > 2 or row["created"]:
+            print("{0:<40} {1:>10.4f} {2:>12} {3:>10}".format(row["stage"][:40], row["time"], row["calls"], row["created"]))
+    totalcalls = Counter()
+    for row in rows:
+        totalcalls.update(row["callsByType"])
+    print("{0:<40} {1:>10.4f} {2:>12} {3:>10}".format("total", result["walltime"], sum(totalcalls.values()),
+                                                       sum(row["created"] for row in rows)))
+    print("calls by type: " + ", ".join("{0}={1}".format(k, v) for k, v in totalcalls.most_common()))
+    for row in result["writes"]:
+        if row["overBudget"]:
+            print("OVER BUDGET: {0} {1:.2f} write calls per object, budget {2}".format(
+                row["class"], row["callsPerObject"], row["budget"]))
+    for error in result["errors"]:
+        print("ERROR: " + error)
+
+def printWrites(result):
+    print("{0:<14} {1:>10} {2:>12} {3:>14} {4:>8}".format("class", "objects", "write calls", "calls/object",
+                                                            "budget"))
+    for row in result["writes"]:
+        if row["objects"]:
+            print("{0:<14} {1:>10} {2:>12} {3:>14.2f} {4:>8}".format(row["class"], row["objects"], row["calls"],
+                                                                    row["callsPerObject"], row["budget"] or "-"))
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Benchmark the SimBench to PowerFactory converter without PowerFactory")
+    parser.add_argument("sizes", nargs="*", default=None,
+                        help="sizes of the synthetic data sets ({0}), default: lv mv hv ehv".format(
+                            ", ".join(sorted(syntheticGrid.SIZES))))
+    parser.add_argument("--folder", help="benchmark a SimBench folder instead of synthetic data sets")
+    parser.add_argument("--script", default="SimBench2PowerFactory.py", help="converter script to run")
+    parser.add_argument("--json", help="write the results to this json-file")
+    parser.add_argument("--keep", action="store_true", help="keep the generated synthetic data sets")
+    parser.add_argument("--budget", help="json-file with the write budget {class: write calls per object}, replaces "
+                                         "the budget of the classes it contains")
+    parser.add_argument("--writes", action="store_true", help="print the attribute writes of every class")
+    parser.add_argument("--dgs", action="store_true", help="check the DGS export against the DGS reader and the "
+                                                           "import via the API")
+    args = parser.parse_args(argv)
+    args.sizes = args.sizes or ["lv", "mv", "hv", "ehv"]
+    unknown = [size for size in args.sizes if size not in syntheticGrid.SIZES]
+    if unknown:
+        parser.error("unknown size(s) {0}, choose from {1}".format(", ".join(unknown),
+                                                                  ", ".join(sorted(syntheticGrid.SIZES))))
+    if args.budget:
+        with open(args.budget) as f:
+            pfoc.writer.budget.update(json.load(f))
+
+    datasets = [(args.folder, args.folder)] if args.folder else [(size, None) for size in args.sizes]
+    workdir = tempfile.mkdtemp(prefix="simbench_benchmark_")
+    report = {}
+    try:
+        for name, folder in datasets:
+            if folder is None:
+                folder = syntheticGrid.generateGrid(os.path.join(workdir, name), name)
+            result = runImport(folder, args.script)
+            printSummary(name, result)
+            if args.writes:
+                printWrites(result)
+            report[name] = {"walltime": result["walltime"], "stages": summarize(result), "writes": result["writes"],
+                            "errors": result["errors"]}
+            if args.dgs:
+                dgsresult = dgsCheck.checkFolder(folder, result["app"])
+                dgsCheck.printDifferences(name, dgsresult)
+                report[name]["dgs"] = {check: [list(difference) for difference in differences]
+                                       for check, differences in dgsresult.items()}
+    finally:
+        if args.keep:
+            print("\nsynthetic data sets kept in " + workdir)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    main()
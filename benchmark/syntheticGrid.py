@@ -0,0 +1,174 @@
+"""#################################################################################################
+            Generator for synthetic SimBench-shaped data sets (csv-files) of different sizes
+####################################################################################################"""
+import os
+import csv
+import random
+from datetime import datetime, timedelta
+
+# size presets: stations (substations with a double busbar), feeders per station, nodes per feeder
+SIZES = {
+    "lv":  {"stations": 1,  "feeders": 4, "feedernodes": 25, "powerplants": False, "timesteps": 96},
+    "mv":  {"stations": 2,  "feeders": 8, "feedernodes": 40, "powerplants": False, "timesteps": 96},
+    "hv":  {"stations": 20, "feeders": 6, "feedernodes": 30, "powerplants": False, "timesteps": 96},
+    "ehv": {"stations": 60, "feeders": 6, "feedernodes": 40, "powerplants": True,  "timesteps": 96},
+}
+
+COLUMNS = {
+    "Coordinates": ["id", "x", "y", "subnet", "voltLvl"],
+    "Substation": ["id", "subnet", "voltLvl"],
+    "Node": ["id", "type", "vmSetp", "vaSetp", "vmR", "vmMin", "vmMax", "substation", "coordID", "subnet", "voltLvl"],
+    "Switch": ["id", "nodeA", "nodeB", "type", "cond", "substation", "subnet", "voltLvl"],
+    "LineType": ["id", "r", "x", "b", "iMax", "type"],
+    "DCLineType": ["id", "pDCLine", "relPLosses", "fixPLosses", "pMax", "qMinA", "qMinB", "qMaxA", "qMaxB"],
+    "Line": ["id", "nodeA", "nodeB", "type", "length", "loadingMax", "subnet", "voltLvl"],
+    "Transformertype": ["id", "sR", "vmHV", "vmLV", "va0", "vmImp", "pCu", "pFe", "iNoLoad", "tapable", "tapside",
+                        "dVm", "dVa", "tapNeutr", "tapMin", "tapMax"],
+    "Transformer": ["id", "nodeHV", "nodeLV", "type", "tappos", "autoTap", "autoTapSide", "loadingMax", "substation",
+                    "subnet", "voltLvl"],
+    "Shunt": ["id", "node", "p0", "q0", "vmR", "Step", "subnet", "voltLvl"],
+    "ExternalNet": ["id", "node", "calc_type", "dspf", "pExtNet", "qExtNet", "subnet", "voltLvl"],
+    "Load": ["id", "node", "profile", "pLoad", "qLoad", "sR", "subnet", "voltLvl"],
+    "PowerPlant": ["id", "node", "type", "profile", "calc_type", "dspf", "pPP", "qPP", "sR", "pMin", "pMax", "qMin",
+                   "qMax", "subnet", "voltLvl"],
+    "RES": ["id", "node", "type", "profile", "calc_type", "pRES", "qRES", "sR", "subnet", "voltLvl"],
+    "Storage": ["id", "node", "type", "profile", "pStor", "qStor", "chargeLevel", "sR", "pMin", "pMax", "qMin", "qMax",
+                "subnet", "voltLvl"],
+    "Measurement": ["id", "element1", "element2", "variable", "subnet", "voltLvl"],
+    "StudyCases": ["Study Case", "pload", "qload", "Wind_p", "PV_p", "RES_p", "Slack_vm"],
+}
+
+LOAD_PROFILES = ["H0-A", "H0-B", "G0-A", "G1-A", "L0-A"]
+RES_PROFILES = ["PV1", "PV2", "PV3", "WP1", "WP2", "BM1", "Hydro1"]
+RES_TYPES = {"PV": "PV", "WP": "Wind", "BM": "Biomass", "Hydro": "Hydro"}
+STORAGE_PROFILES = ["Storage_1", "Storage_2"]
+POWERPLANT_PROFILES = ["pp_1", "pp_2", "pp_3"]
+POWERPLANT_TYPES = ["hard coal", "lignite", "nuclear", "gas", "oil"]
+STUDYCASES = [["hL", "1", "1", "0", "0", "0", "1.025"],
+              ["n1", "1", "1", "0", "0", "0", "1.0"],
+              ["hW", "1", "1", "1", "0.8", "1", "1.025"],
+              ["hPV", "0.1", "0.122543", "0.3", "0.95", "0.5", "1.02"],
+              ["lW", "0.1", "0.122543", "1", "0", "0.7", "1.0"],
+              ["lPV", "1", "1", "0", "0.95", "0", "1.0"]]
+
+def _fmt(value):
+    return "{0:.6g}".format(value)
+
+def _writeCSV(folder, name, columns, rows):
+    with open(os.path.join(folder, name + ".csv"), "w", newline="") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(columns)
+        writer.writerows(rows)
+
+def _writeProfile(folder, name, profilenames, timesteps, rnd):
+    start = datetime(2016, 1, 1, 0, 0)
+    with open(os.path.join(folder, name + ".csv"), "w", newline="") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["time"] + profilenames)
+        for step in range(timesteps):
+            time = (start + timedelta(minutes=15*step)).strftime("%d.%m.%Y %H:%M")
+            writer.writerow([time] + [_fmt(rnd.random()) for _ in profilenames])
+
+# Write a synthetic data set in SimBench csv-format into "folder"; "size" is one of SIZES or a dict with the same keys
+def generateGrid(folder, size = "mv", seed = 0):
+    params = SIZES[size] if isinstance(size, str) else size
+    rnd = random.Random(seed)
+    tables = dict((name, []) for name in COLUMNS)
+    T = tables
+    hvnet, mvnet = "HV1", "MV1"
+    T["LineType"].append(["HV_ohl", "0.1188", "0.3822", "2.9", "645", "ohl"])
+    T["LineType"].append(["MV_cable", "0.206", "0.1", "80.1", "319", "cs"])
+    T["LineType"].append(["MV_ohl", "0.3", "0.35", "3.2", "319", "ohl"])
+    T["Transformertype"].append(["HV_MV_40MVA", "40", "110", "20", "150", "12", "0.12", "0.03", "0.04", "1", "HV",
+                                 "1.5", "0", "0", "-9", "9"])
+    for station in range(params["stations"]):
+        sx, sy = 10.0 + station * 0.05, 51.0 + (station % 7) * 0.03
+        coord = "coord_s{0}".format(station)
+        T["Coordinates"].append([coord, _fmt(sx), _fmt(sy), hvnet, "3"])
+        substation = "substation_{0}".format(station)
+        T["Substation"].append([substation, hvnet, "3"])
+        bbA, bbB = "HV1 Bus {0}a".format(station), "HV1 Bus {0}b".format(station)
+        slack = station == 0
+        for bb in (bbA, bbB):
+            T["Node"].append([bb, "double busbar", "1.025" if slack else "NULL", "0" if slack and bb == bbA else "NULL",
+                              "110", "0.9", "1.1", substation, coord, hvnet, "3"])
+        T["Switch"].append(["coupler_{0}".format(station), bbA, bbB, "CB", "1", substation, hvnet, "3"])
+
+        def bay(name):
+            aux = "aux_{0}_{1}".format(station, name)
+            T["Node"].append([aux, "auxiliary", "NULL", "NULL", "110", "0.9", "1.1", substation, coord, hvnet, "3"])
+            T["Switch"].append(["bay_{0}_{1}".format(station, name), bbA, aux, "DS", "1", substation, hvnet, "3"])
+            return aux
+        if slack:
+            T["ExternalNet"].append(["grid_feedin", bbA, "vavm", "1", "0", "0", hvnet, "3"])
+        if station > 0:
+            T["Line"].append(["HV_line_{0}".format(station), "aux_{0}_toNext".format(station - 1), bay("fromPrev"),
+                              "HV_ohl", _fmt(5 + rnd.random() * 20), "100", hvnet, "3"])
+        if station < params["stations"] - 1:
+            bay("toNext")
+        if params["powerplants"]:
+            pp = "pp_{0}".format(station)
+            T["PowerPlant"].append([pp, bbB, POWERPLANT_TYPES[station % len(POWERPLANT_TYPES)],
+                                    POWERPLANT_PROFILES[station % len(POWERPLANT_PROFILES)],
+                                    "pvm" if station % 2 else "pq", "0", "200", "NULL" if station % 3 == 0 else "10",
+                                    "250", "0", "250", "-100", "100", hvnet, "3"])
+        if station % 5 == 0:
+            T["Shunt"].append(["shunt_{0}".format(station), bbB, "0", "-20", "110", "3", hvnet, "3"])
+        # substation transformer to the medium voltage busbar
+        mvbus = "MV1 Bus {0}".format(station)
+        T["Node"].append([mvbus, "busbar", "NULL", "NULL", "20", "0.9", "1.1", substation, coord, mvnet, "5"])
+        T["Transformer"].append(["trafo_{0}".format(station), bay("trafo"), mvbus, "HV_MV_40MVA", "0", "1", "LV", "100",
+                                 substation, mvnet, "4"])
+        T["Measurement"].append(["meas_v_{0}".format(station), mvbus, "NULL", "v", mvnet, "5"])
+        for feeder in range(params["feeders"]):
+            previous = None
+            for index in range(params["feedernodes"]):
+                node = "MV1 Node {0}_{1}_{2}".format(station, feeder, index)
+                ncoord = "coord_{0}_{1}_{2}".format(station, feeder, index)
+                T["Coordinates"].append([ncoord, _fmt(sx + (index + 1) * 0.002),
+                                         _fmt(sy + (feeder - params["feeders"] / 2.0) * 0.004), mvnet, "5"])
+                T["Node"].append([node, "node", "NULL", "NULL", "20", "0.9", "1.1", "NULL", ncoord, mvnet, "5"])
+                if previous is None:
+                    # the first node of a feeder is connected by a load break switch at the busbar
+                    aux = "aux_{0}_{1}".format(station, feeder)
+                    T["Node"].append([aux, "auxiliary", "NULL", "NULL", "20", "0.9", "1.1", "NULL", coord, mvnet, "5"])
+                    T["Switch"].append(["LBS_{0}_{1}".format(station, feeder), mvbus, aux, "LBS",
+                                        "0" if feeder == params["feeders"] - 1 else "1", "NULL", mvnet, "5"])
+                    previous = aux
+                linetype = "MV_cable" if index % 3 else "MV_ohl"
+                line = "MV_line_{0}_{1}_{2}".format(station, feeder, index)
+                T["Line"].append([line, previous, node, linetype, _fmt(0.2 + rnd.random()), "100", mvnet, "5"])
+                profile = LOAD_PROFILES[(feeder + index) % len(LOAD_PROFILES)]
+                T["Load"].append(["load_{0}_{1}_{2}".format(station, feeder, index), node, profile,
+                                  _fmt(0.1 + rnd.random() * 0.5), _fmt(0.02 + rnd.random() * 0.1), "0.7", mvnet, "5"])
+                if index % 4 == 0:
+                    resprofile = RES_PROFILES[(station + feeder + index) % len(RES_PROFILES)]
+                    restype = RES_TYPES[resprofile.rstrip("0123456789")]
+                    p = 0.05 + rnd.random()
+                    T["RES"].append(["res_{0}_{1}_{2}".format(station, feeder, index), node, restype, resprofile,
+                                     "pq", _fmt(p), "0", _fmt(p * 1.1), mvnet, "5"])
+                if index % 17 == 5:
+                    T["Storage"].append(["stor_{0}_{1}_{2}".format(station, feeder, index), node, "Li-Ion",
+                                         STORAGE_PROFILES[index % 2], "0", "0", "0.5", "0.1", "-0.1", "0.1", "-0.05",
+                                         "0.05", mvnet, "5"])
+                if index == 0:
+                    T["Measurement"].append(["meas_p_{0}_{1}".format(station, feeder), node, line, "p", mvnet, "5"])
+                previous = node
+    if params["powerplants"]:
+        T["DCLineType"].append(["dcline_type_1", "300", "1", "2", "400", "-100", "-100", "100", "100"])
+        T["Line"].append(["dcline_1", "HV1 Bus 0b", "HV1 Bus {0}b".format(params["stations"] - 1), "dcline_type_1",
+                          "120", "100", hvnet, "3"])
+    T["StudyCases"].extend(STUDYCASES)
+
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    for name, rows in tables.items():
+        if rows:
+            _writeCSV(folder, name, COLUMNS[name], rows)
+    _writeProfile(folder, "LoadProfile", [p + suffix for p in LOAD_PROFILES for suffix in ("_pload", "_qload")],
+                  params["timesteps"], rnd)
+    _writeProfile(folder, "RESProfile", RES_PROFILES, params["timesteps"], rnd)
+    _writeProfile(folder, "StorageProfile", STORAGE_PROFILES, params["timesteps"], rnd)
+    if params["powerplants"]:
+        _writeProfile(folder, "PowerPlantProfile", POWERPLANT_PROFILES, params["timesteps"], rnd)
+    return folder
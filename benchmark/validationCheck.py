@@ -0,0 +1,97 @@
+"""#################################################################################################
+        Regression cases for invalid csv-files: the import must stop in the validation
+####################################################################################################"""
+# Usage: python validationCheck.py
+# Every case changes cells of a synthetic LV data set with powerplants and a DC line (NULL type parameters, references
+# to missing substations, text in numeric columns, ...).
+# The folder must compile, the validation must report an error in the changed column and the import via the API must
+# stop before any node is created, without leaving the profiler of the report installed.
+import os
+import sys
+import shutil
+import tempfile
+
+BENCHMARKDIR = os.path.dirname(os.path.abspath(__file__))
+CONVERTERDIR = os.path.join(os.path.dirname(BENCHMARKDIR), "simBench2PowerFactory")
+sys.path.insert(0, CONVERTERDIR)
+sys.path.insert(0, BENCHMARKDIR)
+
+import powerfactory as pf
+import syntheticGrid
+import runBenchmark
+import CompiledModel as cm
+import Validation as val
+
+# (name, [(table, column, value of the first row)]); every changed column must be reported as error
+CASES = [
+    ("NULL line type parameter", [("LineType", "iMax", "NULL")]),
+    ("NULL transformer type parameters", [("Transformertype", "va0", "NULL"), ("Transformertype", "sR", "NULL")]),
+    ("NULL rated voltage of a node", [("Node", "vmR", "NULL")]),
+    ("missing substation of a node", [("Node", "substation", "missing_substation")]),
+    ("missing substation of a transformer", [("Transformer", "substation", "missing_substation")]),
+    ("NULL voltage limits of a node", [("Node", "vmMin", "NULL"), ("Node", "vmMax", "NULL")]),
+    ("NULL power limits of a storage", [("Storage", "pMin", "NULL"), ("Storage", "qMax", "NULL")]),
+    ("NULL power limits of a powerplant", [("PowerPlant", "pMax", "NULL"), ("PowerPlant", "qMin", "NULL")]),
+    ("NULL tap range of a tapable transformer type", [("Transformertype", "tapMin", "NULL")]),
+    ("NULL automatic tap changer of a transformer", [("Transformer", "autoTap", "NULL")]),
+    ("AC line with a DC line type", [("Line", "type", "dcline_type_1")]),
+    ("text in numeric columns", [("Load", "pLoad", "abc"), ("Node", "vmR", "1,0")]),
+]
+# the LV data set with powerplants and a DC line
+TEMPLATE = dict(syntheticGrid.SIZES["lv"], powerplants=True)
+
+
+# sets the cell "column" of the first row of a csv-file
+def setCell(folder, table, column, value):
+    filepath = os.path.join(folder, table + ".csv")
+    with open(filepath) as f:
+        lines = f.read().splitlines()
+    header = lines[0].split(";")
+    cells = lines[1].split(";")
+    cells[header.index(column)] = value
+    lines[1] = ";".join(cells)
+    with open(filepath, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+# runs one case on a copy of "template", returns the list of failures
+def checkCase(template, folder, changes):
+    shutil.copytree(template, folder)
+    for table, column, value in changes:
+        setCell(folder, table, column, value)
+    failures = []
+    try:
+        model = cm.compileModel(folder)
+    except Exception as error:
+        return ["compiling the model raised {0!r}".format(error)]
+    reported = set((issue.table, issue.column) for issue in val.errors(model.issues))
+    for table, column, value in changes:
+        if (table, column) not in reported:
+            failures.append("no error for {0}.{1}".format(table, column))
+    try:
+        runBenchmark.runImport(folder, report=1, cache=0)
+        failures.append("the import did not stop")
+    except Exception as error:
+        if "invalid value" not in str(error):
+            failures.append("the import stopped with {0!r}".format(error))
+    if pf.GetApplication().objects("ElmTerm"):
+        failures.append("nodes were created before the import stopped")
+    if sys.getprofile() is not None:
+        sys.setprofile(None)
+        failures.append("the profiler of the report is still installed")
+    return failures
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="simbench_validation_")
+    failed = 0
+    try:
+        template = syntheticGrid.generateGrid(os.path.join(workdir, "template"), TEMPLATE)
+        for index, (name, changes) in enumerate(CASES):
+            failures = checkCase(template, os.path.join(workdir, "case{0}".format(index)), changes)
+            print("{0:<45} {1}".format(name, "ok" if not failures else "FAILED: " + "; ".join(failures)))
+            failed += bool(failures)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return failed
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
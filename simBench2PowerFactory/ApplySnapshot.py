@@ -0,0 +1,78 @@
+"""#################################################################################################
+    Apply the values of one timestep of the SimBench profiles to the loads and generators of the active project
+####################################################################################################"""
+# Input parameters of the ComPython object: "folder" (the imported SimBench folder) and "timestep" (index of the
+# timestep or timestamp "DD.MM.YYYY hh:mm"). The values are written directly to plini/qlini/pgini of all loads and
+# generators, the time characteristics are not evaluated. The profile store and the compiled model of the folder are
+# written if they do not exist yet.
+# The values are written to the operation scenario SNAPSHOT_SCENARIO, which stays active; the base values of the
+# elements are not changed. The characteristic references of the written attributes are switched out of service,
+# their names are kept in the description of the scenario. The timestep "base" deactivates the scenario and switches
+# these characteristic references on again.
+# ===== Import packages =====
+import powerfactory as pf
+
+#  ===== Import self written modules =====
+import CompiledModel as cm
+import ProfileStore as ps
+import ProfileSnapshots as psn
+
+SNAPSHOT_SCENARIO = "SimBench snapshot"
+
+# ===== Get the current PF-Application =====
+app = pf.GetApplication()
+if app is None:
+    raise Exception("Getting PowerFactory application failed.")
+if app.GetActiveProject() is None:
+    raise Exception("No project activated. Python script stopped.")
+thisScript = app.GetCurrentScript()
+folderpath = thisScript.folder
+timestep = str(thisScript.timestep).strip()
+try:
+    timestep = int(timestep)
+except ValueError:
+    pass
+
+# the scenario of the last snapshot is deactivated before the base values are read, it is replaced by a new one
+scenfolder = app.GetProjectFolder('scen')
+lastscenario = dict((case.loc_name, case) for case in scenfolder.GetContents("*.IntScenario")).get(SNAPSHOT_SCENARIO)
+switched = set()    # full names of the characteristic references switched out of service by earlier snapshots
+if lastscenario:
+    switched.update(lastscenario.desc or [])
+    lastscenario.Deactivate()
+
+model = cm.loadModel(folderpath, warn=app.PrintWarn)[0]
+store = ps.openStore(folderpath)
+applier = psn.SnapshotApplier(app, store, model)
+if applier.missing:
+    app.PrintWarn("{0} profiles are not in the profile files, e.g. {1}".format(len(applier.missing), applier.missing[0]))
+
+if timestep == "base":
+    if lastscenario:
+        lastscenario.Delete()
+    for reference in applier.characteristics:
+        if reference.GetFullName() in switched:
+            reference.outserv = 0
+    app.PrintPlain("Base values restored, {0} characteristic references switched on again".format(len(switched)))
+    store.close()
+else:
+    try:
+        index = applier.timestepIndex(timestep)
+    except ValueError as error:
+        store.close()
+        if lastscenario:
+            lastscenario.Activate()
+        app.PrintError(str(error))
+        raise Exception("Invalid timestep. Python script stopped.")
+    if lastscenario:
+        lastscenario.Delete()
+    scenario = scenfolder.CreateObject('IntScenario', SNAPSHOT_SCENARIO)
+    scenario.Activate()
+    written = applier.apply(index)
+    switched.update(reference.GetFullName() for reference in applier.switched)
+    scenario.desc = sorted(switched)
+    scenario.Save()
+    app.PrintPlain("Timestep {0}: {1} values of {2} profile attributes written to the scenario '{3}', {4} "
+                   "characteristic references out of service".format(index, written, len(applier),
+                                                                     SNAPSHOT_SCENARIO, len(switched)))
+    store.close()
@@ -0,0 +1,66 @@
+"""#################################################################################################
+                    Counted attribute writes with a budget of API calls
+####################################################################################################"""
+# The create functions of PFObjectCreator collect all attributes of a new object (mapping rule, type, connections,
+# area and zone) in one dict and write it with the AttributeWriter. The PowerFactory API has no setter for several
+# attributes, every attribute is one API call, so the writer does not save calls: it measures them. The write calls
+# and the created objects are counted by PowerFactory class and compared with a budget of write calls per created
+# object, which makes a mapping rule that writes more attributes than before visible in the report of the import and
+# in the benchmark.
+from collections import Counter
+
+# class of the writes to existing objects (updates of an incremental import, values of the study cases)
+OTHER = "other"
+# baseline of the write calls per created object: the number of attributes the mapping rules write for an object of
+# the class with all optional attributes (connections, types, areas and zones and the name of the profile in the
+# description), as measured with benchmark/runBenchmark.py --writes on the synthetic data sets when the writer was
+# added. The budget does not judge these counts, it catches increases over them; lower it when a mapping rule writes
+# less.
+DEFAULT_BUDGET = {"ElmTerm": 10, "ElmSubstat": 4, "ElmCoup": 4, "StaSwitch": 2, "StaCubic": 1,
+                  "TypLne": 6, "ElmLne": 5, "TypTr2": 15, "ElmTr2": 7, "ElmFeeder": 3, "ElmXnet": 3,
+                  "TypSym": 3, "ElmSym": 15, "ElmStactrl": 5, "TypLod": 2, "ElmLod": 5, "ElmGenStat": 13,
+                  "ElmShnt": 5, "ChaTime": 9, "ChaRef": 2, "IntGrf": 4, "IntGrfcon": 3}
+
+
+class AttributeWriter(object):
+    def __init__(self, budget = None):
+        self.budget = dict(DEFAULT_BUDGET if budget is None else budget)
+        self.calls = Counter()      # write calls by class
+        self.objects = Counter()    # created objects by class
+
+    def reset(self):
+        self.calls.clear()
+        self.objects.clear()
+
+    # writes the attributes of a dict (attribute name -> value) to an object, "pfclass" is the class it is counted for
+    def write(self, pfobject, attributes, pfclass = None):
+        for attribute, value in attributes.items():
+            setattr(pfobject, attribute, value)
+        pfclass = pfclass or OTHER
+        self.calls[pfclass] += len(attributes)
+        return pfobject
+
+    # creates an object in "folder" and writes its attributes
+    def create(self, folder, pfclass, name, attributes):
+        newobject = folder.CreateObject(pfclass, name)
+        self.objects[pfclass] += 1
+        return self.write(newobject, attributes, pfclass)
+
+    # write calls per created object of every class, with its budget (None if the class has no budget)
+    def rows(self):
+        rows = []
+        for pfclass in sorted(set(self.calls) | set(self.objects)):
+            objects = self.objects[pfclass]
+            perobject = float(self.calls[pfclass]) / objects if objects else None
+            budget = self.budget.get(pfclass)
+            rows.append({"class": pfclass, "objects": objects, "calls": self.calls[pfclass],
+                         "callsPerObject": perobject, "budget": budget,
+                         "overBudget": perobject is not None and budget is not None and perobject > budget})
+        return rows
+
+    def overBudget(self):
+        return [row for row in self.rows() if row["overBudget"]]
+
+    def summary(self):
+        return "{0} attribute write calls for {1} created objects, {2} class(es) over budget".format(
+            sum(self.calls.values()), sum(self.objects.values()), len(self.overBudget()))
@@ -0,0 +1,157 @@
+"""#################################################################################################
+        Batch conversion of many SimBench folders in parallel worker processes
+####################################################################################################"""
+# Usage: python BatchConverter.py <SimBench folder> [<SimBench folder> ...] [--mode dgs|compile|standin]
+#                                 [--workers N] [--outdir <folder>] [--json report.json] [--csv report.csv]
+# A list of folders can also be given in a text file (one folder per line) as @<file>.
+# Every folder is converted in its own worker process, the results of all workers are collected into one report:
+#   dgs      writes the DGS import file of the folder (to the folder or to <outdir>/<output name>.dgs)
+#   compile  compiles the folder into the model cache (CompiledModel), in the cache directory of the user or in
+#            <outdir>/<output name>
+#   standin  runs the complete import script against the in-memory PowerFactory stand-in of the benchmark folder,
+#            one application per worker; it needs no PowerFactory installation
+# The output name of a folder is its name and a hash of its absolute path, so folders with the same name (e.g. the
+# same grid of two SimBench versions) do not overwrite each other in --outdir.
+# The batch runs without PowerFactory, so it can be used headless, e.g. for regression studies of the whole
+# SimBench catalogue.
+import os
+import sys
+import csv
+import json
+import time
+import hashlib
+import argparse
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+CONVERTERDIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARKDIR = os.path.join(os.path.dirname(CONVERTERDIR), "benchmark")
+if CONVERTERDIR not in sys.path:
+    sys.path.insert(0, CONVERTERDIR)
+
+MODES = ("dgs", "compile", "standin")
+REPORT_COLUMNS = ["folder", "mode", "status", "walltime", "objects", "calls", "cached", "output", "error"]
+
+
+# name of the output of a folder in --outdir: "<folder name>-<hash of the absolute path>"
+def outputName(folder):
+    folder = os.path.abspath(folder)
+    key = hashlib.blake2b(os.path.normcase(folder).encode("utf-8"), digest_size=4).hexdigest()
+    return "{0}-{1}".format(os.path.basename(folder) or "folder", key)
+
+def _convertDGS(folder, outdir):
+    import DGSExporter as dgs
+    dgsfile = None
+    if outdir is not None:
+        dgsfile = os.path.join(outdir, outputName(folder) + ".dgs")
+    model, dgsfile = dgs.exportDGS(folder, dgsfile)
+    return {"objects": model.nextid - 1, "output": dgsfile}
+
+def _convertCompile(folder, outdir):
+    import CompiledModel as cm
+    cachefolder = None      # the cache directory of the user
+    if outdir is not None:
+        cachefolder = os.path.join(outdir, outputName(folder))
+        if not os.path.isdir(cachefolder):
+            os.makedirs(cachefolder)
+    model, cached = cm.loadModel(folder, cachefolder)
+    errors = model.errors()
+    if errors:
+        raise ValueError("{0} invalid value(s), e.g. {1}".format(len(errors), errors[0]))
+    return {"objects": sum(len(table) for table in model.tables.values()), "cached": cached,
+            "output": cm.cacheFile(folder, cachefolder)}
+
+def _convertStandin(folder, outdir):
+    # the stand-in must be found before a real PowerFactory installation
+    if BENCHMARKDIR not in sys.path:
+        sys.path.insert(0, BENCHMARKDIR)
+    import runBenchmark
+    result = runBenchmark.runImport(folder)
+    if result["errors"]:
+        raise RuntimeError("; ".join(result["errors"]))
+    stages = result["stages"].values()
+    return {"objects": sum(sum(record["created"].values()) for record in stages),
+            "calls": sum(sum(record["calls"].values()) for record in stages)}
+
+CONVERTERS = {"dgs": _convertDGS, "compile": _convertCompile, "standin": _convertStandin}
+
+# converts one folder, runs in a worker process; errors are returned in the result instead of stopping the batch
+def convertFolder(folder, mode = "dgs", outdir = None):
+    result = {"folder": folder, "mode": mode, "status": "ok", "pid": os.getpid()}
+    start = time.perf_counter()
+    try:
+        if not os.path.isdir(folder):
+            raise IOError("the folder does not exist")
+        result.update(CONVERTERS[mode](folder, outdir))
+    except Exception as error:
+        result["status"] = "error"
+        result["error"] = "{0}: {1}".format(type(error).__name__, error)
+        result["traceback"] = traceback.format_exc()
+    result["walltime"] = time.perf_counter() - start
+    return result
+
+# converts all folders with "workers" processes (all cores if None, in this process if 1); returns the results in
+# the order of the folders, "progress" is called with every result when it is finished
+def convertFolders(folders, mode = "dgs", workers = None, outdir = None, progress = None):
+    if mode not in CONVERTERS:
+        raise ValueError("unknown mode {0}, expected one of {1}".format(mode, ", ".join(MODES)))
+    if outdir is not None and not os.path.isdir(outdir):
+        os.makedirs(outdir)
+    results = [None] * len(folders)
+    if workers == 1:
+        for index, folder in enumerate(folders):
+            results[index] = convertFolder(folder, mode, outdir)
+            if progress is not None:
+                progress(results[index])
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(convertFolder, folder, mode, outdir): index for index, folder in enumerate(folders)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if progress is not None:
+                progress(results[futures[future]])
+    return results
+
+def summarize(results, walltime):
+    return {"folders": len(results),
+            "succeeded": sum(1 for result in results if result["status"] == "ok"),
+            "failed": sum(1 for result in results if result["status"] != "ok"),
+            "walltime": walltime,
+            "workerTime": sum(result["walltime"] for result in results),
+            "objects": sum(result.get("objects", 0) for result in results)}
+
+def writeReport(results, summary, jsonfile = None, csvfile = None):
+    if jsonfile:
+        with open(jsonfile, "w") as json_file:
+            json.dump({"summary": summary, "results": results}, json_file, indent=2)
+    if csvfile:
+        with open(csvfile, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file, delimiter=";")
+            writer.writerow(REPORT_COLUMNS)
+            for result in results:
+                writer.writerow([result.get(column, "") for column in REPORT_COLUMNS])
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Convert many SimBench folders in parallel worker processes",
+                                     fromfile_prefix_chars="@")
+    parser.add_argument("folders", nargs="+", help="SimBench folders (or @<file> with one folder per line)")
+    parser.add_argument("--mode", default="dgs", choices=MODES, help="what every worker produces")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes, default: all cores")
+    parser.add_argument("--outdir", help="folder for the DGS files or model caches, default: the SimBench folder")
+    parser.add_argument("--json", help="write the report to this json-file")
+    parser.add_argument("--csv", help="write the report to this csv-file")
+    args = parser.parse_args(argv)
+
+    def progress(result):
+        print("{0:<8} {1:>8.3f} s  {2}{3}".format(result["status"], result["walltime"], result["folder"],
+                                                  "  " + result["error"] if "error" in result else ""))
+    start = time.perf_counter()
+    results = convertFolders(args.folders, args.mode, args.workers, args.outdir, progress)
+    summary = summarize(results, time.perf_counter() - start)
+    writeReport(results, summary, args.json, args.csv)
+    print("{folders} folders, {succeeded} converted, {failed} failed, {walltime:.3f} s "
+          "({workerTime:.3f} s in the workers)".format(**summary))
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
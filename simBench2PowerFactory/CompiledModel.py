@@ -0,0 +1,184 @@
+"""#################################################################################################
+                    Compiled model of a SimBench folder with a cache keyed by the csv-files
+####################################################################################################"""
+# Compiling a SimBench folder parses all csv-files into typed tables and computes everything that only depends on the
+# data: validation issues, positions of the nodes, double busbar pairs, slack nodes, the topology graph, the shared
+# types and the derived parameters (rated voltages of the line types, voltage setpoints of the external nets and the
+# parameters of the DC-lines), so the import only writes them instead of reading them back from the nodes. The
+# compiled model is pickled to a cache file together with the fingerprint (hash) of the csv-files it was compiled
+# from. A later import of the same folder, e.g. into another project, loads the cache instead of parsing the csv-files
+# again, as long as the fingerprint is unchanged. Loading a pickle can execute code, so the cache is written to the
+# cache directory of the user (one file per SimBench folder) and never read from the shared SimBench folders, unless a
+# cache folder is given explicitly.
+import os
+import pickle
+import hashlib
+
+import PFObjectCreator as pfoc
+import SimBenchTables as sbt
+import CoordinateResolver as cr
+import DoubleBusbarPairing as dbp
+import TopologyGraph as tg
+import TypeInterning as ti
+import Validation as val
+
+CACHE_FILE = "SimBench2PowerFactory.model.pickle"
+CACHE_DIRECTORY = "SimBench2PowerFactory"
+CACHE_VERSION = 8
+
+# csv-files of a SimBench folder that are read by the import, the fingerprint only contains these files (not the
+# manifest of the last import or reports)
+TABLES = ["Coordinates", "Substation", "Node", "Switch", "LineType", "DCLineType", "Line", "Transformertype",
+          "Transformer", "Shunt", "ExternalNet", "Load", "PowerPlant", "RES", "Storage", "Measurement", "StudyCases"]
+PROFILE_FILES = ["LoadProfile", "RESProfile", "StorageProfile", "PowerPlantProfile"]
+
+
+# adds the content of a file to the hash "digest", returns False if the file does not exist
+def hashFile(digest, filepath):
+    try:
+        with open(filepath, "rb") as hashed_file:
+            for block in iter(lambda: hashed_file.read(1 << 20), b""):
+                digest.update(block)
+    except IOError:
+        digest.update(b"\x00missing")
+        return False
+    return True
+
+# hash of the content of all csv-files of the folder that are read by the import
+def fingerprint(folder):
+    digest = hashlib.blake2b(digest_size=16)
+    for filename in TABLES + PROFILE_FILES:
+        digest.update(filename.encode("utf-8") + b"\x1f")
+        hashFile(digest, os.path.join(folder, filename+".csv"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+# slack nodes of the Node-table: (node id, voltage angle) of the nodes with voltage and angle setpoints
+def slackNodes(nodes):
+    slacks = []
+    for row in nodes:
+        if (row["vmSetp"] is not None and row["vmSetp"] != 0) and row["vaSetp"] is not None and \
+                row["type"] != "auxiliary":
+            slacks.append((row["id"], row["vaSetp"]))
+    return slacks
+
+# rated voltage (uline) of the line types: the highest rated voltage (vmR) of the first node of the lines that use
+# them, by the id of the (shared) line type
+def lineTypeVoltages(lines, nodes, types):
+    voltages = {}
+    for row in lines:
+        node = nodes.get(row["nodeA"])
+        if "dcline" in row["id"] or node is None or node["vmR"] is None:
+            continue
+        typeid = types.lineType(row["type"])
+        if node["vmR"] > voltages.get(typeid, 0):
+            voltages[typeid] = node["vmR"]
+    return voltages
+
+# voltage setpoint (usetp) of the external nets: the voltage setpoint of their node, the second busbar of a
+# doublebusbar has the setpoint of the first one
+def xnetSetpoints(xnets, nodes, busbarPairs):
+    setpoints = {}
+    for pair in busbarPairs:
+        setpoints[pair.nodeB["id"]] = pfoc.doubleBusbarValues(pair.nodeA)[0]
+    result = {}
+    for row in xnets:
+        node = nodes.get(row["node"])
+        if row["node"] in setpoints:
+            result[row["id"]] = setpoints[row["node"]]
+        elif node is not None:
+            result[row["id"]] = node["vmSetp"] if node["vmSetp"] is not None else 1.0
+    return result
+
+
+class CompiledModel(object):
+    def __init__(self, folder, fingerprint, tables, missing, profilenames):
+        self.folder = folder
+        self.fingerprint = fingerprint
+        self.tables = tables                # table name -> SimBenchTables.Table, empty if the file does not exist
+        self.missing = missing              # names of the tables without csv-file
+        self.profilenames = profilenames    # profile file -> column names without the time column, None if missing
+        self.issues = val.validate(tables, profilenames)
+        self.positions = cr.PositionTable(tables["Coordinates"], tables["Node"])
+        self.busbarPairs, self.singleBusbars = dbp.pairDoubleBusbars(tables["Node"])
+        self.slacks = slackNodes(tables["Node"])
+        self.topology = tg.TopologyGraph.fromTables(tables)
+        # the shared types and the derived parameters apply the mapping rules, which need valid values: a model with
+        # errors is not imported, its types are left empty so the errors can be reported
+        self.types = ti.TypeLibrary()
+        self.lineVoltages = {}
+        self.xnetSetpoints = {}
+        if not self.errors():
+            # line types are only shared by lines of the same rated voltage
+            self.types = ti.internTypes(tables, lineTypeVoltages(tables["Line"], tables["Node"], ti.TypeLibrary()))
+            self.lineVoltages = lineTypeVoltages(tables["Line"], tables["Node"], self.types)
+            self.xnetSetpoints = xnetSetpoints(tables["ExternalNet"], tables["Node"], self.busbarPairs)
+        # DC-line type id -> (attributes of the generator at node A, attributes of the generator at node B)
+        self.dclines = {}
+        for row in tables["DCLineType"]:
+            if row["pDCLine"] is not None and row["fixPLosses"] is not None and row["relPLosses"] is not None:
+                self.dclines[row["id"]] = pfoc.dcLineAttributes(row)
+
+    def __getitem__(self, tablename):
+        return self.tables[tablename]
+
+    def errors(self):
+        return val.errors(self.issues)
+
+
+# cache directory of the user: %LOCALAPPDATA%\SimBench2PowerFactory on Windows, ~/.cache/SimBench2PowerFactory
+# (or $XDG_CACHE_HOME) elsewhere
+def cacheDirectory():
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or \
+        os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, CACHE_DIRECTORY)
+
+# cache file of a folder: CACHE_FILE in "cachefolder" if it is given, otherwise a file in the cache directory of the
+# user named after the folder and the hash of its absolute path
+def cacheFile(folder, cachefolder = None):
+    if cachefolder is not None:
+        return os.path.join(cachefolder, CACHE_FILE)
+    folder = os.path.abspath(folder)
+    key = hashlib.blake2b(os.path.normcase(folder).encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(cacheDirectory(), "{0}-{1}.pickle".format(os.path.basename(folder) or "model", key))
+
+# parses the csv-files of a folder and compiles the model
+def compileModel(folder, modelfingerprint = None):
+    missing = []
+    tables = {}
+    for filename in TABLES:
+        tables[filename] = sbt.loadTable(folder, filename,
+                                         warn=lambda message, filename=filename: missing.append(filename))
+    profilenames = {filename: sbt.loadProfileNames(folder, filename) for filename in PROFILE_FILES}
+    return CompiledModel(folder, modelfingerprint or fingerprint(folder), tables, missing, profilenames)
+
+# returns the compiled model of a folder and True if it was loaded from the cache; the model is compiled and the
+# cache written (see cacheFile) if there is no cache of the current csv-files
+def loadModel(folder, cachefolder = None, usecache = True, warn = None):
+    cachefile = cacheFile(folder, cachefolder)
+    currentfingerprint = fingerprint(folder)
+    if usecache:
+        try:
+            with open(cachefile, "rb") as cache:
+                version, cachedfingerprint, model = pickle.load(cache)
+            if version == CACHE_VERSION and cachedfingerprint == currentfingerprint:
+                model.folder = folder
+                return model, True
+        except FileNotFoundError:
+            pass    # no cache yet
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError, TypeError, IOError) as error:
+            # a corrupt cache or one written by another version of the converter: compile again
+            if warn is not None:
+                warn("The model cache {0} could not be read ({1}), the csv-files are compiled again.".format(
+                    cachefile, error))
+    model = compileModel(folder, currentfingerprint)
+    if usecache:
+        try:
+            if not os.path.isdir(os.path.dirname(cachefile)):
+                os.makedirs(os.path.dirname(cachefile))
+            with open(cachefile, "wb") as cache:
+                pickle.dump((CACHE_VERSION, model.fingerprint, model), cache, protocol=pickle.HIGHEST_PROTOCOL)
+        except IOError:
+            if warn is not None:
+                warn("The model cache {0} could not be written.".format(cachefile))
+    return model, False
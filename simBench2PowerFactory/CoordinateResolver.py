@@ -0,0 +1,74 @@
+"""#################################################################################################
+                    Precomputed positions of the nodes for GPS-data and the single line diagram
+####################################################################################################"""
+# All positions are computed once from the Coordinates- and Node-table: the bounding box of the coordinates, the
+# offset of the graphic positions (10*abs(min)) and the coordinate row of every node. The node and graphic stages
+# then look up the position of a node by its id instead of searching the coordinates. Coordinates with a NULL x or y
+# are left out of the bounding box, nodes at such a coordinate have no position.
+from array import array
+
+
+class PositionTable(object):
+    def __init__(self, coordinates, nodes):
+        self.bbox = None            # (min_x, min_y, max_x, max_y) of all coordinates without NULL values
+        self.offset = (0.0, 0.0)    # added to the coordinates for the position in the single line diagram
+        self.coordrows = {}         # node id -> row of its coordinate in the Coordinates-table
+        self.x = array("d")
+        self.y = array("d")
+        if not len(coordinates):
+            return
+        self.x = coordinates.column("x").values
+        self.y = coordinates.column("y").values
+        # rows with both coordinates, None if no coordinate is NULL
+        nulls = [column.nulls for column in (coordinates.column("x"), coordinates.column("y")) if column.nulls is not None]
+        valid = None
+        x, y = self.x, self.y
+        if nulls:
+            valid = [rowindex for rowindex in range(len(coordinates)) if not any(null[rowindex] for null in nulls)]
+            if not valid:
+                return
+            x, y = [self.x[row] for row in valid], [self.y[row] for row in valid]
+        min_x, max_x = min(x), max(x)
+        min_y, max_y = min(y), max(y)
+        self.bbox = (min_x, min_y, max_x, max_y)
+        self.offset = (10 * abs(min_x), 10 * abs(min_y))
+        offset_x, offset_y = self.offset
+        self.grf_x = array("d", [x + offset_x for x in self.x])
+        self.grf_y = array("d", [y + offset_y for y in self.y])
+        coordindex = coordinates.index
+        if valid is not None:
+            validrows = set(valid)
+            coordindex = dict((coordid, coordrow) for coordid, coordrow in coordindex.items() if coordrow in validrows)
+        coordids = nodes.column("coordID") if "coordID" in nodes.columns else []
+        for rowindex, nodeid in enumerate(nodes.column("id").values if len(nodes) else []):
+            coordrow = coordindex.get(coordids[rowindex])
+            if coordrow is not None:
+                self.coordrows[nodeid] = coordrow
+
+    def __bool__(self):
+        return self.bbox is not None
+
+    # GPS-position (GPSlat, GPSlon) of a node, (None, None) if the node has no coordinate
+    def gps(self, nodeid):
+        coordrow = self.coordrows.get(nodeid)
+        if coordrow is None:
+            return None, None
+        return self.y[coordrow], self.x[coordrow]
+
+    # position (x, y) of a node in the single line diagram, None if the node has no coordinate
+    def graphic(self, nodeid):
+        coordrow = self.coordrows.get(nodeid)
+        if coordrow is None:
+            return None
+        return self.grf_x[coordrow], self.grf_y[coordrow]
+
+    # user defined drawing frame of the single line diagram that contains all coordinates
+    def diagramFrame(self):
+        if self.bbox is None:
+            return {}
+        min_x, min_y, max_x, max_y = self.bbox
+        return {"iUTrSet": 1,
+                "rULBotX": (min_x)*1.1,
+                "rURTopX": (max_x)*1.1,
+                "rULBotY": (min_y)*1.1,
+                "rURTopY": (max_y)*1.1}
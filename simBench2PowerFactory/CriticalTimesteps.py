@@ -0,0 +1,92 @@
+"""#################################################################################################
+                    Critical timesteps of the profiles for snapshot study cases
+####################################################################################################"""
+# The load and the feed-in of the grid (and of every subnet) are computed for all timesteps of the profiles: the
+# ProfileSeries are grouped by profile column, so every column is added once with the sum of the base values of its
+# elements as weight. Load is the active power of the loads (plini), feed-in the active power of the static
+# generators (RES and storages, pgini); powerplants are dispatchable and not part of the residual load.
+# Critical timesteps are the maximum residual load (load - feed-in), the maximum feed-in surplus (feed-in - load),
+# the maximum change of the residual load between two timesteps and the top-k timesteps of both extremes per subnet.
+import heapq
+
+import ProfileStore as ps
+
+LOAD = "load"
+FEEDIN = "feed-in"
+
+
+class CriticalTimestep(object):
+    def __init__(self, timestep, epoch):
+        self.timestep = timestep
+        self.epoch = epoch
+        self.reasons = []       # (reason, value) that make the timestep critical
+
+    def name(self):
+        date, clock = ps.formatTimestamp(self.epoch).split(" ")
+        day, month, year = date.split(".")
+        return "Critical_{0}{1}{2}_{3}".format(year, month, day, clock.replace(":", ""))
+
+
+def _category(series):
+    if series.pfclass == "ElmLod" and series.attribute == "plini":
+        return LOAD
+    if series.pfclass == "ElmGenStat" and series.attribute == "pgini":
+        return FEEDIN
+    return None
+
+# sum of all columns of a group weighted with the base values of their elements, for the first "rows" timesteps
+def _weightedSum(weights, rows):
+    total = [0.0] * rows
+    for column, weight in weights.values():
+        if weight:
+            total = [value + weight * profile for value, profile in zip(total, column[:rows])]
+    return total
+
+# load and feed-in time series of the grid (key None) and of every subnet: {key: {category: [values]}}
+def powerSeries(series):
+    weights = {}    # key -> category -> (matrix name, column) -> [column, weight]
+    rows = None
+    for item in series:
+        category = _category(item)
+        if category is None:
+            continue
+        rows = item.matrix.rows if rows is None else min(rows, item.matrix.rows)
+        for key in ((None,) if item.subnet is None else (None, item.subnet)):
+            group = weights.setdefault(key, {}).setdefault(category, {})
+            entry = group.setdefault((item.matrix.name, item.colname), [item.column, 0.0])
+            entry[1] += item.base
+    result = {}
+    for key, categories in weights.items():
+        result[key] = {category: _weightedSum(categories.get(category, {}), rows or 0) for category in (LOAD, FEEDIN)}
+    return result
+
+def _largest(values, count):
+    return heapq.nlargest(count, range(len(values)), key=values.__getitem__)
+
+# critical timesteps of the series, sorted by timestep; "topk" timesteps of each extreme per subnet
+def criticalTimesteps(series, topk = 1):
+    power = powerSeries(series)
+    if None not in power or not power[None][LOAD]:
+        return []
+    epochs = next(item.matrix.epochs for item in series if _category(item) is not None)
+    critical = {}
+
+    def add(timestep, reason, value):
+        if timestep not in critical:
+            critical[timestep] = CriticalTimestep(timestep, epochs[timestep])
+        critical[timestep].reasons.append((reason, value))
+
+    grid = power[None]
+    residual = [load - feedin for load, feedin in zip(grid[LOAD], grid[FEEDIN])]
+    surplus = [-value for value in residual]
+    gradient = [0.0] + [abs(value - previous) for previous, value in zip(residual, residual[1:])]
+    for reason, values in (("max residual load", residual), ("max feed-in", surplus), ("max gradient", gradient)):
+        timestep = _largest(values, 1)[0]
+        add(timestep, reason, values[timestep])
+    for subnet in sorted(key for key in power if key is not None):
+        residual = [load - feedin for load, feedin in zip(power[subnet][LOAD], power[subnet][FEEDIN])]
+        for timestep in _largest(residual, topk):
+            add(timestep, "max residual load " + subnet, residual[timestep])
+        for timestep in _largest([-value for value in residual], topk):
+            add(timestep, "max feed-in " + subnet, -residual[timestep])
+    return [critical[timestep] for timestep in sorted(critical)]
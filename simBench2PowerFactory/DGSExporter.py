@@ -0,0 +1,481 @@
+"""#################################################################################################
+            Functions for compiling a SimBench data set into a PowerFactory DGS import file
+####################################################################################################"""
+import os
+import sys
+import csv
+import itertools
+
+import PFObjectCreator as pfoc
+import CompiledModel as cm
+import TopologyGraph as tg
+
+DGS_VERSION = "6.0"
+PROFILE_FILES = cm.PROFILE_FILES
+
+"""#################################################################################################
+                                    DGS data model
+####################################################################################################"""
+
+# a single object of a DGS file, references to other objects are written as their DGS ID
+class DGSObject(object):
+    def __init__(self, objid, pfclass, attributes):
+        self.id = objid
+        self.pfclass = pfclass
+        self.attributes = attributes
+        self.element = None     # only for cubicles: the element connected to the cubicle
+
+    def __getitem__(self, attribute):
+        return self.attributes[attribute]
+
+    def __setitem__(self, attribute, value):
+        self.attributes[attribute] = value
+
+    def get(self, attribute, default = None):
+        return self.attributes.get(attribute, default)
+
+# all objects of a DGS file, grouped by their PowerFactory class
+class DGSModel(object):
+    def __init__(self):
+        self.tables = {}
+        self.nextid = 1
+        self.slacks = []        # names of the external nets and power plants at slack nodes
+
+    def add(self, pfclass, name, parent = None, attributes = None):
+        record = {"loc_name": name}
+        if parent is not None:
+            record["fold_id"] = parent
+        if attributes:
+            record.update(attributes)
+        newobject = DGSObject(self.nextid, pfclass, record)
+        self.nextid += 1
+        self.tables.setdefault(pfclass, []).append(newobject)
+        return newobject
+
+    def objects(self, pfclass):
+        return self.tables.get(pfclass, [])
+
+# connect an element to a cubicle, the same way as setting bus1/bus2 via the PowerFactory API
+def _connect(element, attribute, cubicle):
+    element[attribute] = cubicle
+    cubicle.element = element
+
+"""#################################################################################################
+                    Compile a SimBench folder with the mapping rules of PFObjectCreator
+####################################################################################################"""
+
+# "compiled" is the compiled model of the folder (CompiledModel), it is loaded from the cache or compiled if not given
+def compileDGS(folder, compiled = None):
+    if compiled is None:
+        compiled = cm.loadModel(folder)[0]
+    model = DGSModel()
+    coordinates = compiled["Coordinates"]
+    substations = compiled["Substation"]
+    nodes = compiled["Node"]
+    switches = compiled["Switch"]
+    linetypes = compiled["LineType"]
+    dclinetypes = compiled["DCLineType"]
+    lines = compiled["Line"]
+    transformertypes = compiled["Transformertype"]
+    transformers = compiled["Transformer"]
+    shunts = compiled["Shunt"]
+    xnets = compiled["ExternalNet"]
+    loads = compiled["Load"]
+    powerplants = compiled["PowerPlant"]
+    reses = compiled["RES"]
+    storages = compiled["Storage"]
+    measurements = compiled["Measurement"]
+    # --- Check the references and values before anything is compiled
+    errors = compiled.errors()
+    if errors:
+        raise ValueError("{0} invalid value(s) in {1}, e.g. {2}".format(len(errors), folder, errors[0]))
+    # time profiles are initially out of service, except for EHV models (the only ones containing powerplants)
+    activate_timeprofile = 0 if powerplants else 1
+
+    grid = model.add("ElmNet", os.path.basename(os.path.normpath(folder)), attributes={"frnom": 50.0})
+
+    # --- Zones and areas
+    areas = {}
+    zones = {}
+    for row in itertools.chain(substations, nodes):
+        if row["subnet"] not in areas:
+            areas[row["subnet"]] = model.add("ElmArea", row["subnet"])
+        if row["voltLvl"] not in zones:
+            zones[row["voltLvl"]] = model.add("ElmZone", row["voltLvl"])
+
+    # --- Substations
+    pfSubstations = {}
+    for row in substations:
+        if row["id"] not in pfSubstations:
+            pfSubstations[row["id"]] = model.add("ElmSubstat", row["id"], grid,
+                                                 {"pArea": areas.get(row["subnet"]), "pZone": zones.get(row["voltLvl"])})
+
+    def substationFor(name, fallbackname, row, x, y):
+        if name is None:
+            name = fallbackname
+        if name not in pfSubstations:
+            attributes = {"pArea": areas.get(row["subnet"]), "pZone": zones.get(row["voltLvl"])}
+            attributes.update(pfoc.gpsAttributes(x, y))
+            pfSubstations[name] = model.add("ElmSubstat", fallbackname, grid, attributes)
+        return pfSubstations[name]
+
+    positions = compiled.positions
+    def gpsOf(row):
+        return positions.gps(row["id"])
+
+    # --- Nodes
+    pfNodes = {}
+    pfDbusbars = {}
+    auxnodes = {}
+    def addNode(parent, row, usage = 0, x = None, y = None):
+        attributes = pfoc.nodeAttributes(row, usage, x, y)
+        # auxiliary nodes (usage 2) are not assigned to an area or zone
+        attributes["cpArea"] = areas.get(row["subnet"]) if usage != 2 else None
+        attributes["cpZone"] = zones.get(row["voltLvl"]) if usage != 2 else None
+        newnode = model.add("ElmTerm", row["id"], parent, attributes)
+        pfNodes[row["id"]] = newnode
+        return newnode
+
+    pairs, singles = compiled.busbarPairs, compiled.singleBusbars
+    for pair in pairs:
+        nodeA, nodeB = pair
+        x, y = gpsOf(nodeA)
+        substat = substationFor(pair.substation, pair.substationName, nodeA, x, y)
+        vtarget, uknom, vmin, vmax = pfoc.doubleBusbarValues(nodeA)
+        for bb in (nodeA, nodeB):
+            attributes = pfoc.busbarAttributes(0, vtarget, uknom, vmin, vmax, x, y)
+            attributes["cpArea"] = areas.get(nodeA["subnet"])
+            attributes["cpZone"] = zones.get(nodeA["voltLvl"])
+            pfNodes[bb["id"]] = pfDbusbars[bb["id"]] = model.add("ElmTerm", bb["id"], substat, attributes)
+    for single in singles:
+        bb = single.node
+        x, y = gpsOf(bb)
+        substat = substationFor(single.substation, single.substationName, bb, x, y)
+        pfDbusbars[bb["id"]] = addNode(substat, bb, x=x, y=y)
+    for row in nodes:
+        if row["type"] == "busbar" or row["type"] == "node":
+            x, y = gpsOf(row)
+            if row["substation"] in pfSubstations:
+                addNode(pfSubstations[row["substation"]], row, x=x, y=y)
+            else:
+                addNode(grid, row, x=x, y=y)
+        elif row["type"] == "auxiliary":
+            auxnodes[row["id"]] = row
+
+    def substationOf(node):
+        parent = node.get("fold_id")
+        if parent is not None and parent.pfclass == "ElmSubstat":
+            return parent
+        return None
+
+    # --- Switches
+    pfCubicles = {}
+    nodeCubicles = {}   # DGS ID of a node -> cubicles of that node
+    def addCubicle(node, name):
+        newcubicle = model.add("StaCubic", name, node)
+        nodeCubicles.setdefault(node.id, []).append(newcubicle)
+        return newcubicle
+    def addCoupler(node, row, cubicle1, cubicle2):
+        coupler = model.add("ElmCoup", row["id"], substationOf(node) or grid, pfoc.switchAttributes(row))
+        _connect(coupler, "bus1", cubicle1)
+        _connect(coupler, "bus2", cubicle2)
+        return coupler
+    def addBay(row, nodeid, auxid):
+        node = pfNodes[nodeid]
+        if auxid not in pfNodes:
+            addNode(substationOf(node) or grid, auxnodes[auxid], usage=2)
+        auxnode = pfNodes[auxid]
+        cubicle1 = pfCubicles[nodeid+"_"+auxid] = addCubicle(node, nodeid+"_"+auxid)
+        cubicle2 = pfCubicles[auxid+"_"+nodeid] = addCubicle(auxnode, auxid+"_"+nodeid)
+        # the cubicle to connect the equipment to (i.e. lines and transformers)
+        if auxid not in pfCubicles:
+            pfCubicles[auxid] = addCubicle(auxnode, auxid)
+        addCoupler(node, row, cubicle1, cubicle2)
+
+    for row in switches:
+        if row["nodeA"] not in auxnodes and row["nodeB"] not in auxnodes:
+            nodeA = pfNodes[row["nodeA"]]
+            nodeB = pfNodes[row["nodeB"]]
+            addCoupler(nodeA, row, addCubicle(nodeA, row["nodeA"]), addCubicle(nodeB, row["nodeB"]))
+        elif row["nodeA"] in pfDbusbars and row["nodeB"] in auxnodes:
+            addBay(row, row["nodeA"], row["nodeB"])
+        elif row["nodeA"] in auxnodes and row["nodeB"] in pfNodes:
+            addBay(row, row["nodeB"], row["nodeA"])
+        else:
+            # the cubicle is created at the real node but named after the auxiliary node
+            if row["nodeA"] in pfNodes:
+                cubicle = pfCubicles[row["nodeB"]] = addCubicle(pfNodes[row["nodeA"]], row["nodeB"])
+            else:
+                cubicle = pfCubicles[row["nodeA"]] = addCubicle(pfNodes[row["nodeB"]], row["nodeA"])
+            model.add("StaSwitch", row["id"], cubicle, pfoc.switchAttributes(row))
+
+    def cubicleFor(nodeid, name):
+        return pfCubicles.get(nodeid) or addCubicle(pfNodes[nodeid], name)
+
+    # --- Lines
+    types = compiled.types  # types with the same parameters are shared (see TypeInterning.py)
+    pfLineTypes = {}
+    for row in linetypes:
+        if types.lineType(row["id"]) == row["id"]:
+            attributes = pfoc.lineTypeAttributes(row)
+            # the rated voltage of a line type is the highest rated voltage of the nodes it is used at
+            if row["id"] in compiled.lineVoltages:
+                attributes["uline"] = compiled.lineVoltages[row["id"]]
+            pfLineTypes[row["id"]] = model.add("TypLne", row["id"], attributes=attributes)
+    for row in lines:
+        if "dcline" in row["id"]:
+            cubicleA = addCubicle(pfNodes[row["nodeA"]], "Cubicle_" + row["id"])
+            cubicleB = addCubicle(pfNodes[row["nodeB"]], "Cubicle_" + row["id"])
+            attributesA, attributesB = compiled.dclines.get(row["type"]) or pfoc.dcLineAttributes(dclinetypes.get(row["type"]))
+            _connect(model.add("ElmGenStat", row["id"]+"_from", grid, attributesA), "bus1", cubicleA)
+            _connect(model.add("ElmGenStat", row["id"]+"_to", grid, attributesB), "bus1", cubicleB)
+        else:
+            linetype = pfLineTypes.get(types.lineType(row["type"]))
+            cubicleA = cubicleFor(row["nodeA"], row["nodeA"]+"_"+row["id"])
+            cubicleB = cubicleFor(row["nodeB"], row["nodeB"]+"_"+row["id"])
+            attributes = {"typ_id": linetype}
+            attributes.update(pfoc.lineAttributes(row))
+            newline = model.add("ElmLne", row["id"], grid, attributes)
+            _connect(newline, "bus1", cubicleA)
+            _connect(newline, "bus2", cubicleB)
+
+    # --- Transformers
+    pfTransformerTypes = {}
+    cubiclesLV = {}
+    for row in transformertypes:
+        if types.transformerType(row["id"]) == row["id"]:
+            pfTransformerTypes[row["id"]] = model.add("TypTr2", row["id"], attributes=pfoc.transformerTypeAttributes(row))
+    for row in transformers:
+        cubicleHV = cubicleFor(row["nodeHV"], row["nodeHV"]+"_"+row["id"])
+        cubicleLV = cubicleFor(row["nodeLV"], row["nodeLV"]+"_"+row["id"])
+        parent = grid
+        if row["substation"] in pfSubstations:
+            parent = pfSubstations[row["substation"]]
+        attributes = {"typ_id": pfTransformerTypes.get(types.transformerType(row["type"]))}
+        attributes.update(pfoc.transformerAttributes(row))
+        newtransformer = model.add("ElmTr2", row["id"], parent, attributes)
+        _connect(newtransformer, "bushv", cubicleHV)
+        _connect(newtransformer, "buslv", cubicleLV)
+        cubiclesLV[row["id"]] = cubicleLV
+
+    # --- Feeders at the LV side of the MV/LV transformers
+    for feeder in tg.feeders(compiled.topology, compiled.tables):
+        attributes = {"obj_id": cubiclesLV[feeder.transformer], "iorient": 0}   # ->Busbar
+        if feeder.subnets:
+            attributes["desc"] = feeder.subnets
+        model.add("ElmFeeder", feeder.name(), grid, attributes)
+
+    # --- External nets and power plants
+    for row in xnets:
+        cubicle = addCubicle(pfNodes[row["node"]], "Cubicle_"+row["id"])
+        _connect(model.add("ElmXnet", row["id"], grid, pfoc.xnetAttributes(row, compiled.xnetSetpoints.get(row["id"]))), "bus1", cubicle)
+    pfSMTypes = {}
+    for row in powerplants:
+        cubicle = addCubicle(pfNodes[row["node"]], "Cubicle_" + row["id"])
+        name = types.machineType(row["id"])
+        if name not in pfSMTypes:
+            pfSMTypes[name] = model.add("TypSym", name, attributes=types.machineAttributes[name])
+        attributes = {"typ_id": pfSMTypes[name]}
+        attributes.update(pfoc.powerplantAttributes(row))
+        _connect(model.add("ElmSym", row["id"], grid, attributes), "bus1", cubicle)
+
+    # --- Slack angle
+    slacknodes = set()
+    for row in nodes:
+        if (row["vmSetp"] is not None and row["vmSetp"] != 0) and row["vaSetp"] is not None and row["type"] != "auxiliary":
+            slacknodes.add(row["id"])
+    for cubicle in model.objects("StaCubic"):
+        node = cubicle["fold_id"]
+        if node["loc_name"] in slacknodes and cubicle.element is not None:
+            if cubicle.element.pfclass in ("ElmXnet", "ElmSym"):
+                model.slacks.append(cubicle.element["loc_name"])
+            if cubicle.element.pfclass == "ElmXnet" and cubicle.element.get("bustp") == "SL":
+                cubicle.element["phiini"] = nodes.get(node["loc_name"])["vaSetp"]
+
+    # --- Loads, RES, storages and shunts
+    loadtype = model.add("TypLod", types.loadtype, attributes=pfoc.loadTypeAttributes()) if len(loads) else None
+    for row in loads:
+        cubicle = addCubicle(pfNodes[row["node"]], "Cubicle_" + row["id"])
+        attributes = pfoc.loadAttributes(row)
+        attributes["typ_id"] = loadtype
+        _connect(model.add("ElmLod", row["id"], grid, attributes), "bus1", cubicle)
+    for rows, mapping in ((reses, pfoc.resAttributes), (storages, pfoc.storageAttributes)):
+        for row in rows:
+            cubicle = addCubicle(pfNodes[row["node"]], "Cubicle_" + row["id"])
+            _connect(model.add("ElmGenStat", row["id"], grid, mapping(row)), "bus1", cubicle)
+    for row in shunts:
+        cubicle = addCubicle(pfNodes[row["node"]], "Cubicle_" + row["id"])
+        _connect(model.add("ElmShnt", row["id"], grid, pfoc.shuntAttributes(row)), "bus1", cubicle)
+
+    # --- Measurements
+    for row in measurements:
+        pfclass = "StaExt"+row["variable"]+"mea"
+        if row["element1"] in pfNodes and row["element2"] is None:
+            # In PowerFactory 2019 there is no external p- or q-measurement possible directly at a node, only at a bay of a node
+            if row["variable"] == "v":
+                model.add(pfclass, row["id"], pfNodes[row["element1"]])
+        elif row["element1"] in pfNodes:
+            for cubicle in nodeCubicles.get(pfNodes[row["element1"]].id, []):
+                if cubicle.element is not None and cubicle.element["loc_name"] == row["element2"]:
+                    model.add(pfclass, row["id"], cubicle)
+        elif row["element1"] in pfCubicles:
+            model.add(pfclass, row["id"], pfCubicles[row["element1"]])
+
+    # --- Station controllers for "pv" nodes
+    genunits = {}
+    for cubicle in model.objects("StaCubic"):
+        element = cubicle.element
+        if element is not None and element.pfclass == "ElmSym" and element.get("av_mode") == "constv":
+            genunits.setdefault(cubicle["fold_id"].id, (cubicle["fold_id"], []))[1].append(element)
+    for node, units in genunits.values():
+        attributes = {"psym": units}
+        attributes.update(pfoc.stactrlAttributes())
+        attributes["rembar"] = node
+        model.add("ElmStactrl", "Stactrl_" + node["loc_name"], grid, attributes)
+
+    # --- Profiles
+    pfProfiles = {}
+    for filename in PROFILE_FILES:
+        filepath = os.path.join(folder, filename+".csv")
+        for colindex, colname in enumerate(compiled.profilenames[filename] or [], 2):
+            if colname not in pfProfiles:
+                pfProfiles[colname] = model.add("ChaTime", colname, attributes=pfoc.timeCharacteristicAttributes(filepath, colindex))
+    def addCharacteristicRef(element, name, profile):
+        attributes = {"outserv": activate_timeprofile}
+        if profile is not None:
+            attributes["typ_id"] = profile
+        model.add("ChaRef", name, element, attributes)
+    for load in model.objects("ElmLod"):
+        desc = load.get("desc")
+        addCharacteristicRef(load, "plini", pfProfiles.get(desc[0]+"_pload") if desc else None)
+        addCharacteristicRef(load, "qlini", pfProfiles.get(desc[0]+"_qload") if desc else None)
+    for generator in model.objects("ElmGenStat") + model.objects("ElmSym"):
+        desc = generator.get("desc")
+        addCharacteristicRef(generator, "pgini", pfProfiles.get(desc[0]) if desc else None)
+    return model
+
+"""#################################################################################################
+                                Writing and reading DGS files
+####################################################################################################"""
+
+def _dgsType(values):
+    if all(isinstance(value, DGSObject) for value in values):
+        return "p"
+    if all(isinstance(value, int) for value in values):
+        return "i"
+    if all(isinstance(value, (int, float)) for value in values):
+        return "r"
+    return "a:{0}".format(max([40] + [len(str(value)) for value in values]))
+
+def _dgsValue(value):
+    if value is None:
+        return ""
+    if isinstance(value, DGSObject):
+        return str(value.id)
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+# header columns and rows of the table of one PowerFactory class
+def dgsTable(objects):
+    attributes = []
+    for dgsobject in objects:
+        for attribute in dgsobject.attributes:
+            if attribute not in attributes:
+                attributes.append(attribute)
+    header = ["ID(a:40)"]
+    columns = []
+    for attribute in attributes:
+        values = [o.attributes[attribute] for o in objects if o.attributes.get(attribute) is not None]
+        if values and isinstance(values[0], list):
+            # vector attributes are written as attr:SIZEROW and one column per vector element
+            size = max(len(value) for value in values)
+            header.append("{0}:SIZEROW(i)".format(attribute))
+            columns.append((attribute, None))
+            for index in range(size):
+                header.append("{0}:{1}({2})".format(attribute, index, _dgsType([v[index] for v in values if len(v) > index])))
+                columns.append((attribute, index))
+        else:
+            header.append("{0}({1})".format(attribute, _dgsType(values) if values else "a:40"))
+            columns.append((attribute, -1))
+    rows = []
+    for dgsobject in objects:
+        row = [str(dgsobject.id)]
+        for attribute, index in columns:
+            value = dgsobject.attributes.get(attribute)
+            if index == -1:
+                row.append(_dgsValue(value))
+            elif index is None:
+                row.append(str(len(value)) if value is not None else "")
+            else:
+                row.append(_dgsValue(value[index]) if value is not None and len(value) > index else "")
+        rows.append(row)
+    return header, rows
+
+# values that contain the separator (e.g. the column separator of the time characteristics) are written in quotes
+def writeDGS(model, dgsfile):
+    with open(dgsfile, "w", newline="") as f:
+        writer = csv.writer(f, delimiter=";", lineterminator="\n")
+        f.write("$$General;ID(a:40);Descr(a:40);Val(a:40)\n")
+        f.write("1;Version;{0}\n".format(DGS_VERSION))
+        for pfclass, objects in model.tables.items():
+            header, rows = dgsTable(objects)
+            f.write("*\n")
+            f.write("$${0};{1}\n".format(pfclass, ";".join(header)))
+            writer.writerows(rows)
+    return dgsfile
+
+def _parseDGSValue(value, dgstype):
+    if value == "":
+        return None
+    if dgstype in ("i", "p"):
+        return int(value)
+    if dgstype == "r":
+        return float(value)
+    return value
+
+# reads a DGS file into a dict: PowerFactory class -> list of dicts (attribute -> value), pointers are DGS IDs
+def readDGS(dgsfile):
+    tables = {}
+    columns = None
+    with open(dgsfile, "r") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("*"):
+                continue
+            if line.startswith("$$"):
+                fields = line[2:].split(";")
+                pfclass = fields[0]
+                columns = []
+                for field in fields[1:]:
+                    name, dgstype = field[:-1].split("(", 1)
+                    columns.append((name, dgstype))
+                tables[pfclass] = []
+                continue
+            record = {}
+            for (name, dgstype), value in zip(columns, next(csv.reader([line], delimiter=";"))):
+                if ":" in name:
+                    attribute, index = name.split(":", 1)
+                    if index == "SIZEROW":
+                        record[attribute] = [] if value else None
+                    elif record.get(attribute) is not None and value != "":
+                        record[attribute].append(_parseDGSValue(value, dgstype))
+                else:
+                    record[name] = _parseDGSValue(value, dgstype if name != "ID" else "i")
+            tables[pfclass].append(record)
+    return tables
+
+# compile a SimBench folder and write it as DGS file, by default next to the csv-files
+def exportDGS(folder, dgsfile = None):
+    if dgsfile is None:
+        dgsfile = os.path.join(folder, os.path.basename(os.path.normpath(folder)) + ".dgs")
+    model = compileDGS(folder)
+    writeDGS(model, dgsfile)
+    return model, dgsfile
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python DGSExporter.py <SimBench folder> [<DGS file>]")
+        sys.exit(1)
+    model, dgsfile = exportDGS(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print("Wrote {0} objects to {1}".format(model.nextid - 1, dgsfile))
@@ -0,0 +1,108 @@
+"""#################################################################################################
+    Import a SimBench data set with a single DGS bulk import instead of one API call per object
+####################################################################################################"""
+# ===== Import packages =====
+import powerfactory as pf
+from datetime import datetime
+
+#  ===== Import self written modules =====
+import PFObjectCreator as pfoc
+import DGSExporter as dgs
+import SimBenchTables as sbt
+import Instrumentation as inst
+import ScriptParameters as sp
+
+# ===== Calculate the seconds for setting the studycase time in PF =====
+starttime = datetime(1970, 1, 1, 0, 0, 0)
+timeprofiletime = datetime(2016, 1, 1, 0, 0, 0)
+diff_seconds = (timeprofiletime-starttime).total_seconds()-3600
+
+# ===== Get the current PF-Application =====
+app = pf.GetApplication()
+if app is None:
+    raise Exception("Getting PowerFactory application failed.")
+project = app.GetActiveProject()
+if project is None:
+    raise Exception("No project activated. Python Importscript stopped.")
+app.ClearOutputWindow()
+app.PrintInfo("SimBench to PowerFactory DGS import started...")
+app.EchoOff()
+# the output is switched on again when the import ends, also if it stops with an error
+try:
+    studycase = app.GetActiveStudyCase()
+    studycase.SetStudyTime(diff_seconds)
+    ldf = app.GetFromStudyCase('ComLdf') #Calling Loadflow Command object
+    scenfolder = app.GetProjectFolder('scen') #Folder that contains 'scenarios' (study cases)
+    thisScript = app.GetCurrentScript()
+    folderpath = thisScript.folder
+
+    # --- Optional report of the import stages: 0 = no report, 1 = json- and csv-report next to the folder,
+    # 2 = report and summary table in the output window
+    report = sp.scriptParameter(thisScript, "report", 0)
+    instrumentation = inst.Instrumentation(app, enabled = report > 0)
+
+    """
+    Compile the csv-files into a DGS file and import it with one ComImport call
+    """
+    instrumentation.banner("=======START WRITING THE DGS FILE=======")
+    model, dgsfile = dgs.exportDGS(folderpath)
+    app.PrintPlain("{0} objects written to {1}".format(model.nextid - 1, dgsfile))
+    instrumentation.banner("=======FINISHED WRITING THE DGS FILE========="+"\n")
+
+    instrumentation.banner("=======START DGS IMPORT=======")
+    comImport = app.GetFromStudyCase('ComImport')
+    comImport.g_file = dgsfile     # DGS file to import
+    comImport.g_target = project   # import into the active project
+    if comImport.Execute() != 0:
+        app.PrintError("DGS import of {0} failed.".format(dgsfile))
+        raise Exception("DGS import failed. Python Importscript stopped.")
+    instrumentation.banner("=======FINISHED DGS IMPORT========="+"\n")
+
+    # --- Set up loadflow options, EHV models (the only ones containing powerplants) need the settings of Integral
+    ldf.iopt_plim = 1
+    if model.objects("ElmSym"):
+        ldf.iopt_plim = 0
+        ldf.iPbalancing = 4
+
+    """
+    Create graphical objects
+    """
+    gridname = model.objects("ElmNet")[0]["loc_name"]
+    grids = [net for net in app.GetCalcRelevantObjects("*.ElmNet") if net.loc_name == gridname]
+    if not grids:
+        app.PrintError("The grid {0} of the DGS file was not found in the project.".format(gridname))
+        raise Exception("DGS import failed. Python Importscript stopped.")
+    grid = grids[0]
+    layout = app.GetFromStudyCase('ComSgllayout')
+    layout.iAction = 0
+    layout.iGenType = 0
+    layout.pGrids = grid
+    layout.Execute()
+
+    """
+    Add studycases (scenarios are not part of a DGS file)
+    """
+    instrumentation.banner("=======START CREATING STUDY CASES=======")
+    studycases = sbt.loadTable(folderpath, "StudyCases")
+    if studycases:
+        pfStudyCases = dict((case.loc_name, case) for case in scenfolder.GetContents("*.IntScenario"))
+        allloads = app.GetCalcRelevantObjects("*.ElmLod")
+        allRES = app.GetCalcRelevantObjects("*.ElmGenStat")
+        slacks = [obj for obj in app.GetCalcRelevantObjects("*.ElmXnet") + app.GetCalcRelevantObjects("*.ElmSym")
+                  if obj.loc_name in model.slacks]
+        baseline = pfoc.studyCaseBaseline(allloads, allRES, slacks)
+        for row in studycases:
+            if not pfStudyCases.get(row["Study Case"]):
+                newstudycase = pfoc.createStudyCase(scenfolder, row, baseline)
+                pfStudyCases[newstudycase.loc_name] = newstudycase
+    instrumentation.banner("=======FINISHED CREATING STUDY CASES========="+"\n")
+
+    # --- Write the report of the import stages
+    instrumentation.finish()
+    if report > 0:
+        reportfiles = instrumentation.writeReport(folderpath)
+        app.PrintPlain("Report of the import stages written to {0} and {1}".format(*reportfiles))
+        if report > 1:
+            instrumentation.printSummary()
+finally:
+    app.EchoOn()
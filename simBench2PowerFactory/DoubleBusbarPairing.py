@@ -0,0 +1,45 @@
+"""#################################################################################################
+                    Pairing of the "double busbar" rows of the Node-table
+####################################################################################################"""
+# Busbars of type "double busbar" with the same coordID and the same rated voltage (vmR) form a doublebusbar.
+# The rows are grouped by (coordID, vmR) in one pass; within a group the rows are paired in the order of the
+# csv-file. Busbars without a partner are single busbars. The result only depends on the order of the Node-table.
+
+
+# two busbars that form a doublebusbar
+class BusbarPair(object):
+    def __init__(self, nodeA, nodeB):
+        self.nodeA = nodeA
+        self.nodeB = nodeB
+        # substation of the pair (of the first busbar that has one), None if it has to be created
+        self.substation = nodeA["substation"] if nodeA["substation"] is not None else nodeB["substation"]
+        # name of the substation that is created if the pair does not belong to an existing one
+        self.substationName = nodeA["id"] + "-" + nodeB["id"]
+
+    def __iter__(self):
+        yield self.nodeA
+        yield self.nodeB
+
+
+# "double busbar" row without a partner, it is created as a normal busbar inside a substation
+class SingleBusbar(object):
+    def __init__(self, node):
+        self.node = node
+        self.substation = node["substation"]
+        self.substationName = "Substation_" + node["id"]
+
+
+# returns the BusbarPairs and SingleBusbars of the "double busbar" rows in nodes, in the order of their first row
+def pairDoubleBusbars(nodes, nodetype = "double busbar"):
+    groups = {}     # (coordID, vmR) -> rows, dicts keep the order of the first row of each group
+    for row in nodes:
+        if row["type"] == nodetype:
+            groups.setdefault((row["coordID"], row["vmR"]), []).append(row)
+    pairs = []
+    singles = []
+    for rows in groups.values():
+        for i in range(0, len(rows) - 1, 2):
+            pairs.append(BusbarPair(rows[i], rows[i + 1]))
+        if len(rows) % 2:
+            singles.append(SingleBusbar(rows[-1]))
+    return pairs, singles
@@ -0,0 +1,116 @@
+"""#################################################################################################
+                    Manifest of an import for incremental re-imports of a SimBench folder
+####################################################################################################"""
+# The manifest stores two hashes for every row of the imported csv-tables: one of the complete row and one of the
+# columns that connect the row to other objects (nodes, types, substations). On a re-import the tables are compared
+# with the manifest: rows with the same hash are skipped, changed rows are updated in place and rows with changed
+# connections are created again.
+import os
+import json
+import hashlib
+
+# one manifest per target project: "SimBench2PowerFactory.<hash of the full name of the project>.manifest.json"
+MANIFEST_FILE = "SimBench2PowerFactory.{0}.manifest.json"
+MANIFEST_VERSION = 1
+
+# columns of a table that connect a row to other objects; if they change the object is deleted and created again
+CONNECTIONS = {
+    "Node": ("type", "substation", "coordID"),
+    "Switch": ("nodeA", "nodeB"),
+    "Line": ("nodeA", "nodeB", "type"),
+    "Transformer": ("nodeHV", "nodeLV", "type", "substation"),
+    "ExternalNet": ("node",),
+    "PowerPlant": ("node",),
+    "Load": ("node", "profile"),
+    "RES": ("node",),
+    "Storage": ("node",),
+    "Shunt": ("node",),
+}
+
+
+def _hash(values):
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update("\x1f".join(repr(value) for value in values).encode("utf-8"))
+    return digest.hexdigest()
+
+# path of the manifest of the imports of a folder into a project
+def manifestFile(folder, project):
+    return os.path.join(folder, MANIFEST_FILE.format(_hash([project])))
+
+# (row hash, connection hash) of every row of a table, by the key of the row
+def tableHashes(table):
+    hashes = {}
+    if not len(table):
+        return hashes
+    columns = list(table.columns.values())
+    connections = [table.columns[name] for name in CONNECTIONS.get(table.name, ()) if name in table.columns]
+    keycolumn = table.columns.get(table.key)
+    if keycolumn is None:
+        return hashes
+    for rowindex in range(len(table)):
+        hashes[keycolumn[rowindex]] = [_hash(column[rowindex] for column in columns),
+                                       _hash(column[rowindex] for column in connections)]
+    return hashes
+
+
+# differences of a table to the last import
+class TableDiff(object):
+    def __init__(self, name, added, changed, reconnected, removed, unchanged):
+        self.name = name
+        self.added = added              # ids of new rows
+        self.changed = changed          # ids of rows with changed values, the object can be updated in place
+        self.reconnected = reconnected  # ids of rows with changed connections, the object is created again
+        self.removed = removed          # ids of rows that no longer exist
+        self.unchanged = unchanged      # set of ids of rows without changes
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.reconnected or self.removed)
+
+    def summary(self):
+        return "{0}: {1} added, {2} changed, {3} reconnected, {4} removed, {5} unchanged".format(
+            self.name, len(self.added), len(self.changed), len(self.reconnected), len(self.removed),
+            len(self.unchanged))
+
+
+class ImportManifest(object):
+    def __init__(self, project = None, tables = None):
+        self.project = project      # full name of the PowerFactory project the folder was imported into
+        self.tables = tables or {}  # table name -> {row id: [row hash, connection hash]}
+
+    # reads the manifest of the imports of a folder into a project; returns None if there is none, it cannot be read
+    # or it was written by another version
+    @staticmethod
+    def load(folder, project = None):
+        try:
+            with open(manifestFile(folder, project), "r") as manifest_file:
+                content = json.load(manifest_file)
+        except (IOError, ValueError):
+            return None
+        if content.get("version") != MANIFEST_VERSION or content.get("project") != project:
+            return None
+        return ImportManifest(project, content.get("tables"))
+
+    def save(self, folder):
+        with open(manifestFile(folder, self.project), "w") as manifest_file:
+            json.dump({"version": MANIFEST_VERSION, "project": self.project, "tables": self.tables}, manifest_file)
+
+    def diff(self, table):
+        old = self.tables.get(table.name, {})
+        new = tableHashes(table)
+        added, changed, reconnected, unchanged = [], [], [], set()
+        for rowid, hashes in new.items():
+            oldhashes = old.get(rowid)
+            if oldhashes is None:
+                added.append(rowid)
+            elif oldhashes[0] == hashes[0]:
+                unchanged.add(rowid)
+            elif oldhashes[1] == hashes[1]:
+                changed.append(rowid)
+            else:
+                reconnected.append(rowid)
+        removed = [rowid for rowid in old if rowid not in new]
+        return TableDiff(table.name, added, changed, reconnected, removed, unchanged)
+
+    # stores the hashes of the imported table
+    def record(self, table):
+        self.tables[table.name] = tableHashes(table)
@@ -0,0 +1,133 @@
+"""#################################################################################################
+            Instrumentation of the import stages: wall time, PowerFactory API calls, objects and memory
+####################################################################################################"""
+# The stages are the "=======START <stage>=======" and "=======FINISHED <stage>=======" banners of the import
+# scripts, which are printed with Instrumentation.banner. For every stage the wall time, the number of calls of
+# PowerFactory methods (by name), the number of created objects (CreateObject calls) and the peak Python memory are
+# recorded. Time outside of the banners is recorded in the stage "other".
+# Calls are counted with a profile function (sys.setprofile), so the instrumentation slows the import down and is
+# only active if a report is requested. The profile function and the memory tracing are removed when the script that
+# created the instrumentation ends, also if it stops with an exception, so they do not stay installed in the Python
+# process of PowerFactory.
+import os
+import sys
+import csv
+import json
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+
+OTHER_STAGE = "other"
+PF_MODULE = "powerfactory"
+
+
+class Instrumentation(object):
+    def __init__(self, app, enabled = False):
+        self.app = app
+        self.enabled = enabled
+        self.stages = OrderedDict()     # stage -> {"time": s, "calls": Counter, "created": n, "peakMemory": bytes}
+        self.stage = None
+        self.stageStart = None
+        self.calls = None
+        self.startTime = time.perf_counter()
+        self.walltime = None
+        self.tracing = False            # True if the memory tracing was started by this instrumentation
+        self.scriptFrame = None         # frame of the script, the recording stops when it returns or raises
+        if enabled:
+            self.scriptFrame = sys._getframe(1)
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.tracing = True
+            self._startStage(OTHER_STAGE)
+            sys.setprofile(self._profile)
+
+    # print a banner to the output window; START/FINISHED/END banners start and close the stages
+    def banner(self, text):
+        self.app.PrintPlain(text)
+        if not self.enabled:
+            return
+        name = text.strip().strip("=").strip()
+        if name.startswith("START "):
+            self._startStage(name[len("START "):].strip().lower())
+        elif name.split(" ", 1)[0] in ("FINISHED", "END"):
+            self._startStage(OTHER_STAGE)
+
+    def _startStage(self, stage):
+        now = time.perf_counter()
+        if self.stage is not None:
+            record = self.stages.setdefault(self.stage, {"time": 0.0, "calls": Counter(), "created": 0,
+                                                         "peakMemory": 0})
+            record["time"] += now - self.stageStart
+            record["calls"].update(self.calls)
+            record["created"] += self.calls.get("CreateObject", 0)
+            record["peakMemory"] = max(record["peakMemory"], tracemalloc.get_traced_memory()[1])
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self.calls = Counter()
+        self.stage = stage
+        self.stageStart = now
+
+    # counts the calls of methods of PowerFactory objects: C-functions of the PowerFactory module and public Python
+    # functions of a module named "powerfactory" (e.g. a stand-in for tests) that are called from outside that module
+    def _profile(self, frame, event, arg):
+        if event == "return" and frame is self.scriptFrame:
+            self.finish()
+        elif event == "c_call":
+            owner = getattr(arg, "__self__", None)
+            if owner is not None and type(owner).__module__ == PF_MODULE:
+                self.calls[arg.__name__] += 1
+        elif event == "call" and frame.f_globals.get("__name__") == PF_MODULE:
+            name = frame.f_code.co_name
+            caller = frame.f_back
+            if not name.startswith("_") and (caller is None or caller.f_globals.get("__name__") != PF_MODULE):
+                self.calls[name] += 1
+
+    # stops recording and returns the stage records
+    def finish(self):
+        if self.enabled:
+            sys.setprofile(None)
+            self.scriptFrame = None
+            self._startStage(None)
+            if self.tracing:
+                tracemalloc.stop()
+            self.enabled = False
+            self.walltime = time.perf_counter() - self.startTime
+        return self.stages
+
+    def rows(self):
+        rows = []
+        for stage, record in self.stages.items():
+            rows.append(OrderedDict([("stage", stage),
+                                     ("time", round(record["time"], 6)),
+                                     ("calls", sum(record["calls"].values())),
+                                     ("created", record["created"]),
+                                     ("peakMemory", record["peakMemory"]),
+                                     ("callsByName", dict(record["calls"].most_common()))]))
+        return rows
+
+    # writes <folder>_report.json and <folder>_report.csv next to the folder; returns the paths of both files
+    # "writes" are the optional rows of the attribute writes by class (see AttributeWriter.py), saved in the json-file
+    def writeReport(self, folder, writes = None):
+        basename = os.path.normpath(folder) + "_report"
+        rows = self.rows()
+        content = {"folder": folder,
+                   "walltime": round(self.walltime or time.perf_counter() - self.startTime, 6),
+                   "stages": rows}
+        if writes is not None:
+            content["writes"] = writes
+        with open(basename + ".json", "w") as json_file:
+            json.dump(content, json_file, indent=2)
+        with open(basename + ".csv", "w", newline="") as csv_file:
+            writer = csv.writer(csv_file, delimiter=";")
+            writer.writerow(["stage", "time", "calls", "created", "peakMemory"])
+            for row in rows:
+                writer.writerow([row["stage"], row["time"], row["calls"], row["created"], row["peakMemory"]])
+        return basename + ".json", basename + ".csv"
+
+    # prints the stage records as a table to the output window
+    def printSummary(self):
+        self.app.PrintPlain("{0:<40} {1:>10} {2:>10} {3:>10} {4:>14}".format("stage", "time [s]", "API calls",
+                                                                             "created", "peak mem [kB]"))
+        for row in self.rows():
+            self.app.PrintPlain("{0:<40} {1:>10.3f} {2:>10} {3:>10} {4:>14.0f}".format(
+                row["stage"][:40], row["time"], row["calls"], row["created"], row["peakMemory"] / 1024.0))
@@ -1,6 +1,277 @@
 """#################################################################################################
                             Functions for creating PowerFactory objects
 ####################################################################################################"""
+import AttributeWriter as aw
+
+# PowerFactory usage of the SimBench switch types
+SWITCH_USAGE = {"CB": "cbk", "LS": "swt", "LBS": "sdc", "DS": "dct"}
+
+# writer of the attributes of the created objects, counts the write calls by class (see AttributeWriter.py)
+writer = aw.AttributeWriter()
+
+# set the attributes of a dict (attribute name -> value) to a PowerFactory object
+def setAttributes(pfobject, attributes, pfclass = None):
+    return writer.write(pfobject, attributes, pfclass)
+
+"""#################################################################################################
+            Mapping rules from SimBench rows to PowerFactory attributes (no PowerFactory needed)
+####################################################################################################"""
+
+def gpsAttributes(x = None, y = None):
+    attributes = {}
+    if x != None:
+        attributes["GPSlat"] = x
+    if y != None:
+        attributes["GPSlon"] = y
+    return attributes
+
+def nodeAttributes(row, usage = 0, x = None, y = None):
+    attributes = {}
+    # if there is no value for vmSetp in the csv file then set the value of vmSetp to 1
+    if row["vmSetp"] is not None:
+        attributes["vtarget"] = row["vmSetp"]
+    else:
+        attributes["vtarget"] = 1.0
+    attributes["uknom"] = row["vmR"]
+    attributes["vmin"] = row["vmMin"]
+    attributes["vmax"] = row["vmMax"]
+    attributes.update(gpsAttributes(x, y))
+    attributes["iUsage"] = usage
+    return attributes
+
+def busbarAttributes(iusage=0, vtarg=1.0, uknom=110, vmin=0.95, vmax=1.05, x = None, y = None):
+    attributes = {"iUsage": iusage, "vtarget": vtarg, "uknom": uknom, "vmin": vmin, "vmax": vmax}
+    attributes.update(gpsAttributes(x, y))
+    return attributes
+
+# voltage values (vtarget, uknom, vmin, vmax) of both busbars of a doublebusbar, taken from the first busbar row
+def doubleBusbarValues(row):
+    # if there is no value for vmSetp in the csv file then set the value of vmSetp to 1
+    vtarget = _valueOr(row["vmSetp"], 1.0)
+    uknom = row["vmR"]
+    vmin = _valueOr(row["vmMin"], 0.95)
+    vmax = _valueOr(row["vmMax"], 1.05)
+    return vtarget, uknom, vmin, vmax
+
+# attributes of couplers and switches
+def switchAttributes(row):
+    attributes = {}
+    if row["type"] in SWITCH_USAGE:
+        attributes["aUsage"] = SWITCH_USAGE[row["type"]]
+    if (row["cond"] == 0):
+        attributes["on_off"] = 0
+    else:
+        attributes["on_off"] = 1
+    return attributes
+
+def lineTypeAttributes(row):
+    attributes = {}
+    attributes["rline"] = row["r"]  # positive sequence resistence @ 20 °C
+    attributes["xline"] = row["x"]  # positive sequence reactance
+    attributes["bline"] = row["b"]  # positive sequence susceptance
+    attributes["sline"] = row["iMax"] / 1000  # iMax
+    if row["type"] == "ohl":
+        attributes["cohl_"] = 1
+    else:
+        attributes["cohl_"] = 0
+    return attributes
+
+def lineAttributes(row):
+    attributes = {"dline": row["length"]}
+    attributes["maxload"] = _valueOr(row["loadingMax"], 100)
+    return attributes
+
+# attributes of the two static generators (side A and side B) representing a DC line
+def dcLineAttributes(dclintype_row):
+    attributesA = {"cCategory": "hvdc", "mode_inp": "PQ"}
+    if dclintype_row["pDCLine"] > 0:
+        attributesA["pgini"] = -dclintype_row["pDCLine"]
+    else:
+        attributesA["pgini"] = 1
+    attributesA["cosn"] = 1  # set defaultvalue of the powerfactor to 1
+    attributesA["sgn"] = attributesA["pgini"]*1.5
+    attributesA["Pmin_uc"] = 0
+    attributesA["Pmax_uc"] = _valueOr(dclintype_row["pMax"], 0)
+    attributesA["cQ_min"] = _valueOr(dclintype_row["qMinA"], 0)
+    attributesA["cQ_max"] = _valueOr(dclintype_row["qMaxA"], 0)
+    attributesB = {"cCategory": "hvdc", "mode_inp": "PQ"}
+    attributesB["pgini"] = (attributesA["pgini"] - dclintype_row["fixPLosses"] * (1 - (dclintype_row["relPLosses"] / 100)))
+    attributesB["cosn"] = 1  # set defaultvalue of the powerfactor to 1
+    attributesB["sgn"] = abs(attributesB["pgini"]*1.5)
+    attributesB["Pmin_uc"] = 0
+    attributesB["Pmax_uc"] = _valueOr(dclintype_row["pMax"], 0)
+    attributesB["cQ_min"] = _valueOr(dclintype_row["qMinB"], 0)
+    attributesB["cQ_max"] = _valueOr(dclintype_row["qMaxB"], 0)
+    return attributesA, attributesB
+
+def transformerTypeAttributes(row):
+    attributes = {}
+    attributes["strn"] = row["sR"]
+    attributes["utrn_h"] = row["vmHV"]
+    attributes["utrn_l"] = row["vmLV"]
+    attributes["nt2ag"] = row["va0"] / 30
+    attributes["uktr"] = row["vmImp"]
+    attributes["pcutr"] = row["pCu"]
+    attributes["pfe"] = row["pFe"]
+    attributes["curmg"] = row["iNoLoad"]
+    # Stufung
+    if row["tapable"] == 1:
+        attributes["itapch"] = 1
+        attributes["tapside"] = 0 if row["tapside"] == "HV" else 1
+        attributes["dutap"] = row["dVm"]
+        attributes["phitr"] = row["dVa"]
+        attributes["nntap0"] = row["tapNeutr"]
+        attributes["ntpmn"] = row["tapMin"]
+        attributes["ntpmx"] = row["tapMax"]
+    return attributes
+
+def transformerAttributes(row):
+    attributes = {}
+    attributes["nntap"] = row["tappos"]
+    attributes["ntrcn"] = 1 if row["autoTap"] == 1 else 0
+    attributes["t2ldc"] = 0 if row["autoTapSide"] == "HV" else 1
+    attributes["maxload"] = row["loadingMax"]
+    return attributes
+
+# usetp is the voltage setpoint (vtarget) of the node the external net is connected to
+def xnetAttributes(row, usetp):
+    attributes = {"usetp": usetp}
+    if row["calc_type"] == "pq":
+        attributes["bustp"] = "PQ"
+    if row["calc_type"] == "pv":
+        attributes["bustp"] = "PV"
+    if row["calc_type"] == "vavm":
+        attributes["bustp"] = "SL"
+    return attributes
+
+# ugn is the rated voltage (uknom) of the node the synchronous machine is connected to
+def smTypeAttributes(row, ugn):
+    return {"sgn": row["sR"], "ugn": ugn, "cosn": 0.95}
+
+def powerplantAttributes(row):
+    attributes = {}
+    # check the type and set the category in PowerFactory
+    if row["type"] == "hard coal":
+        attributes["cCategory"] = 'coal'
+        attributes["cSubCategory"] = 'hardcoal'
+    elif row["type"] == "lignite":
+        attributes["cCategory"] = 'coal'
+        attributes["cSubCategory"] = 'lignite'
+    elif row["type"] == "nuclear":
+        attributes["cCategory"] = 'nuc'
+    elif row["type"] == "gas":
+        attributes["cCategory"] = 'gas'
+    elif row["type"] == "oil":
+        attributes["cCategory"] = 'oil'
+    # check the controltype and set the category in PowerFactory
+    if row["calc_type"] == "vavm":
+        attributes["ip_ctrl"] = 1
+        attributes["av_mode"] = 'constv'
+    elif row["calc_type"] == "pvm":
+        attributes["av_mode"] = 'constv'
+    elif row["calc_type"] == "pq":
+        attributes["av_mode"] = 'constq'
+    attributes["pgini"] = _valueOr(row["pPP"], 0)
+    if row["qPP"] is None:
+        attributes["qgini"] = 0
+        attributes["mode_inp"] = "SP"
+        attributes["sgini"] = row["sR"]
+    else:
+        attributes["qgini"] = row["qPP"]
+    attributes["Pmin_uc"] = row["pMin"]
+    attributes["Pmax_uc"] = row["pMax"]
+    attributes["cQ_min"] = row["qMin"]
+    attributes["cQ_max"] = row["qMax"]
+    attributes.update(_profileAttributes(row))
+    return attributes
+
+def stactrlAttributes():
+    return {"i_ctrl": 0,    # 0 => voltage control
+            "selBus": 0,
+            "uset_mode": 1}
+
+def loadAttributes(row):
+    attributes = {"plini": abs(row["pLoad"]), "qlini": abs(row["qLoad"])}
+    attributes.update(_profileAttributes(row))
+    return attributes
+
+def loadTypeAttributes():
+    return {"systp": 0, "phtech": 2}
+
+def resAttributes(row):
+    attributes = {}
+    if ("pv" in row["type"].lower()):
+        attributes["cCategory"] = "pv"
+    elif ("wind" in row["type"].lower()):
+        attributes["cCategory"] = "wgen"
+        if ("offshore" in row["type"].lower()):
+            attributes["cSubCategory"] = "offshore"
+    elif ("biomass" in row["type"].lower()):
+        attributes["cCategory"] = "bgas"
+    elif ("hydro" in row["type"].lower() or "river" in row["type"].lower()):
+        attributes["cCategory"] = "hydr"
+    if (row["calc_type"] == "pq"):
+        attributes["mode_inp"] = "PQ"
+        attributes["pgini"] = row["pRES"]
+        attributes["qgini"] = row["qRES"]
+    attributes["cosn"] = 1  # set defaultvalue of the powerfactor to 1
+    if row["sR"] > 0:
+        attributes["sgn"] = row["sR"]
+    else:
+        attributes["sgn"] = 1
+    attributes["Pmin_uc"] = 0
+    attributes["Pmax_uc"] = row["pRES"]
+    attributes["cQ_min"] = -row["qRES"]
+    attributes["cQ_max"] = row["qRES"]
+    attributes.update(_profileAttributes(row))
+    return attributes
+
+def storageAttributes(row):
+    attributes = {"cCategory": "stor"}
+    attributes["sgn"] = row["sR"]
+    attributes["cosn"] = 1
+    attributes["pgini"] = -row["pStor"]
+    attributes["qgini"] = row["qStor"]
+    attributes["Pmin_uc"] = row["pMin"]
+    attributes["Pmax_uc"] = row["pMax"]
+    attributes["cQ_min"] = row["qMin"]
+    attributes["cQ_max"] = row["qMax"]
+    attributes.update(_profileAttributes(row))
+    return attributes
+
+def shuntAttributes(row):
+    return {"ushnm": row["vmR"],
+            "ncapx": row["Step"],
+            "ncapa": 1,         #set current step to startstep
+            "qtotn": row["q0"]}
+
+# attributes of a time characteristic that reads column "colindex" of a SimBench profile csv-file
+def timeCharacteristicAttributes(filepath, colindex):
+    return {"source": 1,                        # defining external file to be the source
+            "iopt_stamp": 1,                    # setting Time Stamped Data to be true
+            "timeformat": "DD.MM.YYYY hh:mm",   # Time Format
+            "f_name": filepath,                 # Path to csv file
+            "usage": 1,                         # value usage (1 = multiply the parameter value with char-values)
+            "datacol": colindex,                # setting the column of the inputfile that contains the data
+            "iopt_sep": 0,                      # defining seperation manually
+            "col_Sep": ";",                     # defining column seperator
+            "dec_Sep": "."}                     # defining decimal seperator
+
+# the name of the profile is saved in the description of loads and generators, it is needed for assigning the profiles
+def _profileAttributes(row):
+    if row["profile"] is None:
+        return {}
+    return {"desc": [row["profile"]]}
+
+# value of a csv-cell or the default value if the cell is NULL
+def _valueOr(value, default):
+    if value is None:
+        return default
+    return value
+
+"""#################################################################################################
+                        Functions that create the PowerFactory objects
+####################################################################################################"""
 
 def createArea(areafolder, areaname):
     newarea = areafolder.CreateObject("ElmArea", areaname)
@@ -11,50 +282,21 @@ def createZone(zonefolder, zonename):
     return newzone
 
 def createSubstation(gridfolder, substat_name, area, zone, x = None, y = None):
-    newsubstat = gridfolder.CreateObject("ElmSubstat", substat_name)
-    newsubstat.pArea = area
-    newsubstat.pZone = zone
-    if x != None:
-        newsubstat.GPSlat = x
-    if y != None:
-        newsubstat.GPSlon = y
-    return newsubstat
+    attributes = {"pArea": area, "pZone": zone}
+    attributes.update(gpsAttributes(x, y))
+    return writer.create(gridfolder, "ElmSubstat", substat_name, attributes)
 
 def createNode(folder, row, area = None, zone = None, usage = 0, x = None, y = None):
-    newnode = folder.CreateObject("ElmTerm", row["id"])
-    # check if vmsetp is a float, if there is no value in the csv file then set the value of vmSetp to 1
-    if row["vmSetp"] != "NULL":
-        newnode.vtarget = float(row["vmSetp"])
-    else:
-        newnode.vtarget = 1.0
-    newnode.uknom = float(row["vmR"])
-    newnode.vmin = float(row["vmMin"])
-    newnode.vmax = float(row["vmMax"])
-    if x != None:
-        newnode.GPSlat = x
-    if y != None:
-        newnode.GPSlon = y
-    newnode.cpArea = area
-    newnode.cpZone = zone
-    newnode.iUsage = usage
-    return newnode
+    attributes = nodeAttributes(row, usage, x, y)
+    attributes.update({"cpArea": area, "cpZone": zone})
+    return writer.create(folder, "ElmTerm", row["id"], attributes)
 
 #Function for creating a single busbar of a doublebusbar
 def createBusbar(folder, name, iusage=0, vtarg=1.0, uknom=110, vmin=0.95, vmax=1.05, cparea=None, cpzone=None, x = None, y = None):
-    newnode = folder.CreateObject("ElmTerm")
-    newnode.loc_name = name
-    newnode.iUsage = iusage
-    newnode.vtarget = vtarg
-    newnode.uknom = uknom
-    newnode.vmin = vmin
-    newnode.vmax = vmax
-    if x != None:
-        newnode.GPSlat = x
-    if y != None:
-        newnode.GPSlon = y
-    newnode.cpArea = cparea
-    newnode.cpZone = cpzone
-    return newnode
+    attributes = {"loc_name": name}
+    attributes.update(busbarAttributes(iusage, vtarg, uknom, vmin, vmax, x, y))
+    attributes.update({"cpArea": cparea, "cpZone": cpzone})
+    return writer.create(folder, "ElmTerm", None, attributes)
 
 def createDoubleBusbar(folder, bb1_name, bb2_name, iusage=0, vtarg=1.0, uknom=110, vmin=0.95, vmax=1.05, cparea=None, cpzone=None, x = None, y = None):
     # Create 2 nodes
@@ -63,334 +305,170 @@ def createDoubleBusbar(folder, bb1_name, bb2_name, iusage=0, vtarg=1.0, uknom=11
     return bb1, bb2
 
 def createCubicle(node, cubiclename):
-    newcubicle = node.CreateObject("StaCubic", cubiclename)
-    return newcubicle
+    return writer.create(node, "StaCubic", cubiclename, {})
 
 def createCoupler(folder, row, cubicle1, cubicle2):
-    newcoupler = folder.CreateObject("ElmCoup", row["id"])
-    if (row["type"] == "CB"):
-        newcoupler.aUsage = "cbk"
-    elif (row["type"] == "LS"):
-        newcoupler.aUsage = "swt"
-    elif (row["type"] == "LBS"):
-        newcoupler.aUsage = "sdc"
-    elif (row["type"] == "DS"):
-        newcoupler.aUsage = "dct"
-    if (row["cond"] == "0"):
-        newcoupler.on_off = 0
-    else:
-        newcoupler.on_off = 1
-    newcoupler.bus1 = cubicle1
-    newcoupler.bus2 = cubicle2
-    return newcoupler
+    attributes = switchAttributes(row)
+    attributes.update({"bus1": cubicle1, "bus2": cubicle2})
+    return writer.create(folder, "ElmCoup", row["id"], attributes)
 
 def createSwitch(row, cubicle):
-    newswitch = cubicle.CreateObject("StaSwitch", row["id"])
-    if (row["type"] == "CB"):
-        newswitch.aUsage = "cbk"
-    elif (row["type"] == "LS"):
-        newswitch.aUsage = "swt"
-    elif (row["type"] == "LBS"):
-        newswitch.aUsage = "sdc"
-    elif (row["type"] == "DS"):
-        newswitch.aUsage = "dct"
-    if (row["cond"] == "0"):
-        newswitch.on_off = 0
-    else:
-        newswitch.on_off = 1
-    return newswitch
+    return writer.create(cubicle, "StaSwitch", row["id"], switchAttributes(row))
 
 #Create a coupler connecting the two Busbars
 def createdbbCoupler(folder, row, nodeA, nodeB):
-    newcoupler = folder.CreateObject("ElmCoup", row["id"])
-    if (row["type"] == "CB"):
-        newcoupler.aUsage = "cbk"
-    elif (row["type"] == "LS"):
-        newcoupler.aUsage = "swt"
-    elif (row["type"] == "LBS"):
-        newcoupler.aUsage = "sdc"
-    elif (row["type"] == "DS"):
-        newcoupler.aUsage = "dct"
-    if (row["cond"] == "0"):
-        newcoupler.on_off = 0
-    else:
-        newcoupler.on_off = 1
-    # Create cubicle and connect it to the terminals
-    # Connection for nodeA
-    sta_cubicle1 = nodeA.CreateObject("StaCubic")
-    sta_cubicle1.loc_name = nodeA.loc_name
-    newcoupler.bus1 = sta_cubicle1
-    # Connection for nodeB
-    sta_cubicle2 = nodeB.CreateObject("StaCubic")
-    sta_cubicle2.loc_name = nodeB.loc_name
-    newcoupler.bus2 = sta_cubicle2
-    return newcoupler
-
-def createLineType(libfolder, row):
-    newlineType = libfolder.CreateObject("TypLne", row["id"])
-    newlineType.rline = float(row["r"])  # positive sequence resistence @ 20 °C
-    newlineType.xline = float(row["x"])  # positive sequence reactance
-    newlineType.bline = float(row["b"])  # positive sequence susceptance
-    newlineType.sline = float(row["iMax"]) / 1000  # iMax
-    if row["type"] == "ohl":
-        newlineType.cohl_ = 1
-    else:
-        newlineType.cohl_ = 0
-    return newlineType
+    # Create cubicles named after the terminals, the coupler connects them
+    sta_cubicle1 = writer.create(nodeA, "StaCubic", None, {"loc_name": nodeA.loc_name})
+    sta_cubicle2 = writer.create(nodeB, "StaCubic", None, {"loc_name": nodeB.loc_name})
+    return createCoupler(folder, row, sta_cubicle1, sta_cubicle2)
+
+# "uline" is the rated voltage of the line type, the highest rated voltage of the nodes it is used at
+def createLineType(libfolder, row, uline = None):
+    attributes = lineTypeAttributes(row)
+    if uline is not None:
+        attributes["uline"] = uline
+    return writer.create(libfolder, "TypLne", row["id"], attributes)
 
-def createDCLine(folder, dcline_row, cubicleA, cubicleB, dclintype_row):
+def createDCLine(folder, dcline_row, cubicleA, cubicleB, dclintype_row, attributes = None):
+    attributesA, attributesB = attributes or dcLineAttributes(dclintype_row)
     # Create static generator at node A
-    newDCgenA = folder.CreateObject("ElmGenStat", dcline_row["id"]+"_from")
-    newDCgenA.cCategory = "hvdc"
-    newDCgenA.mode_inp = "PQ"
-    if float(dclintype_row["pDCLine"]) > 0:
-        newDCgenA.pgini = -float(dclintype_row["pDCLine"])
-    else:
-        newDCgenA.pgini = 1
-    newDCgenA.cosn = 1  # set defaultvalue of the powerfactor to 1
-    newDCgenA.sgn = newDCgenA.pgini*1.5
-    newDCgenA.Pmin_uc = 0
-    if dclintype_row["pMax"] == "NULL":
-        newDCgenA.Pmax_uc = 0
-    else:
-        newDCgenA.Pmax_uc = float(dclintype_row["pMax"])
-    if dclintype_row["qMinA"] == "NULL":
-        newDCgenA.cQ_min = 0
-    else:
-        newDCgenA.cQ_min = float(dclintype_row["qMinA"])
-    if dclintype_row["qMaxA"] == "NULL":
-        newDCgenA.cQ_max = 0
-    else:
-        newDCgenA.cQ_max = float(dclintype_row["qMaxA"])
-    newDCgenA.bus1 = cubicleA
+    newDCgenA = writer.create(folder, "ElmGenStat", dcline_row["id"]+"_from", dict(attributesA, bus1=cubicleA))
     # Create static generator at node B
-    newDCgenB = folder.CreateObject("ElmGenStat", dcline_row["id"]+"_to")
-    newDCgenB.cCategory = "hvdc"
-    newDCgenB.mode_inp = "PQ"
-    newDCgenB.pgini = (newDCgenA.pgini - float(dclintype_row["fixPLosses"]) * (1 - (float(dclintype_row["relPLosses"]) / 100)))
-    newDCgenB.cosn = 1  # set defaultvalue of the powerfactor to 1
-    newDCgenB.sgn = abs(newDCgenB.pgini*1.5)
-    newDCgenB.Pmin_uc = 0
-    if dclintype_row["pMax"] == "NULL":
-        newDCgenB.Pmax_uc = 0
-    else:
-        newDCgenB.Pmax_uc = float(dclintype_row["pMax"])
-    if dclintype_row["qMinB"] == "NULL":
-        newDCgenB.cQ_min = 0
-    else:
-        newDCgenB.cQ_min = float(dclintype_row["qMinB"])
-    if dclintype_row["qMaxB"] == "NULL":
-        newDCgenB.cQ_max = 0
-    else:
-        newDCgenB.cQ_max = float(dclintype_row["qMaxB"])
-    newDCgenB.bus1 = cubicleB
+    newDCgenB = writer.create(folder, "ElmGenStat", dcline_row["id"]+"_to", dict(attributesB, bus1=cubicleB))
     return [newDCgenA, newDCgenB]
 
 def createLine(folder, row, linetype, cubicleA, cubicleB):
-    newline = folder.CreateObject("ElmLne", row["id"])
-    newline.typ_id = linetype
-    newline.bus1 = cubicleA
-    newline.bus2 = cubicleB
-    newline.dline = float(row["length"])
-    if row["loadingMax"]:
-        newline.maxload = float(row["loadingMax"])
-    else:
-        newline.maxload = 100
-    return newline
+    attributes = {"typ_id": linetype, "bus1": cubicleA, "bus2": cubicleB}
+    attributes.update(lineAttributes(row))
+    return writer.create(folder, "ElmLne", row["id"], attributes)
 
 def createTransformerType(libfolder, row):
-    newtransformertype = libfolder.CreateObject("TypTr2", row["id"])
-    newtransformertype.strn = float(row["sR"])
-    newtransformertype.utrn_h = float(row["vmHV"])
-    newtransformertype.utrn_l = float(row["vmLV"])
-    newtransformertype.nt2ag = float(row["va0"]) / 30
-    newtransformertype.uktr = float(row["vmImp"])
-    newtransformertype.pcutr = float(row["pCu"])
-    newtransformertype.pfe = float(row["pFe"])
-    newtransformertype.curmg = float(row["iNoLoad"])
-    # Stufung
-    if row["tapable"] == "1":
-        newtransformertype.itapch = 1
-        newtransformertype.tapside = 0 if row["tapside"] is "HV" else 1
-        newtransformertype.dutap = float(row["dVm"])
-        newtransformertype.phitr = float(row["dVa"])
-        newtransformertype.nntap0 = int(row["tapNeutr"])
-        newtransformertype.ntpmn = int(row["tapMin"])
-        newtransformertype.ntpmx = int(row["tapMax"])
-    return newtransformertype
+    return writer.create(libfolder, "TypTr2", row["id"], transformerTypeAttributes(row))
 
 def createTransformer(folder, row, transformertype, cubicleHV, cubicleLV):
-    newtransformer = folder.CreateObject("ElmTr2", row["id"])
-    newtransformer.bushv = cubicleHV
-    newtransformer.buslv = cubicleLV
-    newtransformer.typ_id = transformertype
-    newtransformer.nntap = int(row["tappos"])
-    newtransformer.ntrcn = 1 if row["autoTap"] == "1" else 0
-    newtransformer.t2ldc = 0 if row["autoTapSide"] == "HV" else 1
-    newtransformer.maxload = float(row["loadingMax"])
-    return newtransformer
-
-def createXnet(folder, row, cubicle):
-    newxnet = folder.CreateObject("ElmXnet", row["id"])
-    newxnet.usetp = cubicle.GetParent().vtarget
-    newxnet.bus1 = cubicle
-    if row["calc_type"] == "pq":
-        newxnet.bustp = "PQ"
-    if row["calc_type"] == "pv":
-        newxnet.bustp = "PV"
-    if row["calc_type"] == "vavm":
-        newxnet.bustp = "SL"
-    return newxnet
-
-def createSMType(libfolder, node, row):
-    newSMtype = libfolder.CreateObject("TypSym", row["id"]+"_type")
-    newSMtype.sgn = float(row["sR"])
-    newSMtype.ugn = node.uknom
-    newSMtype.cosn = 0.95
-    return newSMtype
-
-def createPowerplant(folder, libfolder, row, cubicle):
-    newpp = folder.CreateObject("ElmSym", row["id"])
-    #create synchronous machine (SM) type and assign it to this SM
-    newpp.typ_id = createSMType(libfolder, cubicle.GetParent(), row)
-    # check the type and set the category in PowerFactory
-    if row["type"] == "hard coal":
-        newpp.cCategory = 'coal'
-        newpp.cSubCategory = 'hardcoal'
-    elif row["type"] == "lignite":
-        newpp.cCategory = 'coal'
-        newpp.cSubCategory = 'lignite'
-    elif row["type"] == "nuclear":
-        newpp.cCategory = 'nuc'
-    elif row["type"] == "gas":
-        newpp.cCategory = 'gas'
-    elif row["type"] == "oil":
-        newpp.cCategory = 'oil'
-    # check the controltype and set the category in PowerFactory
-    if row["calc_type"] == "vavm":
-        newpp.ip_ctrl = 1
-        newpp.av_mode = 'constv'
-    elif row["calc_type"] == "pvm":
-        newpp.av_mode = 'constv'
-    elif row["calc_type"] == "pq":
-        newpp.av_mode = 'constq'
-    if row["pPP"] == "NULL":
-        newpp.pgini = 0
-    else:
-        newpp.pgini = float(row["pPP"])
-    if row["qPP"] == "NULL":
-        newpp.qgini = 0
-        newpp.mode_inp = "SP"
-        newpp.sgini = float(row["sR"])
-    else:
-        newpp.qgini = float(row["qPP"])
-    newpp.Pmin_uc = float(row["pMin"])
-    newpp.Pmax_uc = float(row["pMax"])
-    newpp.cQ_min = float(row["qMin"])
-    newpp.cQ_max = float(row["qMax"])
-    newpp.bus1 = cubicle
-    newpp.desc = [row["profile"]]
-    return newpp
+    attributes = {"bushv": cubicleHV, "buslv": cubicleLV, "typ_id": transformertype}
+    attributes.update(transformerAttributes(row))
+    return writer.create(folder, "ElmTr2", row["id"], attributes)
+
+# feeder that starts at the LV cubicle of a transformer and is oriented towards the busbar (away from the transformer)
+def createFeeder(folder, name, cubicle, subnets):
+    attributes = {"obj_id": cubicle, "iorient": 0}  # ->Busbar
+    if subnets:
+        attributes["desc"] = subnets
+    return writer.create(folder, "ElmFeeder", name, attributes)
+
+# "usetp" is the voltage setpoint of the node of the external net, it is read from the node if it is not given; the
+# setpoint is written before the connection
+def createXnet(folder, row, cubicle, usetp = None):
+    attributes = xnetAttributes(row, cubicle.GetParent().vtarget if usetp is None else usetp)
+    ordered = {"usetp": attributes.pop("usetp"), "bus1": cubicle}
+    ordered.update(attributes)
+    return writer.create(folder, "ElmXnet", row["id"], ordered)
+
+# synchronous machine (SM) type, shared by all powerplants with the same attributes (see TypeInterning.py)
+def createSMType(libfolder, name, attributes):
+    return writer.create(libfolder, "TypSym", name, attributes)
+
+def createPowerplant(folder, row, cubicle, smtype):
+    attributes = {"typ_id": smtype}
+    attributes.update(powerplantAttributes(row))
+    attributes["bus1"] = cubicle
+    return writer.create(folder, "ElmSym", row["id"], attributes)
 
 def createStaCtrl(folder, node, genunitlist):
-    newstactrl = folder.CreateObject("ElmStactrl", "Stactrl_" + node.loc_name)
-    newstactrl.psym = genunitlist
-    newstactrl.i_ctrl = 0  # 0 => voltage control
-    newstactrl.selBus = 0
-    newstactrl.uset_mode = 1
-    newstactrl.rembar = node
+    attributes = {"psym": genunitlist}
+    attributes.update(stactrlAttributes())
+    attributes["rembar"] = node
+    return writer.create(folder, "ElmStactrl", "Stactrl_" + node.loc_name, attributes)
 
 def createLoad(folder, row, cubicle, loadtype):
-    newload = folder.CreateObject("ElmLod", row["id"])
-    newload.plini = abs(float(row["pLoad"]))
-    newload.qlini = abs(float(row["qLoad"]))
-    newload.typ_id = loadtype
-    newload.bus1 = cubicle
-    return newload
+    attributes = loadAttributes(row)
+    attributes.update({"typ_id": loadtype, "bus1": cubicle})
+    return writer.create(folder, "ElmLod", row["id"], attributes)
 
 def createLoadType(libfolder, name):
-    newloadtype = libfolder.CreateObject("TypLod", name)
-    newloadtype.systp = 0
-    newloadtype.phtech = 2
-    return newloadtype
+    return writer.create(libfolder, "TypLod", name, loadTypeAttributes())
 
 def createRES(folder, row, cubicle):
-    newres = folder.CreateObject("ElmGenStat", row["id"])
-    if ("pv" in row["type"].lower()):
-        newres.cCategory = "pv"
-    elif ("wind" in row["type"].lower()):
-        newres.cCategory = "wgen"
-        if ("offshore" in row["type"].lower()):
-            newres.cSubCategory = "offshore"
-    elif ("biomass" in row["type"].lower()):
-        newres.cCategory = "bgas"
-    elif ("hydro" in row["type"].lower() or "river" in row["type"].lower()):
-        newres.cCategory = "hydr"
-    if (row["calc_type"] == "pq"):
-        newres.mode_inp = "PQ"
-        newres.pgini = float(row["pRES"])
-        newres.qgini = float(row["qRES"])
-    newres.cosn = 1  # set defaultvalue of the powerfactor to 1
-    if float(row["sR"]) > 0:
-        newres.sgn = float(row["sR"])
-    else:
-        newres.sgn = 1
-    newres.Pmin_uc = 0
-    newres.Pmax_uc = float(row["pRES"])
-    newres.cQ_min = -float(row["qRES"])
-    newres.cQ_max = float(row["qRES"])
-    newres.bus1 = cubicle
-    newres.desc = [row["profile"]]
-    return newres
+    attributes = resAttributes(row)
+    attributes["bus1"] = cubicle
+    return writer.create(folder, "ElmGenStat", row["id"], attributes)
 
 def createStorage(folder, row, cubicle):
-    newstor = folder.CreateObject("ElmGenStat", row["id"])
-    newstor.cCategory = "stor"
-    newstor.sgn = float(row["sR"])
-    newstor.cosn = 1
-    newstor.pgini = -float(row["pStor"])
-    newstor.qgini = float(row["qStor"])
-    newstor.Pmin_uc = float(row["pMin"])
-    newstor.Pmax_uc = float(row["pMax"])
-    newstor.cQ_min = float(row["qMin"])
-    newstor.cQ_max = float(row["qMax"])
-    newstor.bus1 = cubicle
-    newstor.desc = [row["profile"]]
-    return newstor
+    attributes = storageAttributes(row)
+    attributes["bus1"] = cubicle
+    return writer.create(folder, "ElmGenStat", row["id"], attributes)
 
 def createShunt(folder, row, cubicle):
-    newshunt = folder.CreateObject('ElmShnt', row["id"])
-    newshunt.bus1 = cubicle
-    newshunt.ushnm = row["vmR"]
-    newshunt.ncapx = row["Step"]
-    newshunt.ncapa = 1          #set current step to startstep
-    newshunt.qtotn = row["q0"]
-    return newshunt
+    attributes = {"bus1": cubicle}
+    attributes.update(shuntAttributes(row))
+    return writer.create(folder, 'ElmShnt', row["id"], attributes)
 
 def createMeasurement(folder, row):
     newmeas = folder.CreateObject('StaExt'+row["variable"]+"mea", row["id"])
     return newmeas
 
-def createStudyCase(folder, row, loads, reses, slacks):
-    newstudycase = folder.CreateObject('IntScenario', row["Study Case"])
+def createTimeCharacteristic(charFolder, name, filepath, colindex):
+    return writer.create(charFolder, "ChaTime", name, timeCharacteristicAttributes(filepath, colindex))
+
+# creates a study case with the values of the loads and generators at one timestep of the profiles; "values" is
+# {(PowerFactory class, element id): {attribute: value}}, "elements" is {PowerFactory class: {element id: element}}
+def createSnapshotStudyCase(folder, name, values, elements, desc = None):
+    newstudycase = folder.CreateObject('IntScenario', name)
+    if desc:
+        setAttributes(newstudycase, {"desc": desc})
     newstudycase.Activate()
-    #Set study case loadvalues
-    for load in loads:
-        load.plini = load.plini * float(row["pload"])
-        load.qlini = load.qlini * float(row["qload"])
-    # Set study case RES-values
+    for (pfclass, elementid), attributes in values.items():
+        element = elements[pfclass].get(elementid)
+        if element is not None:
+            setAttributes(element, attributes)
+    newstudycase.Save()
+    newstudycase.Deactivate()
+    return newstudycase
+
+# column of the StudyCases-table that scales the active power of the static generators of a category; the
+# generators of all other categories are scaled with "RES_p"
+RES_CATEGORY_FACTORS = {"wgen": "Wind_p", "pv": "PV_p"}
+
+# values of the loads, static generators and slacks without study case, read once before the study cases are created;
+# returns {column of the StudyCases-table: (elements, base values, attribute)}
+def studyCaseBaseline(loads, reses, slacks):
+    baseline = {"pload": (loads, [load.plini for load in loads], "plini"),
+                "qload": (loads, [load.qlini for load in loads], "qlini")}
+    categories = {}
     for res in reses:
-        if res.cCategory == 'Wind':
-            res.pgini = res.pgini * float(row["Wind_p"])
-        elif res.cCategory == 'Fotovoltaik':
-            res.pgini = res.pgini * float(row["PV_p"])
+        categories.setdefault(RES_CATEGORY_FACTORS.get(res.cCategory, "RES_p"), []).append(res)
+    for column, elements in categories.items():
+        baseline[column] = (elements, [res.pgini for res in elements], "pgini")
+    xnets = [slack for slack in slacks or [] if slack.GetClassName() == 'ElmXnet']
+    baseline["Slack_vm"] = (xnets, [xnet.usetp for xnet in xnets], "usetp")
+    return baseline
+
+# (element, attribute, value) of a study case that differ from the baseline: the powers are the base values scaled
+# with the factor of their column, the voltage setpoint of the external grids is Slack_vm
+def studyCaseValues(row, baseline):
+    values = []
+    for column, (elements, bases, attribute) in baseline.items():
+        factor = row[column]
+        if factor is None:
+            continue
+        if column == "Slack_vm":
+            scaled = [factor] * len(bases)
+        elif factor == 1:
+            continue
         else:
-            res.pgini = res.pgini * float(row["RES_p"])
-    # Set slack voltages
-    if slacks:
-        for slack in slacks:
-            if slack.GetClassName() == 'ElmXnet':
-                slack.usetp = float(row["Slack_vm"])
+            scaled = [base * factor for base in bases]
+        values.extend((element, attribute, value) for element, base, value in zip(elements, bases, scaled)
+                      if value != base)
+    return values
+
+# creates a study case (IntScenario) of a row of the StudyCases-table, only the values that differ from the baseline
+# are written to the study case
+def createStudyCase(folder, row, baseline):
+    newstudycase = folder.CreateObject('IntScenario', row["Study Case"])
+    newstudycase.Activate()
+    for element, attribute, value in studyCaseValues(row, baseline):
+        setAttributes(element, {attribute: value})
     newstudycase.Save()
     newstudycase.Deactivate()
-    return newstudycase
\ No newline at end of file
+    return newstudycase
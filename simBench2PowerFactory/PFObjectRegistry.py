@@ -0,0 +1,130 @@
+"""#################################################################################################
+                    Registry of the PowerFactory objects that already exist in the project
+####################################################################################################"""
+# The objects of a PowerFactory class are only enumerated when the import first looks one of them up, so the
+# start-up cost depends on the classes the data set actually contains. Objects that are created during the import
+# are added to the registry and are found by later lookups without enumerating again.
+# The ConnectionIndex records which elements are connected to a node while they are created.
+
+
+# objects of one PowerFactory class by their name (SimBench id), used like a dict {loc_name: object}
+class ClassView(object):
+    def __init__(self, registry, key):
+        self.registry = registry
+        self.key = key
+
+    def _objects(self):
+        return self.registry.objects(self.key)
+
+    def get(self, name, default = None):
+        return self._objects().get(name, default)
+
+    def __getitem__(self, name):
+        return self._objects()[name]
+
+    def __setitem__(self, name, pfobject):
+        self.registry.add(self.key, name, pfobject)
+
+    def __contains__(self, name):
+        return name in self._objects()
+
+    # removes a deleted object, returns it or None
+    def pop(self, name):
+        return self.registry.remove(self.key, name)
+
+    # names of the objects added during this import
+    def added(self):
+        return self.registry.added.get(self.key, [])
+
+    def __len__(self):
+        return len(self._objects())
+
+    def __iter__(self):
+        return iter(self._objects())
+
+    def keys(self):
+        return self._objects().keys()
+
+    def values(self):
+        return self._objects().values()
+
+    def items(self):
+        return self._objects().items()
+
+
+class PFObjectRegistry(object):
+    def __init__(self, app):
+        self.app = app
+        self.sources = {}       # key -> function that returns the existing PowerFactory objects
+        self.loaded = {}        # key -> {name: object} of the enumerated and created objects
+        self.created = {}       # key -> {name: object} of objects created before the key was enumerated
+        self.added = {}         # key -> names of all objects added during this import
+
+    # registers where the objects of a key are found: in "folder" (GetContents) or in the calculation relevant
+    # objects of the active study case; "pattern" is the class name pattern (by default the key), "select" filters
+    def register(self, key, folder = None, pattern = None, select = None):
+        pattern = "*." + (pattern or key)
+        if folder is not None:
+            find = lambda: folder.GetContents(pattern)
+        else:
+            find = lambda: self.app.GetCalcRelevantObjects(pattern)
+        if select is not None:
+            self.sources[key] = lambda: [pfobject for pfobject in find() if select(pfobject)]
+        else:
+            self.sources[key] = find
+        return ClassView(self, key)
+
+    def isLoaded(self, key):
+        return key in self.loaded
+
+    # all objects of a key, the existing objects are enumerated on the first call
+    def objects(self, key):
+        objects = self.loaded.get(key)
+        if objects is None:
+            objects = {}
+            for pfobject in self.sources[key]():
+                objects[pfobject.loc_name] = pfobject
+            objects.update(self.created.pop(key, {}))
+            self.loaded[key] = objects
+        return objects
+
+    def get(self, key, name):
+        return self.objects(key).get(name)
+
+    # adds a created object, without enumerating the existing objects of the key
+    def add(self, key, name, pfobject):
+        self.added.setdefault(key, []).append(name)
+        if key in self.loaded:
+            self.loaded[key][name] = pfobject
+        else:
+            self.created.setdefault(key, {})[name] = pfobject
+        return pfobject
+
+    # removes a deleted object; the existing objects are enumerated first, otherwise the object would come back
+    def remove(self, key, name):
+        return self.objects(key).pop(name, None)
+
+
+# elements that are connected directly to a node (external nets, generators, loads, shunts), recorded when they are
+# created; answers "what is connected to this node" without reading the cubicles of the node
+class ConnectionIndex(object):
+    def __init__(self):
+        self.nodes = {}         # node id -> PowerFactory node
+        self.elements = {}      # node id -> [(PowerFactory class, element)] in the order of creation
+
+    def connect(self, nodeid, node, pfclass, element):
+        if nodeid not in self.nodes:
+            self.nodes[nodeid] = node
+            self.elements[nodeid] = []
+        self.elements[nodeid].append((pfclass, element))
+
+    def node(self, nodeid):
+        return self.nodes.get(nodeid)
+
+    # elements connected to the node, only of the given PowerFactory classes if pfclasses is given
+    def connected(self, nodeid, pfclasses = None):
+        return [element for pfclass, element in self.elements.get(nodeid, [])
+                if pfclasses is None or pfclass in pfclasses]
+
+    def nodeids(self):
+        return list(self.nodes)
@@ -0,0 +1,73 @@
+"""#################################################################################################
+                    Assignment of the time characteristics (ChaRef) of loads and generators
+####################################################################################################"""
+# The characteristic references of an element are compared with the references it should have: a reference with
+# the right name and characteristic is kept, a reference with another characteristic is retargeted, missing
+# references are created and all other characteristics of the element are deleted. Elements that were created
+# during the import have no characteristics, they are not searched.
+from collections import Counter
+import PFObjectCreator as pfoc
+
+
+class ProfileBinder(object):
+    def __init__(self, outserv):
+        self.outserv = outserv      # initial state of the characteristic references
+        self.counts = Counter()     # created, retargeted, switched, deleted and unchanged references
+
+    def _create(self, element, name, characteristic):
+        attributes = {"outserv": self.outserv}
+        if characteristic is not None:
+            attributes["typ_id"] = characteristic
+        pfoc.writer.create(element, "ChaRef", name, attributes)
+        self.counts["created"] += 1
+
+    # "refs" are the (name, characteristic or None) the element should have; "new" if the element was created
+    # during this import and cannot have characteristics yet
+    def bind(self, element, refs, new = False):
+        if new:
+            for name, characteristic in refs:
+                self._create(element, name, characteristic)
+            return
+        existing = {}
+        for characteristic in element.GetContents("*.Cha*"):
+            if characteristic.GetClassName() == "ChaRef" and characteristic.loc_name not in existing:
+                existing[characteristic.loc_name] = characteristic
+            else:
+                characteristic.Delete()
+                self.counts["deleted"] += 1
+        for name, characteristic in refs:
+            ref = existing.pop(name, None)
+            if ref is None:
+                self._create(element, name, characteristic)
+                continue
+            unchanged = True
+            if ref.outserv != self.outserv:
+                ref.outserv = self.outserv
+                self.counts["switched"] += 1
+                unchanged = False
+            if ref.typ_id != characteristic:
+                ref.typ_id = characteristic
+                self.counts["retargeted"] += 1
+                unchanged = False
+            if unchanged:
+                self.counts["unchanged"] += 1
+        for ref in existing.values():
+            ref.Delete()
+            self.counts["deleted"] += 1
+
+    # binds the references of the elements of a registry view: "names" are the names of the elements to bind (all if
+    # None), "refs" is a function element -> [(name, characteristic)]
+    def bindAll(self, view, refs, names = None):
+        added = set(view.added())
+        plan = []       # (element, references, new), computed before the first reference is changed
+        for name in (list(view.keys()) if names is None else names):
+            element = view.get(name)
+            if element is not None:
+                plan.append((element, refs(element), name in added))
+        for element, elementrefs, new in plan:
+            self.bind(element, elementrefs, new)
+
+    def summary(self):
+        return "{0} characteristic references created, {1} retargeted, {2} switched, {3} deleted, {4} unchanged".format(
+            self.counts["created"], self.counts["retargeted"], self.counts["switched"], self.counts["deleted"],
+            self.counts["unchanged"])
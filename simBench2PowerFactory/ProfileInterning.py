@@ -0,0 +1,94 @@
+"""#################################################################################################
+                    Interning of identical and scaled profiles of the profile store
+####################################################################################################"""
+# Columns of the profile files that contain the same values (e.g. the same household shape under different names)
+# are interned: the import creates one ChaTime for the first of them and all others refer to it. Columns that are a
+# scalar multiple of another column are found as well; they are reported with their scale factor, but keep their own
+# ChaTime, because a characteristic reference (ChaRef) in PowerFactory cannot scale the characteristic.
+# Identical columns are found by a hash of the float32 values of the profile store, scaled columns by a hash of the
+# columns divided by their value with the largest magnitude; every candidate is compared value by value.
+import hashlib
+
+# relative tolerance of the values of scaled columns
+SCALE_TOLERANCE = 1e-5
+
+
+def _hash(values):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(values)
+    return digest.hexdigest()
+
+# the value with the largest magnitude of a column, 0 if the column is zero or empty
+def _peak(column):
+    if not len(column):
+        return 0.0
+    peak = max(column, key=abs)
+    return peak if peak == peak else 0.0     # NaN is no scale
+
+def _normalized(column, peak):
+    factor = 1.0 / peak
+    return repr([round(value * factor, 5) for value in column]).encode("ascii")
+
+def _isScaled(column, canonical, factor):
+    for value, reference in zip(column, canonical):
+        if abs(value - factor * reference) > SCALE_TOLERANCE * max(abs(value), abs(factor * reference), 1e-12):
+            return False
+    return True
+
+
+class ProfileInterning(object):
+    def __init__(self):
+        self.canonical = {}     # column -> (column of the shared profile, scale factor), only for duplicates
+        self.columns = 0        # number of columns that were compared
+
+    def identical(self, colname):
+        canonical = self.canonical.get(colname)
+        if canonical is not None and canonical[1] == 1.0:
+            return canonical[0]
+        return None
+
+    def duplicates(self):
+        return [colname for colname, (canonical, factor) in self.canonical.items() if factor == 1.0]
+
+    def scaled(self):
+        return [(colname, canonical, factor) for colname, (canonical, factor) in self.canonical.items() if factor != 1.0]
+
+    def summary(self):
+        return "{0} profiles: {1} identical to another profile, {2} scaled copies of another profile".format(
+            self.columns, len(self.duplicates()), len(self.scaled()))
+
+
+# finds the identical and scaled columns of all profile files of the store, in the order of "names" (profile files)
+# and of the columns; the first column of a group is the shared profile
+def internProfiles(store, names = None, scaled = True):
+    interning = ProfileInterning()
+    exact = {}          # hash of the values -> [(profile matrix, column)]
+    shapes = {}         # hash of the normalized values -> [(profile matrix, column, peak)]
+    for name in names or store.names():
+        if name not in store:
+            continue
+        matrix = store.profile(name)
+        for colname in matrix.columns:
+            interning.columns += 1
+            column = matrix.column(colname)
+            candidates = exact.setdefault(_hash(column), [])
+            for othermatrix, othercolumn in candidates:
+                if othermatrix.column(othercolumn) == column:
+                    interning.canonical[colname] = (othercolumn, 1.0)
+                    break
+            else:
+                candidates.append((matrix, colname))
+                if not scaled:
+                    continue
+                peak = _peak(column)
+                if peak == 0.0:
+                    continue
+                candidates = shapes.setdefault(_hash(_normalized(column, peak)), [])
+                for othermatrix, othercolumn, otherpeak in candidates:
+                    factor = peak / otherpeak
+                    if _isScaled(column, othermatrix.column(othercolumn), factor):
+                        interning.canonical[colname] = (othercolumn, factor)
+                        break
+                else:
+                    candidates.append((matrix, colname, peak))
+    return interning
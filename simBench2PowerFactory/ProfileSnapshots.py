@@ -0,0 +1,170 @@
+"""#################################################################################################
+                    Values of the loads and generators at single timesteps of the profiles
+####################################################################################################"""
+# The time characteristics of the import multiply an attribute of an element (plini, qlini, pgini) with the value of
+# its profile column. The same values are computed here without PowerFactory: the base value of the attribute comes
+# from the mapping rules of PFObjectCreator, the profile column from the profile store. A ProfileSeries is one
+# attribute of one element together with its (mapped) profile column.
+import PFObjectCreator as pfoc
+import ProfileStore as ps
+
+# (PowerFactory class, table, attribute, profile file, suffix of the profile column, mapping rule of the attributes)
+PROFILE_ATTRIBUTES = [
+    ("ElmLod", "Load", "plini", "LoadProfile", "_pload", pfoc.loadAttributes),
+    ("ElmLod", "Load", "qlini", "LoadProfile", "_qload", pfoc.loadAttributes),
+    ("ElmGenStat", "RES", "pgini", "RESProfile", "", pfoc.resAttributes),
+    ("ElmGenStat", "Storage", "pgini", "StorageProfile", "", pfoc.storageAttributes),
+    ("ElmSym", "PowerPlant", "pgini", "PowerPlantProfile", "", pfoc.powerplantAttributes),
+]
+
+
+class ProfileSeries(object):
+    def __init__(self, pfclass, table, elementid, attribute, base, matrix, colname, subnet):
+        self.pfclass = pfclass
+        self.table = table
+        self.elementid = elementid      # loc_name of the element
+        self.attribute = attribute
+        self.base = base                # value of the attribute without profile
+        self.matrix = matrix            # ProfileMatrix of the profile file
+        self.colname = colname
+        self.column = matrix.column(colname)
+        self.subnet = subnet
+
+    def value(self, timestep):
+        return self.base * self.column[timestep]
+
+
+# the ProfileSeries of all elements of the compiled model that have a profile column in the store
+def profileSeries(model, store):
+    series = []
+    for pfclass, tablename, attribute, profilefile, suffix, mapping in PROFILE_ATTRIBUTES:
+        if profilefile not in store:
+            continue
+        matrix = store.profile(profilefile)
+        for row in model[tablename]:
+            if row["profile"] is None or row["profile"] + suffix not in matrix:
+                continue
+            base = mapping(row).get(attribute, 0.0) or 0.0
+            series.append(ProfileSeries(pfclass, tablename, row["id"], attribute, base, matrix,
+                                        row["profile"] + suffix, row.get("subnet")))
+    return series
+
+# seconds since 1970-01-01 of a timestamp "DD.MM.YYYY hh:mm" or of seconds (float)
+def _seconds(timestep):
+    try:
+        return ps.parseTimestamp(timestep) if isinstance(timestep, str) else int(timestep)
+    except (ValueError, TypeError):
+        raise ValueError("timestep '{0}' is neither an index nor a timestamp DD.MM.YYYY hh:mm".format(timestep))
+
+# raises a ValueError if the index "timestep" is not a timestep of profiles with "timesteps" rows
+def checkTimestep(timestep, timesteps):
+    if not 0 <= timestep < timesteps:
+        raise ValueError("timestep {0} is outside of the profiles, which have the timesteps 0 to {1}".format(
+            timestep, timesteps - 1))
+
+# index of a timestep of the profiles: "timestep" is an index, or a timestamp "DD.MM.YYYY hh:mm" or seconds since
+# 1970-01-01 (float) of the first matrix of the series
+def timestepIndex(series, timestep):
+    if isinstance(timestep, int):
+        if series:
+            checkTimestep(timestep, min(len(item.column) for item in series))
+        return timestep
+    index = series[0].matrix.timestepAt(_seconds(timestep)) if series else None
+    if index is None:
+        raise ValueError("timestep {0} is before the first timestep of the profiles".format(timestep))
+    return index
+
+# {(PowerFactory class, element id): {attribute: value}} of all series at a timestep
+def snapshotValues(series, timestep):
+    values = {}
+    for item in series:
+        values.setdefault((item.pfclass, item.elementid), {})[item.attribute] = item.base * item.column[timestep]
+    return values
+
+
+# writes the values of one timestep of the profiles directly to the loads and generators of the active project,
+# instead of evaluating their time characteristics. The profile of an element is found like the import assigns it:
+# the profile name in the description (desc) of the element, or the name of the load type (typ_id) of a load. The
+# base values (the values without profile) are read once when the applier is created, so the values of a timestep
+# never depend on the timesteps applied before. The characteristic references (ChaRef) of the written attributes
+# would scale the written values again, the first apply() switches those in service out of service; restore()
+# writes the base values back and switches them on again. With the compiled model of the folder the base values are
+# taken from the csv-files instead of the elements, which is independent of values written by an earlier snapshot.
+class SnapshotApplier(object):
+    def __init__(self, app, store, model = None):
+        self.app = app
+        self.store = store
+        self.bases = {}         # (PowerFactory class, element id, attribute) -> base value of the csv-files
+        if model is not None:
+            for item in profileSeries(model, store):
+                self.bases[(item.pfclass, item.elementid, item.attribute)] = item.base
+        self.series = []        # [element, attribute, base value, profile column, last written value]
+        self.missing = []       # names of the profiles that are not in the store
+        self.characteristics = []   # characteristic references of the written attributes
+        self.switched = None    # characteristic references switched out of service by apply(), None before
+        for load in app.GetCalcRelevantObjects("*.ElmLod"):
+            profile = load.desc[0] if load.desc else (load.typ_id.loc_name if load.typ_id else None)
+            self._add(load, "plini", profile, "_pload")
+            self._add(load, "qlini", profile, "_qload")
+        for generator in app.GetCalcRelevantObjects("*.ElmGenStat") + app.GetCalcRelevantObjects("*.ElmSym"):
+            self._add(generator, "pgini", generator.desc[0] if generator.desc else None, "")
+
+    def _add(self, element, attribute, profile, suffix):
+        if profile is None:
+            return
+        matrix, column = self.store.find(profile + suffix)
+        if matrix is None:
+            self.missing.append(profile + suffix)
+            return
+        base = self.bases.get((element.GetClassName(), element.loc_name, attribute))
+        if base is None:
+            base = getattr(element, attribute)
+        self.series.append([element, attribute, base, column, base])
+        self.characteristics.extend(element.GetContents(attribute + ".ChaRef"))
+
+    def __len__(self):
+        return len(self.series)
+
+    # number of timesteps of the profiles of the series
+    def timesteps(self):
+        return min(len(item[3]) for item in self.series) if self.series else 0
+
+    # index of a timestep (index, "DD.MM.YYYY hh:mm" or seconds since 1970-01-01); raises a ValueError if it is not a
+    # timestep of the profiles
+    def timestepIndex(self, timestep):
+        if not self.series:
+            return timestep
+        index = timestep
+        if not isinstance(timestep, int):
+            index = self.store.profile(self.store.names()[0]).timestepAt(_seconds(timestep))
+            if index is None:
+                raise ValueError("timestep {0} is before the first timestep of the profiles".format(timestep))
+        checkTimestep(index, self.timesteps())
+        return index
+
+    # writes the values of a timestep (index, "DD.MM.YYYY hh:mm" or seconds since 1970-01-01); only values that
+    # differ from the last written value are written; returns the number of written values
+    def apply(self, timestep):
+        timestep = self.timestepIndex(timestep)
+        if self.switched is None:
+            self.switched = [reference for reference in self.characteristics if not reference.outserv]
+            for reference in self.switched:
+                reference.outserv = 1
+        written = 0
+        for item in self.series:
+            value = item[2] * item[3][timestep]
+            if value != item[4]:
+                setattr(item[0], item[1], value)
+                item[4] = value
+                written += 1
+        return written
+
+    # writes the base values back and switches the characteristic references on again
+    def restore(self):
+        for item in self.series:
+            if item[4] != item[2]:
+                setattr(item[0], item[1], item[2])
+                item[4] = item[2]
+        for reference in self.switched or []:
+            reference.outserv = 0
+        self.switched = None
@@ -0,0 +1,221 @@
+"""#################################################################################################
+                    Memory-mapped binary store of the SimBench profiles
+####################################################################################################"""
+# Usage: python ProfileStore.py <SimBench folder> [<store folder>]
+# Every profile csv-file (LoadProfile, RESProfile, StorageProfile, PowerPlantProfile) is parsed once and written to
+# the folder "SimBench2PowerFactory.profiles" in the SimBench folder:
+#   <profile file>.f32      float32 matrix in column-major order (all timesteps of the first column, then the second
+#                           column, ...) in the native byte order, NULL and empty values are NaN
+#   <profile file>.epoch    int64 vector of the timestamps in seconds since 1970-01-01 (the times of the csv-file
+#                           without time zone)
+#   index.json              column names, number of timesteps and hash of the csv-file of every profile file
+# The files are memory-mapped when they are opened, so a column is a zero-copy view (memoryview) of the mapped file.
+# A profile file is only parsed again if its csv-file changed.
+import os
+import sys
+import csv
+import json
+import mmap
+import bisect
+import calendar
+import time
+import hashlib
+from array import array
+
+import CompiledModel as cm
+
+STORE_FOLDER = "SimBench2PowerFactory.profiles"
+STORE_INDEX = "index.json"
+STORE_VERSION = 1
+NAN = float("nan")
+
+
+# seconds since 1970-01-01 of a SimBench timestamp "DD.MM.YYYY hh:mm"; "days" caches the seconds of the dates
+def parseTimestamp(text, days = None):
+    date, _, clock = text.strip().partition(" ")
+    seconds = days.get(date) if days is not None else None
+    if seconds is None:
+        day, month, year = date.split(".")
+        seconds = calendar.timegm((int(year), int(month), int(day), 0, 0, 0))
+        if days is not None:
+            days[date] = seconds
+    if clock:
+        hours, minutes = clock.split(":")[:2]
+        seconds += int(hours) * 3600 + int(minutes) * 60
+    return seconds
+
+# the SimBench timestamp of seconds since 1970-01-01
+def formatTimestamp(seconds):
+    return "{0[2]:02d}.{0[1]:02d}.{0[0]:04d} {0[3]:02d}:{0[4]:02d}".format(time.gmtime(seconds))
+
+def _parseValues(values):
+    try:
+        return array("f", map(float, values))
+    except ValueError:
+        parsed = array("f")
+        for value in values:
+            try:
+                parsed.append(float(value))
+            except ValueError:
+                parsed.append(NAN)     # NULL or empty value
+        return parsed
+
+# parses the profile csv-file "filepath" and writes the matrix and the timestamps of profile "name" to the store
+# folder; returns the index entry of the profile file
+def writeProfile(filepath, storefolder, name, delim = ";"):
+    epochs = array("q")
+    flat = array("f")       # values in row-major order
+    days = {}
+    with open(filepath, "r") as csv_file:
+        reader = csv.reader(csv_file, delimiter=delim)
+        columns = next(reader, [])[1:]
+        ncolumns = len(columns)
+        for row in reader:
+            if not row:
+                continue
+            epochs.append(parseTimestamp(row[0], days))
+            values = row[1:ncolumns + 1]
+            if len(values) < ncolumns:
+                values += [""] * (ncolumns - len(values))
+            flat.extend(_parseValues(values))
+    with open(os.path.join(storefolder, name + ".f32"), "wb") as matrix_file:
+        for colindex in range(ncolumns):
+            flat[colindex::ncolumns].tofile(matrix_file)
+    with open(os.path.join(storefolder, name + ".epoch"), "wb") as epoch_file:
+        epochs.tofile(epoch_file)
+    return {"columns": columns, "rows": len(epochs)}
+
+
+def _mapFile(filepath, typecode):
+    with open(filepath, "rb") as mapped_file:
+        if os.fstat(mapped_file.fileno()).st_size == 0:
+            return None, memoryview(array(typecode))
+        mapped = mmap.mmap(mapped_file.fileno(), 0, access=mmap.ACCESS_READ)
+    return mapped, memoryview(mapped).cast(typecode)
+
+
+# the matrix of one profile file, mapped into memory
+class ProfileMatrix(object):
+    def __init__(self, storefolder, name, entry):
+        self.name = name
+        self.columns = entry["columns"]
+        self.rows = entry["rows"]
+        self.colindex = {colname: colindex for colindex, colname in enumerate(self.columns)}
+        self._matrixmap, self.values = _mapFile(os.path.join(storefolder, name + ".f32"), "f")
+        self._epochmap, self.epochs = _mapFile(os.path.join(storefolder, name + ".epoch"), "q")
+
+    def __contains__(self, colname):
+        return colname in self.colindex
+
+    def __len__(self):
+        return len(self.columns)
+
+    # all values of a column as zero-copy view of the mapped file
+    def column(self, colname):
+        start = self.colindex[colname] * self.rows
+        return self.values[start:start + self.rows]
+
+    def value(self, colname, timestep):
+        return self.values[self.colindex[colname] * self.rows + timestep]
+
+    # values of all columns at a timestep (a copy, the columns are not contiguous)
+    def timestep(self, timestep):
+        return array("f", self.values[timestep::self.rows])
+
+    # index of the last timestep at or before "seconds" (seconds since 1970-01-01), None if it is before the first
+    def timestepAt(self, seconds):
+        index = bisect.bisect_right(self.epochs, seconds) - 1
+        return index if index >= 0 else None
+
+    # unmaps the files; if views of columns are still in use, the files are unmapped when the views are deleted
+    def close(self):
+        try:
+            self.values.release()
+            self.epochs.release()
+            for mapped in (self._matrixmap, self._epochmap):
+                if mapped is not None:
+                    mapped.close()
+        except BufferError:
+            pass
+
+
+# all profile files of a store folder, the matrices are mapped when they are used first
+class ProfileStore(object):
+    def __init__(self, storefolder, index):
+        self.storefolder = storefolder
+        self.index = index          # profile file -> {"columns": [...], "rows": n, "hash": hash of the csv-file}
+        self.matrices = {}
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def names(self):
+        return list(self.index)
+
+    def profile(self, name):
+        matrix = self.matrices.get(name)
+        if matrix is None:
+            matrix = self.matrices[name] = ProfileMatrix(self.storefolder, name, self.index[name])
+        return matrix
+
+    # the matrix that contains the column "colname" and the column, (None, None) if no profile file contains it
+    def find(self, colname):
+        for name, entry in self.index.items():
+            if colname in entry["columns"]:
+                matrix = self.profile(name)
+                return matrix, matrix.column(colname)
+        return None, None
+
+    def close(self):
+        for matrix in self.matrices.values():
+            matrix.close()
+        self.matrices = {}
+
+
+def _csvHash(filepath):
+    digest = hashlib.blake2b(digest_size=16)
+    return digest.hexdigest() if cm.hashFile(digest, filepath) else None
+
+# writes the store of all profile files of a SimBench folder that changed since the store was written and opens it;
+# "storefolder" is by default the folder "SimBench2PowerFactory.profiles" in the SimBench folder
+def openStore(folder, storefolder = None):
+    storefolder = storefolder or os.path.join(folder, STORE_FOLDER)
+    indexfile = os.path.join(storefolder, STORE_INDEX)
+    try:
+        with open(indexfile, "r") as index_file:
+            content = json.load(index_file)
+        files = content["files"] if content.get("version") == STORE_VERSION else {}
+    except (IOError, ValueError, KeyError):
+        files = {}
+    index = {}
+    changed = False
+    for name in cm.PROFILE_FILES:
+        filepath = os.path.join(folder, name + ".csv")
+        csvhash = _csvHash(filepath)
+        if csvhash is None:
+            changed = changed or name in files
+            continue
+        entry = files.get(name)
+        if entry is None or entry.get("hash") != csvhash or \
+                not os.path.exists(os.path.join(storefolder, name + ".f32")):
+            if not os.path.isdir(storefolder):
+                os.makedirs(storefolder)
+            entry = writeProfile(filepath, storefolder, name)
+            entry["hash"] = csvhash
+            changed = True
+        index[name] = entry
+    if changed:
+        with open(indexfile, "w") as index_file:
+            json.dump({"version": STORE_VERSION, "files": index}, index_file)
+    return ProfileStore(storefolder, index)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python ProfileStore.py <SimBench folder> [<store folder>]")
+        sys.exit(1)
+    store = openStore(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    for name in store.names():
+        matrix = store.profile(name)
+        first = formatTimestamp(matrix.epochs[0]) if matrix.rows else "-"
+        print("{0:<20} {1:>6} columns {2:>8} timesteps from {3}".format(name, len(matrix), matrix.rows, first))
+    store.close()
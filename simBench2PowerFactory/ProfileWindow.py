@@ -0,0 +1,100 @@
+"""#################################################################################################
+                    Time window and resampling of the profiles of the profile store
+####################################################################################################"""
+# The profiles are cut to a time window [start, end) and resampled to a coarser time step, e.g. one week of the
+# 15 minute SimBench profiles in hourly resolution. A new timestep aggregates the values of all timesteps of the
+# profile in its interval with the mean or the maximum (for each column on slices of the mapped column). The reduced
+# profiles are written as csv-files in the SimBench format to a sub folder of the profile store, so the ChaTime
+# objects can read them instead of the csv-files of the whole year.
+import os
+import csv
+import bisect
+
+import ProfileStore as ps
+
+AGGREGATIONS = {"mean": lambda values: sum(values) / len(values),
+                "max": max}
+
+
+class ProfileWindow(object):
+    def __init__(self, start = None, end = None, step = None, aggregation = "mean"):
+        if aggregation not in AGGREGATIONS:
+            raise ValueError("unknown aggregation {0}, expected one of {1}".format(aggregation,
+                                                                                   ", ".join(AGGREGATIONS)))
+        self.start = start              # seconds since 1970-01-01 of the first timestep, None = first of the profile
+        self.end = end                  # seconds since 1970-01-01 after the last timestep, None = after the last one
+        self.step = step                # seconds of a new timestep, None = time step of the profile
+        self.aggregation = aggregation
+
+    # window of the input parameters of the import: "start" and "end" as "DD.MM.YYYY hh:mm" or "DD.MM.YYYY",
+    # "step" in minutes; returns None if none of them is given
+    @staticmethod
+    def fromParameters(start = None, end = None, step = None, aggregation = "mean"):
+        if not start and not end and not step:
+            return None
+        return ProfileWindow(ps.parseTimestamp(start) if start else None, ps.parseTimestamp(end) if end else None,
+                             int(step) * 60 if step else None, aggregation or "mean")
+
+    # name of the sub folder of the profile store for the reduced profiles
+    def name(self):
+        def timestamp(seconds):
+            return ps.formatTimestamp(seconds).replace(".", "").replace(" ", "_").replace(":", "") if seconds else "all"
+        return "window_{0}-{1}_{2}{3}".format(timestamp(self.start), timestamp(self.end),
+                                              self.step // 60 if self.step else "all", self.aggregation)
+
+    # (first, last + 1) index of the timesteps of a profile matrix inside the window
+    def timesteps(self, matrix):
+        first = 0 if self.start is None else bisect.bisect_left(matrix.epochs, self.start)
+        last = matrix.rows if self.end is None else bisect.bisect_left(matrix.epochs, self.end)
+        return first, max(first, last)
+
+    # number of timesteps of the profile that form one new timestep
+    def factor(self, matrix):
+        if self.step is None or matrix.rows < 2:
+            return 1
+        profilestep = matrix.epochs[1] - matrix.epochs[0]
+        if profilestep <= 0 or self.step % profilestep:
+            raise ValueError("the time step of {0} ({1} s) does not divide the time step of the window ({2} s)".format(
+                matrix.name, profilestep, self.step))
+        return self.step // profilestep
+
+    # timestamps and the values of all columns (by column name) of a profile matrix inside the window
+    def apply(self, matrix):
+        first, last = self.timesteps(matrix)
+        factor = self.factor(matrix)
+        epochs = list(matrix.epochs[first:last:factor])
+        aggregate = AGGREGATIONS[self.aggregation]
+        columns = {}
+        for colname in matrix.columns:
+            column = matrix.column(colname)[first:last]
+            if factor == 1:
+                columns[colname] = column.tolist()
+            else:
+                columns[colname] = [aggregate(column[index:index + factor]) for index in range(0, len(column), factor)]
+        return epochs, columns
+
+
+# writes the profile file "name" of the store in the window as csv-file to "folder"
+def writeProfile(store, name, window, folder, delim = ";"):
+    matrix = store.profile(name)
+    epochs, columns = window.apply(matrix)
+    with open(os.path.join(folder, name + ".csv"), "w", newline="") as csv_file:
+        writer = csv.writer(csv_file, delimiter=delim)
+        writer.writerow(["time"] + matrix.columns)
+        values = [columns[colname] for colname in matrix.columns]
+        for rowindex, epoch in enumerate(epochs):
+            writer.writerow([ps.formatTimestamp(epoch)] + ["{0:.7g}".format(column[rowindex]) for column in values])
+    return len(epochs)
+
+# writes all profile files of the store in the window to a sub folder of the store, returns the folder and the first
+# timestamp of the reduced profiles (None if they are empty)
+def writeWindow(store, window, names = None):
+    folder = os.path.join(store.storefolder, window.name())
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    start = None
+    for name in names or store.names():
+        if name in store and writeProfile(store, name, window, folder) and start is None:
+            matrix = store.profile(name)
+            start = matrix.epochs[window.timesteps(matrix)[0]]
+    return folder, start
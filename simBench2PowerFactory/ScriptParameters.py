@@ -0,0 +1,14 @@
+"""#################################################################################################
+                    Input parameters of the ComPython objects of the import scripts
+####################################################################################################"""
+
+
+# value of an optional input parameter of the script, "default" if the parameter is not defined
+def scriptParameter(script, name, default = None):
+    try:
+        value = getattr(script, name)
+    except AttributeError:
+        return default
+    if value is None:
+        return default
+    return value
@@ -2,56 +2,93 @@
                                         FUNCTIONS                                                        
 ####################################################################################################"""
 
-# function for opening csv files
+# function for opening csv files, returns a typed table (empty if the file does not exist)
 def importCSVdata(folder, filename, delim = ";"):
-    try:
-        with open(os.path.join(folder,filename+".csv"), "r") as csv_file:
-            reader = csv.DictReader(csv_file, delimiter= delim)
-            return list(reader)
-    except IOError:
-        app.PrintWarn("File {0}.csv does not appear to exist.".format(filename))
-
-# convert a list that contains PowerFactory objects into a dict
-def pfList2Dict(pflist):
-    newdict = {}
-    for listelement in pflist:
-        newdict[listelement.loc_name] = listelement
-    return newdict
+    return sbt.loadTable(folder, filename, delim, warn=app.PrintWarn)
 
 # function for creating new graphical objects in PowerFactory
 def createGraphic(grf_path, grf_name, grf_symbol, dataobject, x, y):
     gridGrf = grf_path
-    Grf = gridGrf.CreateObject("IntGrf",grf_name)
-    Grf.sSymNam = grf_symbol
-    Grf.pDataObj = dataobject
-    Grf.rCenterX = x
-    Grf.rCenterY = y
+    Grf = pfoc.writer.create(gridGrf, "IntGrf", grf_name,
+                             {"sSymNam": grf_symbol, "pDataObj": dataobject, "rCenterX": x, "rCenterY": y})
+    return Grf
 
-def findSlacks(app, nodes, pfNodes):
-    slacks = {}
-    for row in nodes:
-        if (row["vmSetp"] != "NULL" and row["vmSetp"] != "0") and row["vaSetp"] != "NULL" and row["type"] != "auxiliary":
-            slackname = row["id"]
-            slacks[slackname] = [pfNodes.get(slackname), row["vaSetp"]]
-        else:
+# function for creating the connections of a graphical branch object, "routes" are the points from the symbol to
+# each node of the branch
+def createConnections(Grf, routes):
+    for connection, points in enumerate(routes):
+        pfoc.writer.create(Grf, "IntGrfcon", "GCO_{0}".format(connection + 1),
+                           {"iDatConNr": connection, "rX": [x for x, y in points], "rY": [y for x, y in points]})
+
+# delete a PowerFactory element and the cubicles that were created for it (their names end with the id of the element)
+def deleteElement(element, elementid, connections = ("bus1",)):
+    for attribute in connections:
+        cubicle = getattr(element, attribute)
+        if cubicle and (cubicle.loc_name == "Cubicle_" + elementid or cubicle.loc_name.endswith("_" + elementid)):
+            cubicle.Delete()
+    element.Delete()
+
+# creates the ChaTime objects of the columns of a profile file that do not exist yet; columns that are identical to
+# a column of an earlier profile file refer to its ChaTime if the profiles are interned
+def importProfiles(filename, colnames, interning = None):
+    filepath = os.path.join(profilefolder, filename+".csv")
+    for colindex, colname in enumerate(colnames, 2):    #data of the first profile is in the second column
+        if pfProfiles.get(colname):
+            # existing characteristics read the profiles of this import (e.g. of another time window)
+            if pfProfiles.get(colname).f_name != filepath:
+                pfoc.setAttributes(pfProfiles.get(colname), pfoc.timeCharacteristicAttributes(filepath, colindex))
+            continue
+        shared = interning.identical(colname) if interning is not None else None
+        if shared is not None and pfProfiles.get(shared):
+            pfProfiles[colname] = pfProfiles.get(shared)
             continue
+        newChar = pfoc.createTimeCharacteristic(charFolder, colname, filepath, colindex)
+        pfProfiles[newChar.loc_name] = newChar
+
+# slack nodes and their voltage angle, "slacknodes" are the (node id, voltage angle) of the compiled model
+def findSlacks(app, slacknodes, pfNodes):
+    slacks = {}
+    for slackname, vaSetp in slacknodes:
+        slacks[slackname] = [pfNodes.get(slackname), vaSetp]
     if slacks:
         return slacks
     else:
         app.PrintWarn("No slack-nodes found!")
         return None
 
+# shared synchronous machine type of a powerplant, it is created in the library if it does not exist yet
+def machineType(powerplantid):
+    name = types.machineType(powerplantid)
+    if not pfSMTypes.get(name):
+        newSMtype = pfoc.createSMType(libfolder, name, types.machineAttributes[name])
+        pfSMTypes[newSMtype.loc_name] = newSMtype
+    return pfSMTypes.get(name)
+
 """#################################################################################################
                                         MAIN                                                        
 ####################################################################################################"""
 # ===== Import packages =====
 import powerfactory as pf
 import os
-import csv
 from datetime import datetime
 
 #  ===== Import self written modules =====
 import PFObjectCreator as pfoc
+import SimBenchTables as sbt
+import PFObjectRegistry as pfor
+import ImportManifest as im
+import Instrumentation as inst
+import ScriptParameters as sp
+import Validation as val
+import CompiledModel as cm
+import ProfileStore as ps
+import ProfileInterning as pint
+import ProfileWindow as pw
+import ProfileSnapshots as psn
+import CriticalTimesteps as ct
+import ProfileBinder as pb
+import TopologyGraph as tg
+import SingleLineLayout as sll
 
 # ===== Calculate the seconds for setting the studycase time in PF =====
 starttime = datetime(1970, 1, 1, 0, 0, 0)
@@ -95,28 +132,43 @@ folderpath = thisScript.folder          # folder defined as input parameter in t
 if folderpath is False:
     app.PrintError('The chosen folder path "{0}" does not appear to exist!'.format(folderpath))
 
+# --- Optional report of the import stages: 0 = no report, 1 = json- and csv-report next to the folder,
+# 2 = report and summary table in the output window
+report = sp.scriptParameter(thisScript, "report", 0)
+instrumentation = inst.Instrumentation(app, enabled = report > 0)
+maxissues = 50   # number of validation errors and warnings printed to the output window
+# the attribute writes of the created objects are counted by class against the write budget (see AttributeWriter.py)
+pfoc.writer.reset()
+
 # --- Set up loadflow options
 ldf.iopt_plim = 1
 
 """
 Read the csv data and save it temporarily in variables for further steps
 """
-app.PrintPlain("=======START CHECKING THE CSV-FILES=======")
-coordinates = importCSVdata(folderpath, "Coordinates")
-substations = importCSVdata(folderpath, "Substation")
-nodes = importCSVdata(folderpath, "Node")
-switches = importCSVdata(folderpath, "Switch")
-linetypes = importCSVdata(folderpath, "LineType")
-dclinetypes = importCSVdata(folderpath, "DCLineType")
-lines = importCSVdata(folderpath, "Line")
-transformertypes = importCSVdata(folderpath, "Transformertype")
-transformers = importCSVdata(folderpath, "Transformer")
+instrumentation.banner("=======START CHECKING THE CSV-FILES=======")
+# the csv-files are compiled once into a model that is cached in the folder; an unchanged folder is loaded from the
+# cache (input parameter "cache" = 0 compiles the csv-files without cache)
+model, cached = cm.loadModel(folderpath, usecache=sp.scriptParameter(thisScript, "cache", 1) == 1, warn=app.PrintWarn)
+if cached:
+    app.PrintPlain("Compiled model loaded from the cache {0}".format(cm.cacheFile(folderpath)))
+for filename in model.missing:
+    app.PrintWarn("File {0}.csv does not appear to exist.".format(filename))
+coordinates = model["Coordinates"]
+substations = model["Substation"]
+nodes = model["Node"]
+switches = model["Switch"]
+linetypes = model["LineType"]
+dclinetypes = model["DCLineType"]
+lines = model["Line"]
+transformertypes = model["Transformertype"]
+transformers = model["Transformer"]
 # transformertypes3w = importCSVdata(folderpath, "Transformer3Wtype")
 # transroformers3w = importCSVdata(folderpath, "Transformer3W")
-shunts = importCSVdata(folderpath, "Shunt")
-xnets = importCSVdata(folderpath, "ExternalNet")
-loads = importCSVdata(folderpath, "Load")
-powerplants = importCSVdata(folderpath, "PowerPlant")
+shunts = model["Shunt"]
+xnets = model["ExternalNet"]
+loads = model["Load"]
+powerplants = model["PowerPlant"]
 # Check if it is a EHV model, therefore check if data contains powerplants in order to activate time profiles (powerplant are only contained in EHV models)
 activate_timeprofile = 1 # 1 = time profiles are initially out of service/deactivated and must be activated manually in the model if needed
 if powerplants:
@@ -124,16 +176,48 @@ if powerplants:
     # Set loadflow calculation settings to get the same results as in Integral and pandapower
     ldf.iopt_plim = 0
     ldf.iPbalancing = 4
-reses = importCSVdata(folderpath, "RES")
-storages = importCSVdata(folderpath, "Storage")
-measurements = importCSVdata(folderpath, "Measurement")
-studycases = importCSVdata(folderpath, "StudyCases")
+reses = model["RES"]
+storages = model["Storage"]
+measurements = model["Measurement"]
+studycases = model["StudyCases"]
+types = model.types     # types with the same parameters are shared (see TypeInterning.py)
 
 if switches:
     no_sw = False
 else:
     no_sw = True
-app.PrintPlain("=======FINISHED CHECKING THE CSV-FILES======="+"\n")
+instrumentation.banner("=======FINISHED CHECKING THE CSV-FILES======="+"\n")
+
+"""
+Check the references between the csv-files and the values before any object is created
+"""
+instrumentation.banner("=======START VALIDATING THE CSV-FILES=======")
+issues = model.issues   # the csv-files are validated when the model is compiled
+for issue in val.warnings(issues)[:maxissues]:
+    app.PrintWarn(str(issue))
+for issue in val.errors(issues)[:maxissues]:
+    app.PrintError(str(issue))
+if len(val.warnings(issues)) > maxissues or len(val.errors(issues)) > maxissues:
+    app.PrintPlain("{0} errors and {1} warnings in total".format(len(val.errors(issues)), len(val.warnings(issues))))
+if val.errors(issues):
+    raise Exception("{0} invalid value(s) in the csv-files. Python Importscript stopped.".format(len(val.errors(issues))))
+instrumentation.banner("=======FINISHED VALIDATING THE CSV-FILES======="+"\n")
+
+"""
+Check that every island of the topology (closed switches) with loads or generators has a slack
+"""
+instrumentation.banner("=======START CHECKING THE TOPOLOGY=======")
+# input parameter "islands": "warn" = report unsupplied islands, "reject" = stop the import,
+# "outofservice" = set the nodes of unsupplied islands out of service
+islandmode = sp.scriptParameter(thisScript, "islands", "warn")
+islands = tg.analyseIslands(model.topology, model.tables, model.slacks)
+unsupplied = [island for island in islands if island.unsupplied()]
+app.PrintPlain(tg.summary(islands))
+for island in unsupplied[:maxissues]:
+    app.PrintWarn("No slack in the " + island.describe())
+if unsupplied and islandmode == "reject":
+    raise Exception("{0} island(s) without slack. Python Importscript stopped.".format(len(unsupplied)))
+instrumentation.banner("=======FINISHED CHECKING THE TOPOLOGY======="+"\n")
 
 """
 Set needed global variables for import to PowerFactory
@@ -146,93 +230,184 @@ auxnodes = {}   # variable for saving auxiliary nodes
 """
 Save relevant PowerFactory objects of the current application to avoid creating them again
 """
+# the objects of a class are only enumerated when the first object of that class is looked up
+registry = pfor.PFObjectRegistry(app)
+connections = pfor.ConnectionIndex()    # node id -> elements connected to the node during this import
 #Areas
-areaPFO_list = areafolder.GetContents("*.ElmArea")
-pfAreas = pfList2Dict(areaPFO_list)
+pfAreas = registry.register("ElmArea", folder=areafolder)
 #Zones
-zonePFO_list = zonefolder.GetContents("*.ElmZone")
-pfZones = pfList2Dict(zonePFO_list)
+pfZones = registry.register("ElmZone", folder=zonefolder)
 #Substations
-substationPFO_list = app.GetCalcRelevantObjects("*.ElmSubstat")
-pfSubstations = pfList2Dict(substationPFO_list)
+pfSubstations = registry.register("ElmSubstat")
 #Nodes
-nodePFO_list = app.GetCalcRelevantObjects("*.ElmTerm")
-pfNodes = pfList2Dict(nodePFO_list)
+pfNodes = registry.register("ElmTerm")
 #Auxnodes
-pfAuxnodes = {}
-for node in nodePFO_list:
-    if node.iUsage == 2:
-        pfAuxnodes[node.loc_name] = node
+pfAuxnodes = registry.register("ElmTerm:aux", pattern="ElmTerm", select=lambda node: node.iUsage == 2)
 #Couplers
-coupPFO_list = app.GetCalcRelevantObjects("*.ElmCoup")
-pfCouplers = pfList2Dict(coupPFO_list)
+pfCouplers = registry.register("ElmCoup")
 #Switches
-switchPFO_list = app.GetCalcRelevantObjects("*.StaSwitch")
-pfSwitches = pfList2Dict(switchPFO_list)
-#Cubicles
-cubiclePFO_list = app.GetCalcRelevantObjects("*.StaCubicle")
-pfCubicles = pfList2Dict(cubiclePFO_list)
+pfSwitches = registry.register("StaSwitch")
+#Cubicles (only the cubicles created by this import are looked up by name)
+pfCubicles = {}
 #LineTypes
-linetypePFO_list = libfolder.GetContents("*.TypLne")
-pfLineTypes = pfList2Dict(linetypePFO_list)
+pfLineTypes = registry.register("TypLne", folder=libfolder)
 #Lines
-linePFO_list = app.GetCalcRelevantObjects("*.ElmLne")
-pfLines = pfList2Dict(linePFO_list)
+pfLines = registry.register("ElmLne")
 #TranformerTypes
-transformertypePFO_list = libfolder.GetContents("*.TypTr2")
-pfTransformerTypes = pfList2Dict(transformertypePFO_list)
+pfTransformerTypes = registry.register("TypTr2", folder=libfolder)
 #Transformers
-transformerPFO_list = app.GetCalcRelevantObjects("*.ElmTr2")
-pfTransformers = pfList2Dict(transformerPFO_list)
+pfTransformers = registry.register("ElmTr2")
 #External nets
-xnetsPFO_list = app.GetCalcRelevantObjects("*.ElmXnet")
-pfXnets = pfList2Dict(xnetsPFO_list)
+pfXnets = registry.register("ElmXnet")
 #LoadTypes
-loadtypePFO_list = app.GetCalcRelevantObjects("*.TypLod")
-pfLoadTypes = pfList2Dict(loadtypePFO_list)
+pfLoadTypes = registry.register("TypLod")
+#Synchronous machine types
+pfSMTypes = registry.register("TypSym", folder=libfolder)
 #Loads
-loadPFO_list = app.GetCalcRelevantObjects("*.ElmLod")
-pfLoads = pfList2Dict(loadPFO_list)
+pfLoads = registry.register("ElmLod")
 #RES
-resPFO_list = app.GetCalcRelevantObjects("*.ElmGenStat")
-pfRES = pfList2Dict(resPFO_list)
+pfRES = registry.register("ElmGenStat")
 #PowerPlants
-ppPFO_list = app.GetCalcRelevantObjects("*.ElmSym")
-pfPP = pfList2Dict(ppPFO_list)
-#PowerPlants
-shuntsPFO_list = app.GetCalcRelevantObjects("*.ElmShnt")
-pfShunts = pfList2Dict(shuntsPFO_list)
+pfPP = registry.register("ElmSym")
+#Shunts
+pfShunts = registry.register("ElmShnt")
+#Station controllers
+pfStaCtrls = registry.register("ElmStactrl")
 #Profiles
-profilePFO_list = charFolder.GetContents("*.Chatime")
-pfProfiles = pfList2Dict(profilePFO_list)
+pfProfiles = registry.register("ChaTime", folder=charFolder, pattern="Chatime")
 #Measurements
-measurementsPFO_list = app.GetCalcRelevantObjects("*.StaExt*mea")
-pfMeasurements = pfList2Dict(measurementsPFO_list)
+pfMeasurements = registry.register("StaExtmea", pattern="StaExt*mea")
 #Studycases
-studycasesPFO_list = scenfolder.GetContents("*.IntScenario")
-pfStudyCases = pfList2Dict(studycasesPFO_list)
+pfStudyCases = registry.register("IntScenario", folder=scenfolder)
+#Feeders
+pfFeeders = registry.register("ElmFeeder", folder=feederfolder)
 
 """
 Process coordinates data for a graphical representation of the network in PowerFactory
 """
-max_x, min_x, max_y, min_y = None, None, None, None
-coordinates_dict = {}
-if coordinates:
-    x_list = []
-    y_list = []
-    for row in coordinates:
-        x_list.append(float(row["x"]))
-        y_list.append(float(row["y"]))
-        coordinates_dict[row["id"]] = row
-    max_x = max(x_list)
-    min_x = min(x_list)
-    max_y = max(y_list)
-    min_y = min(y_list)
-    gridGrf.iUTrSet = 1
-    gridGrf.rULBotX = (min_x)*1.1
-    gridGrf.rURTopX = (max_x)*1.1
-    gridGrf.rULBotY = (min_y)*1.1
-    gridGrf.rURTopY = (max_y)*1.1
+# GPS- and diagram positions of all nodes and the bounding box of the coordinates, computed in one pass
+positions = model.positions
+if positions:
+    pfoc.setAttributes(gridGrf, positions.diagramFrame())
+
+"""
+Incremental import: apply the changes of the csv-files since the last import to the existing objects
+"""
+# rows without changes are skipped; changed rows are updated in place; objects of removed rows and of rows with
+# changed connections are deleted, the latter are created again by the import below
+incremental = sp.scriptParameter(thisScript, "incremental", 0) == 1
+manifest = im.ImportManifest.load(folderpath, project.GetFullName()) if incremental else None
+diffs = {}
+movedNodes = []     # changed nodes, their subnet and voltage level may have moved them to another area or zone
+if incremental:
+    instrumentation.banner("=======START APPLYING CHANGES SINCE THE LAST IMPORT=======")
+    if manifest is None:
+        # without the hashes of an earlier import every row counts as new: objects that already exist are skipped by
+        # their name and keep their values
+        app.PrintWarn("No manifest of an incremental import of {0} into this project found, existing objects are "
+                      "skipped by name and not updated.".format(folderpath))
+        manifest = im.ImportManifest(project.GetFullName())
+    for table in (nodes, switches, linetypes, lines, transformertypes, transformers, xnets, powerplants, loads,
+                  reses, storages, shunts, studycases):
+        diffs[table.name] = manifest.diff(table)
+        if diffs[table.name]:
+            app.PrintPlain(diffs[table.name].summary())
+    # --- nodes and switches are updated in place, new connections of existing nodes and switches need a new import
+    for rowid in diffs["Node"].changed:
+        row = nodes.get(rowid)
+        node = pfNodes.get(rowid) or pfAuxnodes.get(rowid)
+        if node:
+            node_x, node_y = positions.gps(rowid)
+            if row["type"] == "double busbar":
+                vtarget, uknom, vmin, vmax = pfoc.doubleBusbarValues(row)
+                pfoc.setAttributes(node, pfoc.busbarAttributes(0, vtarget, uknom, vmin, vmax, node_x, node_y))
+            elif row["type"] == "auxiliary":    # auxiliary nodes have no position, area and zone
+                pfoc.setAttributes(node, pfoc.nodeAttributes(row, 2))
+                continue
+            else:
+                pfoc.setAttributes(node, pfoc.nodeAttributes(row, 0, node_x, node_y))
+            movedNodes.append((node, row))
+    for rowid in diffs["Switch"].changed:
+        switch = pfCouplers.get(rowid) or pfSwitches.get(rowid)
+        if switch:
+            pfoc.setAttributes(switch, pfoc.switchAttributes(switches.get(rowid)))
+    for rowid in diffs["Node"].reconnected + diffs["Node"].removed + diffs["Switch"].reconnected + diffs["Switch"].removed:
+        app.PrintWarn("Changed connections of '{0}' are not applied by an incremental import.".format(rowid))
+    # --- types
+    for diff, view, table, attributes in ((diffs["LineType"], pfLineTypes, linetypes, pfoc.lineTypeAttributes),
+                                          (diffs["Transformertype"], pfTransformerTypes, transformertypes, pfoc.transformerTypeAttributes)):
+        for rowid in diff.changed + diff.reconnected:
+            if view.get(rowid):
+                pfoc.setAttributes(view.get(rowid), attributes(table.get(rowid)))
+        for rowid in diff.removed:
+            if view.get(rowid):
+                view.pop(rowid).Delete()
+    if diffs["LineType"] or diffs["Line"] or diffs["Node"]:     # the rated voltages of the line types may have changed
+        for typeid, uline in model.lineVoltages.items():
+            if pfLineTypes.get(typeid):
+                pfLineTypes.get(typeid).uline = uline
+    # --- lines (DC lines are represented by two static generators)
+    for rowid in diffs["Line"].changed:
+        row = lines.get(rowid)
+        if "dcline" in rowid:
+            dclinetype = dclinetypes.get(row["type"])
+            if dclinetype is not None and pfRES.get(rowid+"_from") and pfRES.get(rowid+"_to"):
+                attributesA, attributesB = model.dclines.get(row["type"]) or pfoc.dcLineAttributes(dclinetype)
+                pfoc.setAttributes(pfRES.get(rowid+"_from"), attributesA)
+                pfoc.setAttributes(pfRES.get(rowid+"_to"), attributesB)
+        elif pfLines.get(rowid):
+            pfoc.setAttributes(pfLines.get(rowid), pfoc.lineAttributes(row))
+    for rowid in diffs["Line"].reconnected + diffs["Line"].removed:
+        if "dcline" in rowid:
+            for suffix in ("_from", "_to"):
+                if pfRES.get(rowid+suffix):
+                    deleteElement(pfRES.pop(rowid+suffix), rowid)
+        elif pfLines.get(rowid):
+            deleteElement(pfLines.pop(rowid), rowid, ("bus1", "bus2"))
+    # --- transformers
+    for rowid in diffs["Transformer"].changed:
+        if pfTransformers.get(rowid):
+            pfoc.setAttributes(pfTransformers.get(rowid), pfoc.transformerAttributes(transformers.get(rowid)))
+    for rowid in diffs["Transformer"].reconnected + diffs["Transformer"].removed:
+        if pfTransformers.get(rowid):
+            deleteElement(pfTransformers.pop(rowid), rowid, ("bushv", "buslv"))
+    # --- elements connected to one node
+    for diff, view, table in ((diffs["ExternalNet"], pfXnets, xnets), (diffs["PowerPlant"], pfPP, powerplants),
+                              (diffs["Load"], pfLoads, loads), (diffs["RES"], pfRES, reses),
+                              (diffs["Storage"], pfRES, storages), (diffs["Shunt"], pfShunts, shunts)):
+        for rowid in diff.changed:
+            element = view.get(rowid)
+            row = table.get(rowid)
+            if not element:
+                continue
+            if diff.name == "ExternalNet":
+                pfoc.setAttributes(element, pfoc.xnetAttributes(row, model.xnetSetpoints.get(rowid)))
+            elif diff.name == "PowerPlant":
+                pfoc.setAttributes(element, pfoc.powerplantAttributes(row))
+                element.typ_id = machineType(rowid)     # the types are shared, a changed type is another type
+            elif diff.name == "Load":
+                pfoc.setAttributes(element, pfoc.loadAttributes(row))
+            elif diff.name == "RES":
+                pfoc.setAttributes(element, pfoc.resAttributes(row))
+            elif diff.name == "Storage":
+                pfoc.setAttributes(element, pfoc.storageAttributes(row))
+            elif diff.name == "Shunt":
+                pfoc.setAttributes(element, pfoc.shuntAttributes(row))
+        for rowid in diff.reconnected + diff.removed:
+            element = view.get(rowid)
+            if element:
+                view.pop(rowid)
+                deleteElement(element, rowid)
+    # --- study cases are created again if they or the values they are derived from changed
+    studycaseinputs = [diffs[name] for name in ("ExternalNet", "PowerPlant", "Load", "RES", "Storage")]
+    for row in studycases:
+        rowid = row["Study Case"]
+        if (any(studycaseinputs) or rowid not in diffs["StudyCases"].unchanged) and pfStudyCases.get(rowid):
+            pfStudyCases.pop(rowid).Delete()
+    for rowid in diffs["StudyCases"].removed:
+        if pfStudyCases.get(rowid):
+            pfStudyCases.pop(rowid).Delete()
+    instrumentation.banner("=======FINISHED APPLYING CHANGES SINCE THE LAST IMPORT========="+"\n")
 
 """
 ---------------------------------------------------------------------------------------
@@ -242,16 +417,14 @@ if coordinates:
 """
 Zones and Areas
 """
-app.PrintPlain("=======START IMPORTING ZONES AND AREAS=======")
+instrumentation.banner("=======START IMPORTING ZONES AND AREAS=======")
 #First save needed subnets and voltLvls then create them
 if substations:
     for row in substations:
         area_set.add(row["subnet"])
         zone_set.add(row["voltLvl"])
 for row in nodes:
-    if "Feeder" or "feeder" not in row["subnet"]:
-        area_set.add(row["subnet"])
-    else:
+    if tg.isFeederSubnet(row["subnet"]):  # subnets of the feeders of the LV grids, they are areas as well
         feeder_set.add(row["subnet"])
     area_set.add(row["subnet"])
     zone_set.add(row["voltLvl"])
@@ -266,12 +439,15 @@ for zoneelement in zone_set:
     if not pfZones.get(zoneelement):
         newzone = pfoc.createZone(zonefolder, zoneelement)
         pfZones[newzone.loc_name] = newzone
-app.PrintPlain("=======FINISHED IMPORTING ZONES AND AREAS======="+"\n")
+# changed nodes of an incremental import are assigned to the area and zone of their subnet and voltage level
+for node, row in movedNodes:
+    pfoc.setAttributes(node, {"cpArea": pfAreas.get(row["subnet"]), "cpZone": pfZones.get(row["voltLvl"])})
+instrumentation.banner("=======FINISHED IMPORTING ZONES AND AREAS======="+"\n")
 
 """
 Import Substations
 """
-app.PrintPlain("=======START IMPORTING SUBSTATIONS=======")
+instrumentation.banner("=======START IMPORTING SUBSTATIONS=======")
 if substations:
     for row in substations:
         subArea = pfAreas.get(row["subnet"])
@@ -279,137 +455,58 @@ if substations:
         if not pfSubstations.get(row["id"]):
             newsubstat = pfoc.createSubstation(grid, row["id"], subArea, subZone)
             pfSubstations[newsubstat.loc_name] = newsubstat
-app.PrintPlain("=======FINISHED IMPORTING SUBSTATIONS========="+"\n")
+instrumentation.banner("=======FINISHED IMPORTING SUBSTATIONS========="+"\n")
 
 """
 Import Nodes
 """
-app.PrintPlain("=======START IMPORTING NODES=======")
-bb_idlist = []  # Contains the id (or names) of busbars that belong to a doublebusbar
-dbb_list = []  # Contains lists that contain doublebusbar-pairs
-doublebusbars = []
+instrumentation.banner("=======START IMPORTING NODES=======")
 pfDbusbars = {}
-for row in nodes:
-    if row["type"] == "double busbar":
-        doublebusbars.append(row)
-seen = set()
-seen_add = seen.add
-# adds all elements it doesn't know yet to seen and all other to seen_twice
-seen_twice = set(row["coordID"] for row in doublebusbars if ((row["coordID"] in seen or seen_add(row["coordID"]))))
-# check for busbars that have the same coordID to create doublebusbars
-if seen_twice:
-    for coordid in seen_twice:
-        bb_list = []
-        for row in doublebusbars:  # This loop is for finding the nodes with the same coordID
-            # put the busbars with same coordID in dbb_list
-            if (row["coordID"] == coordid):
-                bb_list.append(row)
-        # now check for busbars in dbb_list with the same voltage -> these are now doublebusbars
-        voltage_seen = set()
-        voltage_seen_add = voltage_seen.add
-        v_seen_twice = set(row["vmR"] for row in bb_list if
-                           row["vmR"] in voltage_seen or voltage_seen_add(row["vmR"]))
-        if v_seen_twice:
-            # loop over the busbar_list with same coordID and delete
-            # the ones that are not doublebusbars, i.e. busbars with the same rated voltage are
-            # considered to be doublebusars
-            nodeAList = []
-            nodeBList = []
-            for vmR in v_seen_twice:
-                bb_one = False
-                for bb in bb_list:
-                    if (bb["vmR"] == vmR):
-                        if bb_one == False:
-                            nodeAList.append(bb)
-                            bb_one = True
-                        elif bb_one == True:
-                            nodeBList.append(bb)
-            # now add these busbars to a list
-            if len(nodeAList) == len(nodeBList):
-                for i in range(0,len(nodeAList)):
-                    nodeA = nodeAList[i]
-                    nodeB = nodeBList[i]
-                    dbb_list.append([nodeA, nodeB])
-        for bb in bb_list:
-            if not v_seen_twice or bb["vmR"] not in v_seen_twice:
-                substatcoordID = bb["coordID"]
-                substatcoord = coordinates_dict.get(substatcoordID)
-                substat_x = float(substatcoord.get("y"))
-                substat_y = float(substatcoord.get("x"))
-                if not pfSubstations.get(bb["substation"]):
-                    substat = pfoc.createSubstation(grid, "Substation_" + bb["id"], pfAreas.get(bb["subnet"]),
-                                                    pfZones.get(bb["voltLvl"]), substat_x, substat_y)
-                    pfSubstations[substat.loc_name] = substat
-                else:
-                    substat = pfSubstations.get(bb["substation"])
-                dbb_node = pfoc.createNode(substat, bb, area=pfAreas.get(bb["subnet"]),
-                                           zone=pfZones.get(bb["voltLvl"]), x=substat_x, y=substat_y)
-                pfDbusbars[dbb_node.loc_name] = dbb_node
-                pfNodes[dbb_node.loc_name] = dbb_node
-    # Check the node_list for doublebusbars that do not belong to a substation and
-    # in these cases create a new substation
-    for doublebusbar in dbb_list:
-        nodeA = doublebusbar[0]
-        nodeB = doublebusbar[1]
-        # check if vmsetp is a float, if there is no value in the csv file then set the value of vmSetp to 1
-        if nodeA["vmSetp"] and nodeA["vmSetp"] != "NULL":
-            vtarget = float(nodeA["vmSetp"])
-        else:
-            vtarget = 1.0
-        uknom = float(nodeA["vmR"])
-        if nodeA["vmMin"]:
-            vmin = float(nodeA["vmMin"])
-        else:
-            vmin = 0.95
-        if nodeA["vmMax"]:
-            vmax = float(nodeA["vmMax"])
-        else:
-            vmax = 1.05
-        if coordinates:        # Get the coordinates
-            substatcoordID = nodeA["coordID"]
-            substatcoord = coordinates_dict.get(substatcoordID)
-            substat_x = float(substatcoord.get("y"))
-            substat_y = float(substatcoord.get("x"))
-        if not pfSubstations.get(row["substation"]):
-            substat = pfoc.createSubstation(grid, nodeA["id"] + "-" + nodeB["id"], pfAreas.get(nodeA["subnet"]), pfZones.get(nodeA["voltLvl"]), substat_x, substat_y)
-            pfSubstations[substat.loc_name] = substat
-        else:
-            substat = pfSubstations.get(row["substation"])
-
-        newnodeA, newnodeB = pfoc.createDoubleBusbar(substat, nodeA["id"], nodeB["id"], 0, vtarget, uknom, vmin, vmax, pfAreas.get(nodeA["subnet"]), pfZones.get(nodeA["voltLvl"]), substat_x, substat_y)
-        pfDbusbars[newnodeA.loc_name] = newnodeA
-        pfDbusbars[newnodeB.loc_name] = newnodeB
-
-        pfNodes[newnodeA.loc_name] = newnodeA
-        pfNodes[newnodeB.loc_name] = newnodeB
-for row in doublebusbars:
-    if row["coordID"] not in seen_twice:
-        if coordinates:
-            substatcoordID = row["coordID"]
-            substatcoord = coordinates_dict.get(substatcoordID)
-            substat_x = float(substatcoord.get("y"))
-            substat_y = float(substatcoord.get("x"))
-        if not pfSubstations.get(row["substation"]):
-            substat = pfoc.createSubstation(grid, "Substation_" + row["id"], pfAreas.get(row["subnet"]),
-                                            pfZones.get(row["voltLvl"]), substat_x, substat_y)
-            pfSubstations[substat.loc_name] = substat
-        else:
-            substat = pfSubstations.get(row["substation"])
-        dbb_node = pfoc.createNode(substat, row, area = pfAreas.get(row["subnet"]), zone = pfZones.get(row["voltLvl"]), x = substat_x, y = substat_y)
-        pfDbusbars[dbb_node.loc_name] = dbb_node
-        pfNodes[dbb_node.loc_name] = dbb_node
+# busbars with the same coordID and the same rated voltage are doublebusbars, all other "double busbar" rows are
+# created as single busbars inside a substation
+dbb_pairs, dbb_singles = model.busbarPairs, model.singleBusbars
+for pair in dbb_pairs:
+    if pfNodes.get(pair.nodeA["id"]) and pfNodes.get(pair.nodeB["id"]):
+        continue
+    nodeA = pair.nodeA
+    nodeB = pair.nodeB
+    vtarget, uknom, vmin, vmax = pfoc.doubleBusbarValues(nodeA)
+    substat_x, substat_y = positions.gps(nodeA["id"])   # Get the coordinates
+    # create a new substation for doublebusbars that do not belong to a substation
+    if not pfSubstations.get(pair.substation):
+        substat = pfoc.createSubstation(grid, pair.substationName, pfAreas.get(nodeA["subnet"]), pfZones.get(nodeA["voltLvl"]), substat_x, substat_y)
+        pfSubstations[substat.loc_name] = substat
+    else:
+        substat = pfSubstations.get(pair.substation)
+
+    newnodeA, newnodeB = pfoc.createDoubleBusbar(substat, nodeA["id"], nodeB["id"], 0, vtarget, uknom, vmin, vmax, pfAreas.get(nodeA["subnet"]), pfZones.get(nodeA["voltLvl"]), substat_x, substat_y)
+    pfDbusbars[newnodeA.loc_name] = newnodeA
+    pfDbusbars[newnodeB.loc_name] = newnodeB
+
+    pfNodes[newnodeA.loc_name] = newnodeA
+    pfNodes[newnodeB.loc_name] = newnodeB
+for single in dbb_singles:
+    row = single.node
+    if pfNodes.get(row["id"]):
+        continue
+    substat_x, substat_y = positions.gps(row["id"])
+    if not pfSubstations.get(single.substation):
+        substat = pfoc.createSubstation(grid, single.substationName, pfAreas.get(row["subnet"]),
+                                        pfZones.get(row["voltLvl"]), substat_x, substat_y)
+        pfSubstations[substat.loc_name] = substat
+    else:
+        substat = pfSubstations.get(single.substation)
+    dbb_node = pfoc.createNode(substat, row, area = pfAreas.get(row["subnet"]), zone = pfZones.get(row["voltLvl"]), x = substat_x, y = substat_y)
+    pfDbusbars[dbb_node.loc_name] = dbb_node
+    pfNodes[dbb_node.loc_name] = dbb_node
 
 for row in nodes:
     nodeArea = pfAreas.get(row["subnet"])
     nodeZone = pfZones.get(row["voltLvl"])
     if row["type"] == "busbar" or row["type"] == "node":
-        if coordinates:        # Get the coordinates
-            nodecoordID = row["coordID"]
-            nodecoord = coordinates_dict.get(nodecoordID)
-            node_x = float(nodecoord.get("y"))
-            node_y = float(nodecoord.get("x"))
+        node_x, node_y = positions.gps(row["id"])   # Get the coordinates
         usage = 0   #set the usage of the PowerFactory node object, 0 for busbar or node, 2 for auxiliary node
-        if (row["substation"]) != "NULL": #check if the node is inside a substation
+        if (row["substation"]) is not None: #check if the node is inside a substation
             substation = pfSubstations.get(row["substation"])
             if not pfNodes.get(row["id"]):
                 newnode = pfoc.createNode(substation, row, nodeArea, nodeZone, usage, node_x, node_y)
@@ -418,28 +515,16 @@ for row in nodes:
             if not pfNodes.get(row["id"]):
                 newnode = pfoc.createNode(grid, row, nodeArea, nodeZone, usage, node_x, node_y)
                 pfNodes[newnode.loc_name] = newnode
-        # Add a graphic-object with coordinates in PowerFactory that represents the node
-        if coordinates:
-            for coord in coordinates:
-                if (coord["id"] == row["coordID"]):
-                    x_coord = (float(coord["x"])) + 10 * abs(min_x)
-                    y_coord = (float(coord["y"])) + 10 * abs(min_y)
-            if 'newnode' in locals(): #check if newnode exists
-                if row["substation"] == "NULL":
-                    createGraphic(gridGrf, newnode.loc_name, "TermStrip", newnode, x_coord, y_coord)
-                elif pfSubstations.get(row["substation"]):
-                    createGraphic(gridGrf, row["substation"], "GeneralCompCirc",
-                                  pfSubstations.get(row["substation"]), x_coord, y_coord)
     elif row["type"] == "auxiliary": #check if it is an auxiliary node
         auxnodes[row["id"]] = row
 
-slacknodes = findSlacks(app, nodes, pfNodes)
-app.PrintPlain("=======FINISHED IMPORTING NODES========="+"\n")
+slacknodes = findSlacks(app, model.slacks, pfNodes)
+instrumentation.banner("=======FINISHED IMPORTING NODES========="+"\n")
 
 """
 Import Switches
 """
-app.PrintPlain("=======START IMPORTING SWITCHES=======")
+instrumentation.banner("=======START IMPORTING SWITCHES=======")
 if not no_sw:
     for row in switches:
         # check if it is a coupler or a switch -> check if one node is an auxiliary node (switch) or not (coupler)
@@ -455,7 +540,7 @@ if not no_sw:
                 newcoupler = pfoc.createCoupler(substation, row, newcubicle1, newcubicle2)
                 pfCouplers[newcoupler.loc_name] = newcoupler
         # check if a bay needs to be created for a double busbar
-        elif not pfSwitches.get(row["id"]):
+        elif not pfSwitches.get(row["id"]) and not pfCouplers.get(row["id"]):  # bays are couplers as well
             if pfDbusbars.get(row["nodeA"]) and auxnodes.get(row["nodeB"]):
                 node = pfDbusbars.get(row["nodeA"])
                 auxnoderow = auxnodes.get(row["nodeB"])
@@ -541,28 +626,30 @@ if not no_sw:
                 # Now create the switch
                 newswitch = pfoc.createSwitch(row, newcubicle)
                 pfSwitches[newswitch.loc_name] = newswitch
-app.PrintPlain("=======FINISHED IMPORTING SWITCHES========="+"\n")
+if islandmode == "outofservice":    # nodes and auxiliary nodes of the unsupplied islands
+    for island in unsupplied:
+        for nodeid in island.nodes:
+            node = pfNodes.get(nodeid) or pfAuxnodes.get(nodeid)
+            if node:
+                node.outserv = 1
+instrumentation.banner("=======FINISHED IMPORTING SWITCHES========="+"\n")
 
 """
 Import LineTypes
 """
-app.PrintPlain("=======START IMPORTING LINETYPES=======")
+instrumentation.banner("=======START IMPORTING LINETYPES=======")
 for row in linetypes:
-    # check if the lineType exist before creating new lineTypes to avoid duplicates
-    if not pfLineTypes.get(row["id"]):
-        newlinetype = pfoc.createLineType(libfolder, row)
+    # check if the lineType exist before creating new lineTypes to avoid duplicates; line types with the same
+    # parameters share the type of the first of them
+    if types.lineType(row["id"]) == row["id"] and not pfLineTypes.get(row["id"]):
+        newlinetype = pfoc.createLineType(libfolder, row, model.lineVoltages.get(row["id"]))
         pfLineTypes[newlinetype.loc_name] = newlinetype
-######### save DCLineTypes in a Python dictionary #########
-if dclinetypes:
-    dclinetypes_dct = {}
-    for row in dclinetypes:
-        dclinetypes_dct[row["id"]] = row
-app.PrintPlain("=======FINISHED IMPORTING LINETYPES========="+"\n")
+instrumentation.banner("=======FINISHED IMPORTING LINETYPES========="+"\n")
 
 """
 Import Lines
 """
-app.PrintPlain("=======START IMPORTING LINES=======")
+instrumentation.banner("=======START IMPORTING LINES=======")
 for row in lines:
     if "dcline" in row["id"]:
         if not pfRES.get(row["id"]+"_from") or not pfRES.get(row["id"]+"_to"):
@@ -574,13 +661,13 @@ for row in lines:
                 cubicleB = pfoc.createCubicle(pfNodes.get(row["nodeB"]), "Cubicle_" + row["id"])
             else:
                 cubicleB = pfoc.createCubicle(pfAuxnodes.get(row["nodeB"]), "Cubicle_" + row["id"])
-        dclinetype = dclinetypes_dct.get(row["type"])
-        newdcline = pfoc.createDCLine(grid, row, cubicleA, cubicleB, dclinetype)
-        pfRES[newdcline[0].loc_name] = newdcline[0]
-        pfRES[newdcline[1].loc_name] = newdcline[1]
+            dclinetype = dclinetypes.get(row["type"])
+            newdcline = pfoc.createDCLine(grid, row, cubicleA, cubicleB, dclinetype, model.dclines.get(row["type"]))
+            pfRES[newdcline[0].loc_name] = newdcline[0]
+            pfRES[newdcline[1].loc_name] = newdcline[1]
     else:
         if not pfLines.get(row["id"]):
-            linetype = pfLineTypes.get(row["type"])
+            linetype = pfLineTypes.get(types.lineType(row["type"]))
             cubicleA = pfCubicles.get(row["nodeA"])
             cubicleB = pfCubicles.get(row["nodeB"])
             if cubicleA == None:
@@ -590,28 +677,33 @@ for row in lines:
                 nodeB = pfNodes.get(row["nodeB"])
                 cubicleB = pfoc.createCubicle(nodeB, nodeB.loc_name+"_"+row["id"])
             newline = pfoc.createLine(grid, row, linetype, cubicleA, cubicleB)
-            if cubicleA.GetParent().uknom > newline.typ_id.uline:
-                newline.typ_id.uline = cubicleA.GetParent().uknom
             pfLines[newline.loc_name] = newline
-app.PrintPlain("=======FINISHED IMPORTING LINES========="+"\n")
+if incremental and (diffs["LineType"] or diffs["Line"] or diffs["Node"]):
+    # changed line types and rated voltages can change which lines share a type
+    for row in lines:
+        line = pfLines.get(row["id"])
+        linetype = pfLineTypes.get(types.lineType(row["type"]))
+        if line and linetype and line.typ_id != linetype:
+            line.typ_id = linetype
+instrumentation.banner("=======FINISHED IMPORTING LINES========="+"\n")
 
 """
 Import TransformerTypes
 """
-app.PrintPlain("=======START IMPORTING TRANSFORMERTYPES=======")
+instrumentation.banner("=======START IMPORTING TRANSFORMERTYPES=======")
 for row in transformertypes:
-    if not pfTransformerTypes.get(row["id"]):
+    if types.transformerType(row["id"]) == row["id"] and not pfTransformerTypes.get(row["id"]):
         newtransformertype = pfoc.createTransformerType(libfolder, row)
         pfTransformerTypes[newtransformertype.loc_name] = newtransformertype
-app.PrintPlain("=======FINISHED IMPORTING TRANSFORMERTYPES========="+"\n")
+instrumentation.banner("=======FINISHED IMPORTING TRANSFORMERTYPES========="+"\n")
 
 """
 Import Transformers
 """
-app.PrintPlain("=======START IMPORTING TRANSFORMERS=======")
+instrumentation.banner("=======START IMPORTING TRANSFORMERS=======")
 for row in transformers:
     if not pfTransformers.get(row["id"]):
-        transformertype = pfTransformerTypes.get(row["type"])
+        transformertype = pfTransformerTypes.get(types.transformerType(row["type"]))
         cubicleHV = pfCubicles.get(row["nodeHV"])
         cubicleLV = pfCubicles.get(row["nodeLV"])
         if cubicleHV == None:
@@ -620,14 +712,42 @@ for row in transformers:
         if cubicleLV == None:
             nodeLV = pfNodes.get(row["nodeLV"])
             cubicleLV = pfoc.createCubicle(nodeLV, nodeLV.loc_name+"_"+row["id"])
-        if (row["substation"]) != "NULL":  # check if transformer is inside a substation
+        if (row["substation"]) is not None:  # check if transformer is inside a substation
             substation = pfSubstations.get(row["substation"])
             newtransformer = pfoc.createTransformer(substation, row, transformertype, cubicleHV, cubicleLV)
             pfTransformers[newtransformer.loc_name] = newtransformer
         else:  # if it is not inside a substation
             newtransformer = pfoc.createTransformer(grid, row, transformertype, cubicleHV, cubicleLV)
             pfTransformers[newtransformer.loc_name] = newtransformer
-app.PrintPlain("=======FINISHED IMPORTING TRANSFORMERS========="+"\n")
+if incremental and diffs["Transformertype"]:    # changed transformer types can change which transformers share a type
+    for row in transformers:
+        transformer = pfTransformers.get(row["id"])
+        transformertype = pfTransformerTypes.get(types.transformerType(row["type"]))
+        if transformer and transformertype and transformer.typ_id != transformertype:
+            transformer.typ_id = transformertype
+instrumentation.banner("=======FINISHED IMPORTING TRANSFORMERS========="+"\n")
+
+"""
+Create a feeder at the LV side of every MV/LV transformer
+"""
+instrumentation.banner("=======START CREATING FEEDERS=======")
+feeders = tg.feeders(model.topology, model.tables)     # nodes behind the transformers up to the open switches
+for feeder in feeders:
+    transformer = pfTransformers.get(feeder.transformer)
+    if not transformer:
+        continue
+    cubicle = transformer.buslv
+    if not pfFeeders.get(feeder.name()):
+        newfeeder = pfoc.createFeeder(feederfolder, feeder.name(), cubicle, feeder.subnets)
+        pfFeeders[newfeeder.loc_name] = newfeeder
+    elif pfFeeders.get(feeder.name()).obj_id != cubicle:   # transformer created again
+        pfFeeders.get(feeder.name()).obj_id = cubicle
+uncovered = feeder_set.difference(*[feeder.subnets for feeder in feeders])
+if uncovered:
+    app.PrintWarn("No MV/LV transformer supplies the feeder subnet(s) " + ", ".join(sorted(uncovered)))
+if feeders:
+    app.PrintPlain("{0} feeders with {1} nodes".format(len(feeders), sum(len(feeder.nodes) for feeder in feeders)))
+instrumentation.banner("=======FINISHED CREATING FEEDERS========="+"\n")
 
 # """
 # Import Transformer3Ws
@@ -646,63 +766,67 @@ app.PrintPlain("=======FINISHED IMPORTING TRANSFORMERS========="+"\n")
 """
 Import ExternalNets
 """
-app.PrintPlain("=======START IMPORTING EXTERNALNETS=======")
+instrumentation.banner("=======START IMPORTING EXTERNALNETS=======")
 if xnets:
     for row in xnets:
         if not pfXnets.get(row["id"]):
             #elements like ExternalNets or Loads are connectet directly to nodes (without switches), therefore the needed cubicles are not in pfCubicles and need to be created
             cubicle = pfoc.createCubicle(pfNodes.get(row["node"]), "Cubicle_"+row["id"])
-            newXnet = pfoc.createXnet(grid, row, cubicle)
+            newXnet = pfoc.createXnet(grid, row, cubicle, model.xnetSetpoints.get(row["id"]))
             pfXnets[newXnet.loc_name] = newXnet
-app.PrintPlain("=======FINISHED IMPORTING EXTERNALNETS========="+"\n")
+            connections.connect(row["node"], pfNodes.get(row["node"]), "ElmXnet", newXnet)
+        else:   # existing external nets are still needed for the slack angle and the study cases
+            connections.connect(row["node"], pfNodes.get(row["node"]), "ElmXnet", pfXnets.get(row["id"]))
+instrumentation.banner("=======FINISHED IMPORTING EXTERNALNETS========="+"\n")
 
 """
 Import Powerplants
 """
-app.PrintPlain("=======START IMPORTING POWERPLANTS=======")
+instrumentation.banner("=======START IMPORTING POWERPLANTS=======")
 if powerplants:
     for row in powerplants:
         if not pfPP.get(row["id"]):
             cubicle = pfoc.createCubicle(pfNodes.get(row["node"]), "Cubicle_" + row["id"])
-            newPP = pfoc.createPowerplant(grid, libfolder, row, cubicle)
+            newPP = pfoc.createPowerplant(grid, row, cubicle, machineType(row["id"]))
             pfPP[newPP.loc_name] = newPP
-app.PrintPlain("=======FINISHED IMPORTING POWERPLANTS========="+"\n")
+            connections.connect(row["node"], pfNodes.get(row["node"]), "ElmSym", newPP)
+        else:
+            connections.connect(row["node"], pfNodes.get(row["node"]), "ElmSym", pfPP.get(row["id"]))
+instrumentation.banner("=======FINISHED IMPORTING POWERPLANTS========="+"\n")
 
 """
 Set slack angle
 """
 slacks = []
 for key in slacknodes:
-    slack_cubicles = slacknodes[key][0].GetContents("*.StaCubic")
-    for cubicle in slack_cubicles:
-        if cubicle.obj_id.GetClassName() == 'ElmXnet':
-            slack = cubicle.obj_id
+    for pfclass, slack in connections.elements.get(key, []):
+        if pfclass == 'ElmXnet':
             slacks.append(slack)
             if slack.bustp == "SL":
-                slack.phiini = float(slacknodes[key][1])
-        elif cubicle.obj_id.GetClassName() == 'ElmSym':
-            slack = cubicle.obj_id
+                slack.phiini = slacknodes[key][1]
+        elif pfclass == 'ElmSym':
             slacks.append(slack)
 
 """
 Import Loads
 """
-app.PrintPlain("=======START IMPORTING LOADS=======")
+instrumentation.banner("=======START IMPORTING LOADS=======")
 if loads:
     for row in loads:
         if not pfLoads.get(row["id"]):
             cubicle = pfoc.createCubicle(pfNodes.get(row["node"]), "Cubicle_" + row["id"])
-            if not pfLoadTypes.get(row["profile"]):
-                newloadtype = pfoc.createLoadType(libfolder, row["profile"])
+            if not pfLoadTypes.get(types.loadtype):    # one load type for all loads, the profile is in desc
+                newloadtype = pfoc.createLoadType(libfolder, types.loadtype)
                 pfLoadTypes[newloadtype.loc_name] = newloadtype
-            newload = pfoc.createLoad(grid, row, cubicle, pfLoadTypes.get(row["profile"]))
+            newload = pfoc.createLoad(grid, row, cubicle, pfLoadTypes.get(types.loadtype))
             pfLoads[newload.loc_name] = newload
-app.PrintPlain("=======FINISHED IMPORTING LOADS========="+"\n")
+            connections.connect(row["node"], pfNodes.get(row["node"]), "ElmLod", newload)
+instrumentation.banner("=======FINISHED IMPORTING LOADS========="+"\n")
 
 """
 Import RES
 """
-app.PrintPlain("=======START IMPORTING RES=======")
+instrumentation.banner("=======START IMPORTING RES=======")
 if reses:
     for row in reses:
         if not pfRES.get(row["id"]):
@@ -712,12 +836,13 @@ if reses:
                 cubicle = pfoc.createCubicle(pfAuxnodes.get(row["node"]), "Cubicle_" + row["id"])
             newres = pfoc.createRES(grid, row, cubicle)
             pfRES[newres.loc_name] = newres
-app.PrintPlain("=======FINISHED IMPORTING RES========="+"\n")
+            connections.connect(row["node"], pfNodes.get(row["node"]) or pfAuxnodes.get(row["node"]), "ElmGenStat", newres)
+instrumentation.banner("=======FINISHED IMPORTING RES========="+"\n")
 
 """
 Import Storage
 """
-app.PrintPlain("=======START IMPORTING STORAGE=======")
+instrumentation.banner("=======START IMPORTING STORAGE=======")
 if storages:
     for row in storages:
         if not pfRES.get(row["id"]):
@@ -727,12 +852,13 @@ if storages:
                 cubicle = pfoc.createCubicle(pfAuxnodes.get(row["node"]), "Cubicle_" + row["id"])
             newstor = pfoc.createStorage(grid, row, cubicle)
             pfRES[newstor.loc_name] = newstor
-app.PrintPlain("=======END IMPORTING STORAGE========="+"\n")
+            connections.connect(row["node"], pfNodes.get(row["node"]) or pfAuxnodes.get(row["node"]), "ElmGenStat", newstor)
+instrumentation.banner("=======END IMPORTING STORAGE========="+"\n")
 
 """
 Import Shunts
 """
-app.PrintPlain("=======START IMPORTING SHUNTS=======")
+instrumentation.banner("=======START IMPORTING SHUNTS=======")
 if shunts:
     for row in shunts:
         if not pfShunts.get(row["id"]):
@@ -742,19 +868,20 @@ if shunts:
                 cubicle = pfoc.createCubicle(pfAuxnodes.get(row["node"]), "Cubicle_" + row["id"])
             newshunt = pfoc.createShunt(grid, row, cubicle)
             pfShunts[newshunt.loc_name] = newshunt
-app.PrintPlain("=======FINISHED IMPORTING SHUNTS========="+"\n")
+            connections.connect(row["node"], pfNodes.get(row["node"]) or pfAuxnodes.get(row["node"]), "ElmShnt", newshunt)
+instrumentation.banner("=======FINISHED IMPORTING SHUNTS========="+"\n")
 
 """
 Import Measurements
 """
-app.PrintPlain("=======START IMPORTING MEASUREMENTS=======")
+instrumentation.banner("=======START IMPORTING MEASUREMENTS=======")
 if measurements:
     for row in measurements:
         if not pfMeasurements.get(row["id"]):
-            if pfNodes.get(row["element1"]) and row["element2"] == "NULL" and row["variable"] == "v":
+            if pfNodes.get(row["element1"]) and row["element2"] is None and row["variable"] == "v":
                 node = pfNodes.get(row["element1"])
                 newmeas = pfoc.createMeasurement(node, row)
-            elif pfNodes.get(row["element1"]) and row["element2"] == "NULL" and row["variable"] != "v":
+            elif pfNodes.get(row["element1"]) and row["element2"] is None and row["variable"] != "v":
                 #In PowerFactory 2019 there is no external p- or q-measurement possible directly at a node, only at a bay of a node
                 newmeas = None
             elif pfNodes.get(row["element1"]):
@@ -771,33 +898,43 @@ if measurements:
                 newmeas = pfoc.createMeasurement(cubicle, row)
             if newmeas:
                 pfMeasurements[newmeas.loc_name] = newmeas
-app.PrintPlain("=======FINISHED IMPORTING MEASUREMENTS========="+"\n")
+instrumentation.banner("=======FINISHED IMPORTING MEASUREMENTS========="+"\n")
 
 """
 Create station controllers for "pv" nodes
 """
-newnodePFO_list = app.GetCalcRelevantObjects("*.ElmTerm")
-for node in newnodePFO_list:
-    StaCtrlNeed = False
-    nodecontents = node.GetContents("*.StaCubic")
-    GenUnits = []
-    for cubicle in nodecontents:
-        if cubicle.obj_id:
-            if (cubicle.obj_id.GetClassName() == 'ElmGenstat' and cubicle.obj_id.av_mode == 'constv') or (cubicle.obj_id.GetClassName() == 'ElmSym' and cubicle.obj_id.av_mode == 'constv'):
-                GenUnits.append(cubicle.obj_id)
-                StaCtrlNeed = True
-    if StaCtrlNeed:
-        pfoc.createStaCtrl(grid, node, GenUnits)
+for nodeid in connections.nodeids():
+    GenUnits = [genunit for genunit in connections.connected(nodeid, ('ElmGenStat', 'ElmSym'))
+                if genunit.av_mode == 'constv']
+    if GenUnits and not pfStaCtrls.get("Stactrl_" + connections.node(nodeid).loc_name):
+        newstactrl = pfoc.createStaCtrl(grid, connections.node(nodeid), GenUnits)
+        pfStaCtrls[newstactrl.loc_name] = newstactrl
 
 """
 Create graphical objects
 """
+instrumentation.banner("=======START CREATING GRAPHICAL OBJECTS=======")
+# input parameter "autolayout": 1 = PowerFactory draws the branches (ComSgllayout), 0 = the branches are drawn with
+# the precomputed routes of the layout and the auto-layout is skipped
+autolayout = sp.scriptParameter(thisScript, "autolayout", 1) == 1
+diagram = sll.computeLayout(model, branches = not autolayout)
+grfElements = {"ElmTerm": pfNodes, "ElmSubstat": pfSubstations, "ElmLne": pfLines, "ElmTr2": pfTransformers}
+existingGrfs = set(grf.loc_name for grf in gridGrf.GetContents("*.IntGrf")) if len(diagram) else set()
+for symbol in diagram:
+    dataobject = grfElements[symbol.pfclass].get(symbol.elementid)
+    if symbol.name in existingGrfs or not dataobject:   # drawn by an earlier import
+        continue
+    Grf = createGraphic(gridGrf, symbol.name, symbol.symbol, dataobject, symbol.x, symbol.y)
+    if symbol.routes:
+        createConnections(Grf, symbol.routes)
 # Final steps for creating graphical objects in PowerFactory
-layout = app.GetFromStudyCase('ComSgllayout')
-layout.iAction = 0
-layout.iGenType = 0
-layout.pGrids = grid
-layout.Execute()
+if autolayout:
+    layout = app.GetFromStudyCase('ComSgllayout')
+    layout.iAction = 0
+    layout.iGenType = 0
+    layout.pGrids = grid
+    layout.Execute()
+instrumentation.banner("=======FINISHED CREATING GRAPHICAL OBJECTS========="+"\n")
 
 """
 ---------------------------------------------------------------------------------------
@@ -805,182 +942,140 @@ layout.Execute()
 ---------------------------------------------------------------------------------------
 """
 """
-Import Loadprofiles
+Write the profiles to the binary profile store
 """
-app.PrintPlain("=======START IMPORTING LOAD PROFILES=======")
+# optional (input parameter "profilestore" = 1): the profiles are written once into memory-mapped float32 matrices in
+# the folder, which are used by the profile options of the import and by offline tools (see ProfileStore.py)
+# identical profiles are interned with the input parameter "internprofiles" = 1, which needs the profile store
+internprofiles = sp.scriptParameter(thisScript, "internprofiles", 0) == 1
+# the profiles are cut to a time window and resampled with the input parameters "profilestart" and "profileend"
+# ("DD.MM.YYYY hh:mm"), "profilestep" (minutes) and "profileaggregation" ("mean" or "max"), which need the profile store
 try:
-    with open(os.path.join(folderpath,"LoadProfile.csv"), "r") as csv_file:
-        reader = csv.DictReader(csv_file, delimiter=';')
-        colnames = list(reader.fieldnames)  #save columnnames of the csv-file in a list
-        colnames.pop(0)                     #remove first columname (time-cloumn) from list
-        colindex=2
-        for colname in colnames:
-            if not pfProfiles.get(colname):
-                newChar = charFolder.CreateObject("ChaTime",colname)
-                newChar.source = 1  # defining external file to be the source
-                newChar.iopt_stamp = 1  # setting Time Stamped Data to be true
-                newChar.timeformat = "DD.MM.YYYY hh:mm"  # Time Format
-                # Path to csv file
-                newChar.f_name = os.path.join(folderpath,"LoadProfile.csv")
-                newChar.usage = 1  # value usage (1 = multiply the parameter value with char-values)
-                newChar.datacol = colindex #setting the column of the inputfile that contains the data
-                colindex = colindex+1
-                newChar.iopt_sep = 0 # defining seperation manually
-                newChar.col_Sep = ";"  # defining column seperator
-                newChar.dec_Sep = "."  # defining decimal seperator
-            pfProfiles[newChar.loc_name] = newChar
-except IOError:
+    window = pw.ProfileWindow.fromParameters(sp.scriptParameter(thisScript, "profilestart"),
+                                             sp.scriptParameter(thisScript, "profileend"),
+                                             sp.scriptParameter(thisScript, "profilestep"),
+                                             sp.scriptParameter(thisScript, "profileaggregation", "mean"))
+except ValueError as error:
+    raise Exception("Invalid time window of the profiles: {0}. Python Importscript stopped.".format(error))
+profilestore = None
+interning = None
+profilefolder = folderpath      # folder of the profile csv-files that are read by the ChaTime objects
+# study cases for the critical timesteps of the profiles with the input parameter "criticaltimesteps" = k (the top-k
+# timesteps per subnet), which needs the profile store
+criticaltimesteps = int(sp.scriptParameter(thisScript, "criticaltimesteps", 0))
+if sp.scriptParameter(thisScript, "profilestore", 0) == 1 or internprofiles or window is not None or criticaltimesteps > 0:
+    instrumentation.banner("=======START WRITING THE PROFILE STORE=======")
+    try:
+        profilestore = ps.openStore(folderpath)
+        for name in profilestore.names():
+            app.PrintPlain("{0}: {1} profiles with {2} timesteps".format(name, len(profilestore.index[name]["columns"]),
+                                                                      profilestore.index[name]["rows"]))
+    except (IOError, ValueError) as error:
+        app.PrintWarn("The profile store could not be written to {0}: {1}".format(folderpath, error))
+    instrumentation.banner("=======FINISHED WRITING THE PROFILE STORE========="+"\n")
+if profilestore is not None and internprofiles:
+    instrumentation.banner("=======START INTERNING PROFILES=======")
+    interning = pint.internProfiles(profilestore, cm.PROFILE_FILES)
+    app.PrintPlain(interning.summary())
+    for colname, shared, factor in interning.scaled():
+        app.PrintPlain("Profile {0} is profile {1} scaled by {2:.6g}".format(colname, shared, factor))
+    instrumentation.banner("=======FINISHED INTERNING PROFILES========="+"\n")
+if profilestore is not None and window is not None:
+    instrumentation.banner("=======START CUTTING THE PROFILES TO THE TIME WINDOW=======")
+    try:
+        profilefolder, windowstart = pw.writeWindow(profilestore, window, cm.PROFILE_FILES)
+    except ValueError as error:
+        raise Exception("{0}. Python Importscript stopped.".format(error))
+    app.PrintPlain("Profiles of the time window written to {0}".format(profilefolder))
+    # the study time is the first timestep of the window (with the same offset as diff_seconds)
+    if windowstart is not None:
+        studycase.SetStudyTime(windowstart - 3600)
+    instrumentation.banner("=======FINISHED CUTTING THE PROFILES TO THE TIME WINDOW========="+"\n")
+
+"""
+Import Loadprofiles
+"""
+instrumentation.banner("=======START IMPORTING LOAD PROFILES=======")
+colnames = model.profilenames["LoadProfile"]   #columnnames of the csv-file without the time-column
+if colnames is None:
     app.PrintWarn("File 'LoadProfile.csv' does not appear to exist.")
-app.PrintPlain("=======FINISHED IMPORTING LOAD PROFILES========="+"\n")
+else:
+    importProfiles("LoadProfile", colnames, interning)
+instrumentation.banner("=======FINISHED IMPORTING LOAD PROFILES========="+"\n")
 
 """
 Assign profiles to loads
 """
-app.PrintPlain("=======START ASSIGNING LOAD PROFILES=======")
-allPFloads = app.GetCalcRelevantObjects('*.ElmLod')
-for load in allPFloads:
-    #Look for all existing (old) characteristics saved in that load-objecr and delete it
-    sOld = load.GetContents('*.Cha*')
-    for i in sOld:
-        i.Delete()
-    # Assign P-profile
-    refObj = load.CreateObject('ChaRef', 'plini')   # Create ChaRef object and name it plini
-    refObj.outserv = activate_timeprofile #initial state of the time characteristics is out of service
-    # Assign created ChaTime to ChaRef
-    if pfProfiles.get(load.typ_id.loc_name+"_pload") != None:
-        refObj.typ_id = pfProfiles.get(load.typ_id.loc_name+"_pload")
-    # Assign Q-profile
-    refObj = load.CreateObject('ChaRef', 'qlini')   # Create ChaRef object and name it qlini
-    refObj.outserv = activate_timeprofile #initial state of the time characteristics is out of service
-    # Assign created ChaTime to ChaRef
-    if pfProfiles.get(load.typ_id.loc_name+"_qload") != None:
-        refObj.typ_id = pfProfiles.get(load.typ_id.loc_name+"_qload")
-app.PrintPlain("=======FINISHED ASSIGNING LOAD PROFILES========="+"\n")
+instrumentation.banner("=======START ASSIGNING LOAD PROFILES=======")
+binder = pb.ProfileBinder(activate_timeprofile)     #initial state of the time characteristics is out of service
+# P- and Q-profile of a load by the profile name in its description (the name of its load type for loads of imports
+# before the load types were shared)
+loadProfile = lambda load: load.desc[0] if load.desc else load.typ_id.loc_name
+loadRefs = lambda load: [("plini", pfProfiles.get(loadProfile(load)+"_pload")),
+                         ("qlini", pfProfiles.get(loadProfile(load)+"_qload"))]
+if incremental:     # only loads that are new or changed since the last import
+    binder.bindAll(pfLoads, loadRefs, list(dict.fromkeys(pfLoads.added() + diffs["Load"].changed)))
+else:
+    binder.bindAll(pfLoads, loadRefs)
+instrumentation.banner("=======FINISHED ASSIGNING LOAD PROFILES========="+"\n")
 
 """
 Import RESProfiles
 """
-app.PrintPlain("=======START IMPORTING RES PROFILES=======")
-try:
-    with open(os.path.join(folderpath,"RESProfile.csv"), "r") as csv_file:
-        reader = csv.DictReader(csv_file, delimiter=';')
-        colnames = list(reader.fieldnames)  #save columnnames of the csv-file in a list
-        colnames.pop(0)                     #remove first columname (time-cloumn) from list
-        colindex=2
-        for colname in colnames:
-            if not pfProfiles.get(colname):
-                newChar = charFolder.CreateObject("ChaTime",colname)
-                newChar.source = 1  # defining external file to be the source
-                newChar.iopt_stamp = 1  # setting Time Stamped Data to be true
-                newChar.timeformat = "DD.MM.YYYY hh:mm"  # Time Format
-                # Path to csv file
-                newChar.f_name = os.path.join(folderpath,"RESProfile.csv")
-                newChar.usage = 1  # value usage (1 = multiply the parameter value with char-values
-                newChar.datacol = colindex #setting the column of the inputfile that contains the data
-                colindex = colindex+1
-                newChar.iopt_sep = 0 # defining seperation manually
-                newChar.col_Sep = ";"  # defining column seperator
-                newChar.dec_Sep = "."  # defining decimal seperator
-                pfProfiles[newChar.loc_name] = newChar
-except IOError:
+instrumentation.banner("=======START IMPORTING RES PROFILES=======")
+colnames = model.profilenames["RESProfile"]   #columnnames of the csv-file without the time-column
+if colnames is None:
     app.PrintWarn("File 'RESProfile.csv' does not appear to exist.")
-app.PrintPlain("=======FINISHED IMPORTING RES PROFILES========="+"\n")
+else:
+    importProfiles("RESProfile", colnames, interning)
+instrumentation.banner("=======FINISHED IMPORTING RES PROFILES========="+"\n")
 
 """
 Import StorageProfiles
 """
-app.PrintPlain("=======START IMPORTING STORAGE PROFILES=======")
-try:
-    with open(os.path.join(folderpath,"StorageProfile.csv"), "r") as csv_file:
-        reader = csv.DictReader(csv_file, delimiter=';')
-        colnames = list(reader.fieldnames)  #save columnnames of the csv-file in a list
-        colnames.pop(0)                     #remove first columname (time-cloumn) from list
-        colindex=2
-        for colname in colnames:
-            if not pfProfiles.get(colname):
-                newChar = charFolder.CreateObject("ChaTime",colname)
-                newChar.source = 1  # defining external file to be the source
-                newChar.iopt_stamp = 1  # setting Time Stamped Data to be true
-                newChar.timeformat = "DD.MM.YYYY hh:mm"  # Time Format
-                # Path to csv file
-                newChar.f_name = os.path.join(folderpath,"StorageProfile.csv")
-                newChar.usage = 1  # value usage (1 = multiply the parameter value with char-values
-                newChar.datacol = colindex #setting the column of the inputfile that contains the data
-                colindex = colindex+1
-                newChar.iopt_sep = 0 # defining seperation manually
-                newChar.col_Sep = ";"  # defining column seperator
-                newChar.dec_Sep = "."  # defining decimal seperator
-                pfProfiles[newChar.loc_name] = newChar
-except IOError:
+instrumentation.banner("=======START IMPORTING STORAGE PROFILES=======")
+colnames = model.profilenames["StorageProfile"]   #columnnames of the csv-file without the time-column
+if colnames is None:
     app.PrintWarn("File 'StorageProfile.csv' does not appear to exist.")
-app.PrintPlain("=======FINISHED IMPORTING RES PROFILES========="+"\n")
+else:
+    importProfiles("StorageProfile", colnames, interning)
+instrumentation.banner("=======FINISHED IMPORTING RES PROFILES========="+"\n")
 
 
 """
 Assign profiles to RES and Storages
 """
-app.PrintPlain("=======START ASSIGNING RES PROFILES=======")
-allPFreses = app.GetCalcRelevantObjects('*.ElmGenstat')
-for res in allPFreses:
-    #Look for all existing characteristics in that RES and delete it
-    sOld = res.GetContents('*.Cha*')
-    for i in sOld:
-        i.Delete()
-    # Create ChaRef object and name it plini
-    refObj = res.CreateObject('ChaRef', 'pgini')
-    refObj.outserv = activate_timeprofile #initial state of the time characteristics is out of service
-    # Assign created ChaTime randomly to ChaRef
-    # if res.desc != None: #pfProfiles.get(res.desc[0]):
-    if res.desc:
-        refObj.typ_id = pfProfiles.get(res.desc[0])
-app.PrintPlain("=======FINISHED ASSIGNING RES PROFILES========="+"\n")
+instrumentation.banner("=======START ASSIGNING RES PROFILES=======")
+# profile of a generator by the profile name in its description
+generatorRefs = lambda generator: [("pgini", pfProfiles.get(generator.desc[0]) if generator.desc else None)]
+if incremental:     # only RES and storages that are new or changed since the last import
+    binder.bindAll(pfRES, generatorRefs,
+                   list(dict.fromkeys(pfRES.added() + diffs["RES"].changed + diffs["Storage"].changed)))
+else:
+    binder.bindAll(pfRES, generatorRefs)
+instrumentation.banner("=======FINISHED ASSIGNING RES PROFILES========="+"\n")
 
 """
 Import PowerPlant profiles
 """
-app.PrintPlain("=======START IMPORTING POWERPLANT PROFILES=======")
-try:
-    with open(os.path.join(folderpath,"PowerPlantProfile.csv"), "r") as csv_file:
-        reader = csv.DictReader(csv_file, delimiter=';')
-        colnames = list(reader.fieldnames)  #save columnnames of the csv-file in a list
-        colnames.pop(0)                     #remove first columname (time-cloumn) from list
-        colindex=2
-        for colname in colnames:
-            if not pfProfiles.get(colname):
-                newChar = charFolder.CreateObject("ChaTime",colname)
-                newChar.source = 1  # defining external file to be the source
-                newChar.iopt_stamp = 1  # setting Time Stamped Data to be true
-                newChar.timeformat = "DD.MM.YYYY hh:mm"  # Time Format
-                # Path to csv file
-                newChar.f_name = os.path.join(folderpath,"PowerPlantProfile.csv")
-                newChar.usage = 1  # value usage (1 = multiply the parameter value with char-values)
-                newChar.datacol = colindex #setting the column of the inputfile that contains the data
-                colindex = colindex+1
-                newChar.iopt_sep = 0 # defining seperation manually
-                newChar.col_Sep = ";"  # defining column seperator
-                newChar.dec_Sep = "."  # defining decimal seperator
-            pfProfiles[newChar.loc_name] = newChar
-except IOError:
+instrumentation.banner("=======START IMPORTING POWERPLANT PROFILES=======")
+colnames = model.profilenames["PowerPlantProfile"]   #columnnames of the csv-file without the time-column
+if colnames is None:
     app.PrintWarn("File 'PowerPlantProfile.csv' does not appear to exist.")
-app.PrintPlain("=======FINISHED IMPORTING POWERPLANT PROFILES========="+"\n")
+else:
+    importProfiles("PowerPlantProfile", colnames, interning)
+instrumentation.banner("=======FINISHED IMPORTING POWERPLANT PROFILES========="+"\n")
 
 """
 Assign profiles to powerplants
 """
-app.PrintPlain("=======START ASSIGNING POWERPLANT PROFILES=======")
-allPFpp = app.GetCalcRelevantObjects('*.ElmSym')
-for pp in allPFpp:
-    #Look for all existing characteristics in that RES and delete it
-    sOld = pp.GetContents('*.Cha*')
-    for i in sOld:
-        i.Delete()
-    # Create ChaRef object and name it plini
-    refObj = pp.CreateObject('ChaRef', 'pgini')
-    refObj.outserv = activate_timeprofile #initial state of the time characteristics is out of service
-    # Assign created ChaTime randomly to ChaRef
-    if pp.desc:
-        refObj.typ_id = pfProfiles.get(pp.desc[0])
-app.PrintPlain("=======FINISHED ASSIGNING POWERPLANT PROFILES========="+"\n")
+instrumentation.banner("=======START ASSIGNING POWERPLANT PROFILES=======")
+if incremental:     # only powerplants that are new or changed since the last import
+    binder.bindAll(pfPP, generatorRefs, list(dict.fromkeys(pfPP.added() + diffs["PowerPlant"].changed)))
+else:
+    binder.bindAll(pfPP, generatorRefs)
+app.PrintInfo(binder.summary())
+instrumentation.banner("=======FINISHED ASSIGNING POWERPLANT PROFILES========="+"\n")
 
 """
 ---------------------------------------------------------------------------------------
@@ -991,17 +1086,61 @@ app.PrintPlain("=======FINISHED ASSIGNING POWERPLANT PROFILES========="+"\n")
 """
 Add studycases
 """
-app.PrintPlain("=======START CREATING STUDY CASES=======")
+instrumentation.banner("=======START CREATING STUDY CASES=======")
 if studycases:
     # Get all loads from the PowerFactory model
     allloads = app.GetCalcRelevantObjects("*.ElmLod")
     # Get all RESes from the PowerFactory model
     allRES = app.GetCalcRelevantObjects("*.ElmGenStat")
-
+    # values without study case, each study case is computed from these values
+    baseline = pfoc.studyCaseBaseline(allloads, allRES, slacks)
     for row in studycases:
         if not pfStudyCases.get(row["Study Case"]):
-            newstudycase = pfoc.createStudyCase(scenfolder, row, allloads, allRES, slacks)
+            newstudycase = pfoc.createStudyCase(scenfolder, row, baseline)
             pfStudyCases[newstudycase.loc_name] = newstudycase
-app.PrintPlain("=======FINISHED CREATING STUDY CASES========="+"\n")
+instrumentation.banner("=======FINISHED CREATING STUDY CASES========="+"\n")
+
+"""
+Add study cases for the critical timesteps of the profiles
+"""
+# every study case contains the values of the loads and generators at one critical timestep (computed from the
+# profile store); the time characteristics have to be out of service when these study cases are used
+if profilestore is not None and criticaltimesteps > 0:
+    instrumentation.banner("=======START CREATING CRITICAL TIMESTEP STUDY CASES=======")
+    series = psn.profileSeries(model, profilestore)
+    elements = {"ElmLod": pfLoads, "ElmGenStat": pfRES, "ElmSym": pfPP}
+    for critical in ct.criticalTimesteps(series, criticaltimesteps):
+        reasons = ["{0}: {1:.6g} MW".format(reason, value) for reason, value in critical.reasons]
+        app.PrintPlain("{0} (timestep {1}): {2}".format(critical.name(), critical.timestep, "; ".join(reasons)))
+        if not pfStudyCases.get(critical.name()):
+            newstudycase = pfoc.createSnapshotStudyCase(scenfolder, critical.name(),
+                                                        psn.snapshotValues(series, critical.timestep), elements, reasons)
+            pfStudyCases[newstudycase.loc_name] = newstudycase
+    instrumentation.banner("=======FINISHED CREATING CRITICAL TIMESTEP STUDY CASES========="+"\n")
+
+# --- Save the hashes of the imported rows for the next incremental import into this project
+if incremental:
+    for table in (nodes, switches, linetypes, lines, transformertypes, transformers, xnets, powerplants, loads, reses,
+                  storages, shunts, studycases):
+        manifest.record(table)
+    try:
+        manifest.save(folderpath)
+    except IOError:
+        app.PrintWarn("The manifest for incremental imports could not be written to {0}.".format(folderpath))
+
+if profilestore is not None:
+    profilestore.close()
+
+app.EchoOn()
 
-app.EchoOn()
\ No newline at end of file
+# --- Write the report of the import stages
+instrumentation.finish()
+if report > 0:
+    reportfiles = instrumentation.writeReport(folderpath, pfoc.writer.rows())
+    app.PrintPlain("Report of the import stages written to {0} and {1}".format(*reportfiles))
+    app.PrintPlain(pfoc.writer.summary())
+    for row in pfoc.writer.overBudget():
+        app.PrintWarn("{0}: {1:.1f} attribute write calls per object, the budget is {2}".format(
+            row["class"], row["callsPerObject"], row["budget"]))
+    if report > 1:
+        instrumentation.printSummary()
@@ -0,0 +1,188 @@
+"""#################################################################################################
+                    Typed, column based tables for the SimBench csv-files
+####################################################################################################"""
+# Every csv-file is parsed once into one column per csv-column: numeric columns are arrays of floats/integers,
+# text columns are lists of (interned) strings. "NULL" and empty cells are marked in a NULL mask and read as None.
+# Rows are light-weight views on the columns, so the creation loops can keep using row["column"].
+import os
+import csv
+import sys
+from array import array
+
+NULL = "NULL"
+
+# numeric columns of the SimBench tables: "d" = float, "q" = integer; all other columns are text
+SCHEMAS = {
+    "Coordinates": {"x": "d", "y": "d"},
+    "Node": {"vmSetp": "d", "vaSetp": "d", "vmR": "d", "vmMin": "d", "vmMax": "d"},
+    "Switch": {"cond": "q"},
+    "LineType": {"r": "d", "x": "d", "b": "d", "iMax": "d"},
+    "DCLineType": {"pDCLine": "d", "relPLosses": "d", "fixPLosses": "d", "pMax": "d", "qMinA": "d", "qMinB": "d",
+                   "qMaxA": "d", "qMaxB": "d"},
+    "Line": {"length": "d", "loadingMax": "d"},
+    "Transformertype": {"sR": "d", "vmHV": "d", "vmLV": "d", "va0": "d", "vmImp": "d", "pCu": "d", "pFe": "d",
+                        "iNoLoad": "d", "tapable": "q", "dVm": "d", "dVa": "d", "tapNeutr": "q", "tapMin": "q",
+                        "tapMax": "q"},
+    "Transformer": {"tappos": "q", "autoTap": "q", "loadingMax": "d"},
+    "Shunt": {"p0": "d", "q0": "d", "vmR": "d", "Step": "q"},
+    "ExternalNet": {"dspf": "d", "pExtNet": "d", "qExtNet": "d"},
+    "Load": {"pLoad": "d", "qLoad": "d", "sR": "d"},
+    "PowerPlant": {"dspf": "d", "pPP": "d", "qPP": "d", "sR": "d", "pMin": "d", "pMax": "d", "qMin": "d", "qMax": "d"},
+    "RES": {"pRES": "d", "qRES": "d", "sR": "d"},
+    "Storage": {"pStor": "d", "qStor": "d", "chargeLevel": "d", "sR": "d", "max_e_mwh": "d",
+                "efficiencyPercent": "d", "selfDischarge": "d", "pMax": "d", "pMin": "d", "qMax": "d", "qMin": "d"},
+    "StudyCases": {"pload": "d", "qload": "d", "Wind_p": "d", "PV_p": "d", "RES_p": "d", "Slack_vm": "d"},
+}
+# column that identifies the rows of a table
+KEYS = {"StudyCases": "Study Case"}
+
+
+# one column of a table; "nulls" is None if the column does not contain NULL values, "invalid" is None if all cells of
+# a numeric column are numbers, otherwise a dict row index -> text of the cells that are not (read as NULL)
+class Column(object):
+    def __init__(self, name, typecode, values, nulls, invalid = None):
+        self.name = name
+        self.typecode = typecode
+        self.values = values
+        self.nulls = nulls
+        self.invalid = invalid
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if self.nulls is not None and self.nulls[index]:
+            return None
+        return self.values[index]
+
+    def isNull(self, index):
+        return self.nulls is not None and self.nulls[index] == 1
+
+
+# view on one row of a table, behaves like the dicts of csv.DictReader but with typed values (None for NULL)
+class Row(object):
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, column):
+        return self.table.columns[column][self.index]
+
+    def get(self, column, default = None):
+        if column not in self.table.columns:
+            return default
+        return self.table.columns[column][self.index]
+
+    def __contains__(self, column):
+        return column in self.table.columns
+
+    def keys(self):
+        return list(self.table.columns)
+
+    def asDict(self):
+        return dict((name, column[self.index]) for name, column in self.table.columns.items())
+
+    def __repr__(self):
+        return "<{0} row {1}>".format(self.table.name, self.asDict())
+
+
+class Table(object):
+    def __init__(self, name, columns, key = "id"):
+        self.name = name
+        self.columns = columns          # column name -> Column, in the order of the csv-file
+        self.key = key
+        self.length = len(next(iter(columns.values()))) if columns else 0
+        self.index = {}                 # id -> row index
+        if key in columns:
+            keycolumn = columns[key]
+            for rowindex in range(self.length):
+                self.index.setdefault(keycolumn[rowindex], rowindex)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        for rowindex in range(self.length):
+            yield Row(self, rowindex)
+
+    def row(self, rowindex):
+        return Row(self, rowindex)
+
+    # row with the given id or None
+    def get(self, rowid):
+        rowindex = self.index.get(rowid)
+        if rowindex is None:
+            return None
+        return Row(self, rowindex)
+
+    def column(self, name):
+        return self.columns[name]
+
+    def __contains__(self, rowid):
+        return rowid in self.index
+
+def _parseNumber(value, typecode):
+    if typecode == "q":
+        try:
+            return int(value)
+        except ValueError:
+            return int(float(value))
+    return float(value)
+
+# build typed columns from the text columns of a csv-file; cells of numeric columns that are not numbers are read as
+# NULL and kept in Column.invalid, the validation reports them
+def buildTable(name, fieldnames, textcolumns):
+    schema = SCHEMAS.get(name, {})
+    columns = {}
+    for fieldname, texts in zip(fieldnames, textcolumns):
+        nulls = bytearray(1 if (text == NULL or text == "") else 0 for text in texts)
+        invalid = {}
+        typecode = schema.get(fieldname)
+        if typecode:
+            values = array(typecode)
+            for rowindex, text in enumerate(texts):
+                if nulls[rowindex]:
+                    values.append(0)
+                    continue
+                try:
+                    values.append(_parseNumber(text, typecode))
+                except (ValueError, OverflowError):
+                    values.append(0)
+                    nulls[rowindex] = 1
+                    invalid[rowindex] = text
+        else:
+            values = [sys.intern(text) for text in texts]
+        columns[fieldname] = Column(fieldname, typecode or "s", values, nulls if any(nulls) else None,
+                                    invalid or None)
+    return Table(name, columns, KEYS.get(name, "id"))
+
+# read a SimBench csv-file into a Table; returns an empty Table if the file does not exist and warn is None,
+# otherwise warn is called with a message
+def loadTable(folder, filename, delim = ";", warn = None):
+    try:
+        with open(os.path.join(folder,filename+".csv"), "r") as csv_file:
+            reader = csv.reader(csv_file, delimiter= delim)
+            fieldnames = next(reader, [])
+            textcolumns = [[] for _ in fieldnames]
+            for line in reader:
+                if not line:
+                    continue
+                for textcolumn, text in zip(textcolumns, line):
+                    textcolumn.append(text)
+                for textcolumn in textcolumns[len(line):]:
+                    textcolumn.append(NULL)
+    except IOError:
+        if warn is not None:
+            warn("File {0}.csv does not appear to exist.".format(filename))
+        return Table(filename, {}, KEYS.get(filename, "id"))
+    return buildTable(filename, fieldnames, textcolumns)
+
+# returns the column names of a profile csv-file without the time column
+def loadProfileNames(folder, filename, delim = ";"):
+    try:
+        with open(os.path.join(folder,filename+".csv"), "r") as csv_file:
+            return next(csv.reader(csv_file, delimiter= delim), [])[1:]
+    except IOError:
+        return None
@@ -0,0 +1,91 @@
+"""#################################################################################################
+                    Precomputed layout of the single line diagram
+####################################################################################################"""
+# The symbols of the single line diagram are placed at the diagram positions of the PositionTable (the coordinates
+# of Coordinates.csv with the offset of the graphic positions): a terminal strip for every node outside a substation
+# and one substation symbol for every substation. Without the auto-layout of PowerFactory (ComSgllayout) the
+# branches are drawn as well: every line and transformer between two placed nodes is routed as a straight connection
+# from its first to its second node with the symbol in the middle. The import creates all graphic objects of the
+# layout in one pass after the elements.
+from array import array
+
+NODE_SYMBOL = "TermStrip"
+SUBSTATION_SYMBOL = "GeneralCompCirc"
+# PowerFactory class, table, column of the first and second node and symbol of the branches
+BRANCHES = [("ElmLne", "Line", "nodeA", "nodeB", "d_lin"),
+            ("ElmTr2", "Transformer", "nodeHV", "nodeLV", "d_tr2")]
+
+
+class Symbol(object):
+    def __init__(self, name, symbol, pfclass, elementid, x, y):
+        self.name = name            # name of the graphic object
+        self.symbol = symbol
+        self.pfclass = pfclass      # class and id of the element that is drawn
+        self.elementid = elementid
+        self.x = x
+        self.y = y
+        self.routes = []            # connections of a branch: [(x, y), ...] from the symbol to each of its nodes
+
+
+class Layout(object):
+    def __init__(self):
+        self.symbols = []
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+
+# symbols of the nodes (type busbar or node) with a position, one symbol per substation
+def _nodeSymbols(nodes, positions):
+    symbols = []
+    substations = set()
+    for row in nodes:
+        if row["type"] != "busbar" and row["type"] != "node":
+            continue
+        position = positions.graphic(row["id"])
+        if position is None:
+            continue
+        if row["substation"] is None:
+            symbols.append(Symbol(row["id"], NODE_SYMBOL, "ElmTerm", row["id"], position[0], position[1]))
+        elif row["substation"] not in substations:
+            substations.add(row["substation"])
+            symbols.append(Symbol(row["substation"], SUBSTATION_SYMBOL, "ElmSubstat", row["substation"],
+                                  position[0], position[1]))
+    return symbols
+
+# symbols and routes of the branches of a table; the diagram positions of both ends are looked up column by column
+def _branchSymbols(table, pfclass, columnA, columnB, symbol, positions):
+    if not len(table):
+        return []
+    rowsA = [positions.coordrows.get(node, -1) for node in table.column(columnA).values]
+    rowsB = [positions.coordrows.get(node, -1) for node in table.column(columnB).values]
+    grf_x, grf_y = positions.grf_x, positions.grf_y
+    xA = array("d", (grf_x[row] if row >= 0 else 0.0 for row in rowsA))
+    yA = array("d", (grf_y[row] if row >= 0 else 0.0 for row in rowsA))
+    xB = array("d", (grf_x[row] if row >= 0 else 0.0 for row in rowsB))
+    yB = array("d", (grf_y[row] if row >= 0 else 0.0 for row in rowsB))
+    symbols = []
+    for rowindex, elementid in enumerate(table.column("id").values):
+        if rowsA[rowindex] < 0 or rowsB[rowindex] < 0:
+            continue
+        x = (xA[rowindex] + xB[rowindex]) / 2
+        y = (yA[rowindex] + yB[rowindex]) / 2
+        branch = Symbol(elementid, symbol, pfclass, elementid, x, y)
+        branch.routes = [[(x, y), (xA[rowindex], yA[rowindex])], [(x, y), (xB[rowindex], yB[rowindex])]]
+        symbols.append(branch)
+    return symbols
+
+# layout of a compiled model: the node and substation symbols and, if "branches", the routed lines and transformers
+def computeLayout(model, branches = False):
+    layout = Layout()
+    positions = model.positions
+    if not positions:
+        return layout
+    layout.symbols = _nodeSymbols(model["Node"], positions)
+    if branches:
+        for pfclass, tablename, columnA, columnB, symbol in BRANCHES:
+            layout.symbols.extend(_branchSymbols(model[tablename], pfclass, columnA, columnB, symbol, positions))
+    return layout
@@ -0,0 +1,231 @@
+"""#################################################################################################
+                    Topology of the grid as sparse graph of the csv-files
+####################################################################################################"""
+# The nodes of the Node-table are the vertices, lines, transformers and closed switches (cond != 0) the edges of the
+# graph; open switches are kept aside and are not part of the adjacency. The adjacency is stored in compressed sparse
+# row (CSR) form: the neighbours of vertex i are targets[offsets[i]:offsets[i+1]], every edge appears once in both
+# directions. Islands (connected components) and paths are found by breadth-first search in O(V+E), so the
+# supply of every island can be checked before the import instead of by a failing load flow.
+from array import array
+from collections import deque
+
+LINE = 0
+SWITCH = 1
+TRANSFORMER = 2
+EDGE_KINDS = {LINE: "line", SWITCH: "switch", TRANSFORMER: "transformer"}
+
+# tables of the elements that inject or consume power at a node
+ELEMENT_TABLES = ["Load", "RES", "Storage", "PowerPlant"]
+# voltage level (voltLvl) of the transformers between medium and low voltage
+MV_LV = "6"
+
+
+class TopologyGraph(object):
+    def __init__(self, nodes, edges):
+        self.nodes = list(nodes)                                    # node ids, index = vertex
+        self.index = {node: vertex for vertex, node in enumerate(self.nodes)}
+        self.elements = [element for element, kind, a, b in edges]  # element id of every edge
+        self.kinds = array("b", (kind for element, kind, a, b in edges))
+        self.open = []                                              # ids of the open switches
+        degree = [0] * (len(self.nodes) + 1)
+        for element, kind, a, b in edges:
+            degree[a + 1] += 1
+            degree[b + 1] += 1
+        for vertex in range(len(self.nodes)):
+            degree[vertex + 1] += degree[vertex]
+        self.offsets = array("l", degree)
+        self.targets = array("l", bytes(self.offsets[-1] * self.offsets.itemsize))
+        self.edgeindex = array("l", bytes(self.offsets[-1] * self.offsets.itemsize))   # edge of every target
+        fill = list(degree[:-1])
+        for edge, (element, kind, a, b) in enumerate(edges):
+            for source, target in ((a, b), (b, a)):
+                self.targets[fill[source]] = target
+                self.edgeindex[fill[source]] = edge
+                fill[source] += 1
+
+    # graph of the Node-, Line-, Transformer- and Switch-table; edges to unknown nodes are left out (reported by the
+    # validation)
+    @staticmethod
+    def fromTables(tables):
+        nodes = [row["id"] for row in tables["Node"]]
+        index = {node: vertex for vertex, node in enumerate(nodes)}
+        edges = []
+        openswitches = []
+
+        def add(element, kind, nodeA, nodeB):
+            if nodeA in index and nodeB in index:
+                edges.append((element, kind, index[nodeA], index[nodeB]))
+
+        for row in tables["Line"]:
+            add(row["id"], LINE, row["nodeA"], row["nodeB"])
+        for row in tables["Transformer"]:
+            add(row["id"], TRANSFORMER, row["nodeHV"], row["nodeLV"])
+        for row in tables["Switch"]:
+            if row["cond"] == 0:
+                openswitches.append(row["id"])
+            else:
+                add(row["id"], SWITCH, row["nodeA"], row["nodeB"])
+        graph = TopologyGraph(nodes, edges)
+        graph.open = openswitches
+        return graph
+
+    def __len__(self):
+        return len(self.nodes)
+
+    # (neighbour node id, element id, edge kind) of all edges of a node
+    def neighbours(self, node):
+        vertex = self.index[node]
+        for position in range(self.offsets[vertex], self.offsets[vertex + 1]):
+            edge = self.edgeindex[position]
+            yield self.nodes[self.targets[position]], self.elements[edge], self.kinds[edge]
+
+    # vertices reachable from "start" (vertex) without the edge kinds in "skip", in breadth-first order; "labels" is
+    # an optional list that is set to "label" for every reached vertex, reached vertices with a label are not visited
+    def _search(self, start, skip = (), labels = None, label = True):
+        seen = labels if labels is not None else [None] * len(self.nodes)
+        seen[start] = label
+        order = [start]
+        queue = deque(order)
+        while queue:
+            vertex = queue.popleft()
+            for position in range(self.offsets[vertex], self.offsets[vertex + 1]):
+                target = self.targets[position]
+                if seen[target] is None and self.kinds[self.edgeindex[position]] not in skip:
+                    seen[target] = label
+                    order.append(target)
+                    queue.append(target)
+        return order
+
+    # node ids of all islands (connected components), in the order of the Node-table
+    def islands(self):
+        labels = [None] * len(self.nodes)
+        islands = []
+        for vertex in range(len(self.nodes)):
+            if labels[vertex] is None:
+                islands.append([self.nodes[target] for target in self._search(vertex, labels=labels,
+                                                                               label=len(islands))])
+        return islands
+
+    # node ids that are reachable from each of the "starts" (node ids) without the edge kinds in "skip"; every node
+    # belongs to the first start that reaches it, so all searches together are linear in the size of the graph
+    def regions(self, starts, skip = ()):
+        labels = [None] * len(self.nodes)
+        regions = []
+        for node in starts:
+            vertex = self.index[node]
+            if labels[vertex] is None:
+                regions.append([self.nodes[target] for target in self._search(vertex, skip, labels, len(regions))])
+            else:   # a start inside the region of an earlier start, e.g. parallel transformers
+                regions.append(regions[labels[vertex]])
+        return regions
+
+    # node ids that are reachable from a node, without the edge kinds in "skip" (e.g. (TRANSFORMER,))
+    def reachable(self, node, skip = ()):
+        return [self.nodes[vertex] for vertex in self._search(self.index[node], skip)]
+
+    def connected(self, nodeA, nodeB):
+        return self.path(nodeA, nodeB) is not None
+
+    # shortest path (number of edges) between two nodes: [(node id, element id to the next node)], the element of
+    # the last node is None; None if the nodes are not connected
+    def path(self, nodeA, nodeB):
+        start = self.index[nodeA]
+        end = self.index[nodeB]
+        parents = {start: None}
+        queue = deque([start])
+        while queue and end not in parents:
+            vertex = queue.popleft()
+            for position in range(self.offsets[vertex], self.offsets[vertex + 1]):
+                target = self.targets[position]
+                if target not in parents:
+                    parents[target] = (vertex, self.edgeindex[position])
+                    queue.append(target)
+        if end not in parents:
+            return None
+        path = [(nodeB, None)]
+        vertex = end
+        while parents[vertex] is not None:
+            vertex, edge = parents[vertex]
+            path.append((self.nodes[vertex], self.elements[edge]))
+        path.reverse()
+        return path
+
+
+class Island(object):
+    def __init__(self, nodes):
+        self.nodes = nodes      # node ids
+        self.slacks = []        # external nets, slack nodes and powerplants with voltage and angle setpoint (vavm)
+        self.elements = 0       # loads and generators connected to the nodes
+
+    # loads or generators without any slack: the load flow cannot calculate the island
+    def unsupplied(self):
+        return self.elements > 0 and not self.slacks
+
+    def describe(self):
+        nodes = ", ".join(self.nodes[:5]) + (", ..." if len(self.nodes) > 5 else "")
+        return "island of {0} node(s) ({1}) with {2} load(s)/generator(s) and {3} slack(s)".format(
+            len(self.nodes), nodes, self.elements, len(self.slacks))
+
+
+# slacks of the tables by node: external nets, slack nodes of the Node-table and powerplants with calc_type vavm
+def slackSources(tables, slacknodes = ()):
+    sources = {}
+    for row in tables["ExternalNet"]:
+        sources.setdefault(row["node"], []).append(row["id"])
+    for row in tables["PowerPlant"]:
+        if row["calc_type"] == "vavm":
+            sources.setdefault(row["node"], []).append(row["id"])
+    for node, vaSetp in slacknodes:
+        if node not in sources:     # the setpoint of an external net or powerplant
+            sources[node] = [node]
+    return sources
+
+# islands of the graph with their slacks and the number of connected loads and generators
+def analyseIslands(graph, tables, slacknodes = ()):
+    islands = [Island(nodes) for nodes in graph.islands()]
+    byNode = {}
+    for island in islands:
+        for node in island.nodes:
+            byNode[node] = island
+    for node, slacks in slackSources(tables, slacknodes).items():
+        if node in byNode:
+            byNode[node].slacks.extend(slacks)
+    for tablename in ELEMENT_TABLES:
+        for node in tables[tablename].column("node").values if "node" in tables[tablename].columns else ():
+            if node in byNode:
+                byNode[node].elements += 1
+    return islands
+
+def summary(islands):
+    return "{0} island(s): {1} unsupplied, {2} with more than one slack".format(
+        len(islands), sum(1 for island in islands if island.unsupplied()),
+        sum(1 for island in islands if len(island.slacks) > 1))
+
+
+# low voltage grid behind a MV/LV transformer: all nodes that are reachable from its LV node without passing a
+# transformer or an open switch
+class Feeder(object):
+    def __init__(self, transformer, node, nodes, subnets):
+        self.transformer = transformer  # transformer id
+        self.node = node                # LV node of the transformer
+        self.nodes = nodes              # node ids of the feeder
+        self.subnets = subnets          # SimBench feeder subnets of the nodes
+
+    def name(self):
+        return self.transformer + "_feeder"
+
+# subnets of the Node-table that are feeders of a LV grid
+def isFeederSubnet(subnet):
+    return subnet is not None and "feeder" in subnet.lower()
+
+# feeders of all MV/LV transformers, one breadth-first search from the LV node of every transformer
+def feeders(graph, tables):
+    transformers = [row for row in tables["Transformer"] if row["voltLvl"] == MV_LV and row["nodeLV"] in graph.index]
+    regions = graph.regions([row["nodeLV"] for row in transformers], skip=(TRANSFORMER,))
+    nodetable = tables["Node"]
+    result = []
+    for row, nodes in zip(transformers, regions):
+        subnets = sorted(set(nodetable.get(node)["subnet"] for node in nodes
+                             if isFeederSubnet(nodetable.get(node)["subnet"])))
+        result.append(Feeder(row["id"], row["nodeLV"], nodes, subnets))
+    return result
@@ -0,0 +1,76 @@
+"""#################################################################################################
+                    Interning of the line, transformer, machine and load types
+####################################################################################################"""
+# Types with the same parameters are created once in the library and shared by all elements: the rows of the
+# LineType- and Transformertype-table with the same attributes share the type of their first row (line types also
+# need the same rated voltage, the highest rated voltage of the nodes of their lines), the powerplants
+# with the same synchronous machine parameters (sR and rated voltage of their node) share the TypSym of the first of
+# them and all loads share one TypLod. The parameters are the attributes of the mapping rules of PFObjectCreator,
+# so the interning is computed from the csv-files when the model is compiled. Since the loads share their type, the
+# name of their profile is saved in their description (desc) like for the generators.
+import PFObjectCreator as pfoc
+
+# name of the load type of all loads
+LOAD_TYPE = "SimBench load"
+
+
+# hashable key of the attributes of a type
+def parameterKey(attributes):
+    return tuple(sorted(attributes.items()))
+
+# id of the row whose type every row of a type table uses: rows with the same attributes use the first of them
+def internRows(table, attributes):
+    canonical = {}
+    first = {}
+    for row in table:
+        canonical[row["id"]] = first.setdefault(parameterKey(attributes(row)), row["id"])
+    return canonical
+
+
+class TypeLibrary(object):
+    def __init__(self):
+        self.lines = {}             # line type id -> id of the shared line type
+        self.transformers = {}      # transformer type id -> id of the shared transformer type
+        self.machines = {}          # powerplant id -> name of the shared synchronous machine type
+        self.machineAttributes = {} # name of a synchronous machine type -> attributes
+        self.loadtype = LOAD_TYPE
+
+    def lineType(self, typeid):
+        return self.lines.get(typeid, typeid)
+
+    def transformerType(self, typeid):
+        return self.transformers.get(typeid, typeid)
+
+    def machineType(self, powerplantid):
+        return self.machines.get(powerplantid)
+
+    # ids of the types that are created, in the order of the table
+    def sharedLineTypes(self):
+        return [typeid for typeid, canonical in self.lines.items() if typeid == canonical]
+
+    def sharedTransformerTypes(self):
+        return [typeid for typeid, canonical in self.transformers.items() if typeid == canonical]
+
+    def summary(self):
+        return "{0} of {1} line types, {2} of {3} transformer types and {4} synchronous machine types for {5} " \
+               "powerplants are created".format(len(self.sharedLineTypes()), len(self.lines),
+                                                 len(self.sharedTransformerTypes()), len(self.transformers),
+                                                 len(self.machineAttributes), len(self.machines))
+
+
+# "lineVoltages" are the rated voltages of the line types (line type id -> kV) before the interning
+def internTypes(tables, lineVoltages = None):
+    library = TypeLibrary()
+    lineVoltages = lineVoltages or {}
+    library.lines = internRows(tables["LineType"],
+                               lambda row: dict(pfoc.lineTypeAttributes(row), uline=lineVoltages.get(row["id"])))
+    library.transformers = internRows(tables["Transformertype"], pfoc.transformerTypeAttributes)
+    nodes = tables["Node"]
+    names = {}      # parameter key -> name of the machine type
+    for row in tables["PowerPlant"]:
+        node = nodes.get(row["node"])
+        attributes = pfoc.smTypeAttributes(row, node["vmR"] if node is not None else None)
+        name = names.setdefault(parameterKey(attributes), row["id"] + "_type")
+        library.machines[row["id"]] = name
+        library.machineAttributes.setdefault(name, attributes)
+    return library
@@ -0,0 +1,254 @@
+"""#################################################################################################
+                    Validation of the SimBench csv-files before the import
+####################################################################################################"""
+# Checks the parsed tables of a SimBench folder before any PowerFactory object is created: unique ids, references
+# between the tables (nodes, types, coordinates, substations, profiles), values that must not be NULL and value
+# ranges. Cells of numeric columns that are not numbers are reported as errors. The checks work on whole columns:
+# every referenced table is indexed once and each reference column is joined against that index.
+
+ERROR = "error"
+WARNING = "warning"
+
+# (table, column, referenced tables, NULL allowed, severity); profiles are checked separately
+REFERENCES = [
+    ("Node", "coordID", ("Coordinates",), True, ERROR),
+    ("Node", "substation", ("Substation",), True, ERROR),
+    ("Switch", "nodeA", ("Node",), False, ERROR),
+    ("Switch", "nodeB", ("Node",), False, ERROR),
+    ("Line", "nodeA", ("Node",), False, ERROR),
+    ("Line", "nodeB", ("Node",), False, ERROR),
+    ("Transformer", "nodeHV", ("Node",), False, ERROR),
+    ("Transformer", "nodeLV", ("Node",), False, ERROR),
+    ("Transformer", "type", ("Transformertype",), False, ERROR),
+    ("Transformer", "substation", ("Substation",), True, ERROR),
+    ("ExternalNet", "node", ("Node",), False, ERROR),
+    ("PowerPlant", "node", ("Node",), False, ERROR),
+    ("Load", "node", ("Node",), False, ERROR),
+    ("RES", "node", ("Node",), False, ERROR),
+    ("Storage", "node", ("Node",), False, ERROR),
+    ("Shunt", "node", ("Node",), False, ERROR),
+    ("Measurement", "element1", ("Node", "Line", "Transformer"), False, WARNING),
+]
+
+# columns that are used by the mapping rules without a default value
+REQUIRED = {
+    "Coordinates": ("x", "y"),
+    "Node": ("vmR", "vmMin", "vmMax"),
+    "LineType": ("r", "x", "b", "iMax"),
+    "DCLineType": ("pDCLine", "relPLosses", "fixPLosses"),
+    "Line": ("length",),
+    "Transformertype": ("sR", "vmHV", "vmLV", "va0", "vmImp", "pCu", "pFe", "iNoLoad"),
+    "Transformer": ("tappos", "autoTap", "loadingMax"),
+    "Shunt": ("q0", "vmR", "Step"),
+    "PowerPlant": ("sR", "pMin", "pMax", "qMin", "qMax"),
+    "Load": ("pLoad", "qLoad"),
+    "RES": ("pRES", "qRES", "sR"),
+    "Storage": ("pStor", "qStor", "sR", "pMin", "pMax", "qMin", "qMax"),
+}
+
+# (table, column, value, columns): columns that are required in the rows in which "column" has "value"
+REQUIRED_IF = [
+    ("Transformertype", "tapable", 1, ("dVm", "dVa", "tapNeutr", "tapMin", "tapMax")),
+]
+
+# (table, column, minimum, maximum, severity); None means no limit, NULL values are not checked
+RANGES = [
+    ("Node", "vmR", 1e-9, None, ERROR),
+    ("Node", "vmSetp", 0, None, WARNING),
+    ("LineType", "iMax", 1e-9, None, ERROR),
+    ("Line", "length", 0, None, ERROR),
+    ("Line", "loadingMax", 0, None, WARNING),
+    ("Transformertype", "sR", 1e-9, None, ERROR),
+    ("Transformertype", "vmHV", 1e-9, None, ERROR),
+    ("Transformertype", "vmLV", 1e-9, None, ERROR),
+    ("Transformer", "loadingMax", 0, None, WARNING),
+    ("Shunt", "Step", 0, None, WARNING),
+    ("RES", "sR", 0, None, WARNING),
+]
+
+# profile column(s) of a row by table: (profile file, suffixes of the column names)
+PROFILES = {
+    "Load": ("LoadProfile", ("_pload", "_qload")),
+    "RES": ("RESProfile", ("",)),
+    "Storage": ("StorageProfile", ("",)),
+    "PowerPlant": ("PowerPlantProfile", ("",)),
+}
+
+
+class Issue(object):
+    def __init__(self, severity, table, rowid, column, message):
+        self.severity = severity
+        self.table = table
+        self.rowid = rowid
+        self.column = column
+        self.message = message
+
+    def __str__(self):
+        return "{0}.csv, {1} '{2}': {3}".format(self.table, self.column, self.rowid, self.message)
+
+    def __repr__(self):
+        return "<{0} {1}>".format(self.severity, self)
+
+
+def _rowids(table):
+    keycolumn = table.columns.get(table.key)
+    return keycolumn.values if keycolumn is not None else range(len(table))
+
+def _checkUniqueIds(table, issues):
+    seen = set()
+    for rowid in _rowids(table):
+        if rowid in seen:
+            issues.append(Issue(ERROR, table.name, rowid, table.key, "id is not unique"))
+        seen.add(rowid)
+
+def _checkReferences(tables, issues):
+    index = {}  # table name -> set of ids, every table is indexed once
+    for tablename, columnname, targets, nullable, severity in REFERENCES:
+        table = tables.get(tablename)
+        if table is None or not len(table) or columnname not in table.columns:
+            continue
+        # references to tables that are missing completely are not checked (e.g. a folder without coordinates)
+        targettables = [tables[target] for target in targets if target in tables and len(tables[target])]
+        if not targettables:
+            continue
+        ids = set()
+        for target in targettables:
+            if target.name not in index:
+                index[target.name] = set(_rowids(target))
+            ids |= index[target.name]
+        column = table.columns[columnname]
+        for rowid, value in zip(_rowids(table), (column[i] for i in range(len(column)))):
+            if value is None:
+                if not nullable:
+                    issues.append(Issue(severity, tablename, rowid, columnname, "reference is NULL"))
+            elif value not in ids:
+                issues.append(Issue(severity, tablename, rowid, columnname,
+                                    "'{0}' does not exist in {1}".format(value, "/".join(targets))))
+
+# AC lines reference a line type, DC lines (lines with "dcline" in their id, as in the import) a DC line type
+def _checkLineTypes(tables, issues):
+    lines = tables.get("Line")
+    if lines is None or not len(lines) or "type" not in lines.columns:
+        return
+    typeids = dict((name, set(_rowids(tables[name])) if name in tables and len(tables[name]) else set())
+                   for name in ("LineType", "DCLineType"))
+    column = lines.columns["type"]
+    for rowindex, rowid in enumerate(_rowids(lines)):
+        target = "DCLineType" if "dcline" in rowid else "LineType"
+        value = column[rowindex]
+        if value is None:
+            issues.append(Issue(ERROR, "Line", rowid, "type", "reference is NULL"))
+        elif value not in typeids[target]:
+            issues.append(Issue(ERROR, "Line", rowid, "type", "'{0}' does not exist in {1}".format(value, target)))
+
+# cells of numeric columns that are not numbers
+def _checkNumbers(tables, issues):
+    for tablename, table in tables.items():
+        rowids = _rowids(table)
+        for columnname, column in table.columns.items():
+            for rowindex, text in sorted((column.invalid or {}).items()):
+                issues.append(Issue(ERROR, tablename, rowids[rowindex], columnname,
+                                    "value '{0}' is not a number".format(text)))
+
+# NULL values of a required column in the rows with an index in "rows" (all rows if it is None)
+def _requiredNulls(table, columnname, rows, issues):
+    column = table.columns.get(columnname)
+    if column is None:
+        issues.append(Issue(ERROR, table.name, "*", columnname, "column is missing"))
+    elif column.nulls is not None:
+        rowids = _rowids(table)
+        invalid = column.invalid or {}
+        for rowindex in (i for i, null in enumerate(column.nulls) if null and i not in invalid):
+            if rows is None or rowindex in rows:
+                issues.append(Issue(ERROR, table.name, rowids[rowindex], columnname, "value is NULL"))
+
+def _checkRequired(tables, issues):
+    for tablename, columnnames in REQUIRED.items():
+        table = tables.get(tablename)
+        if table is None or not len(table):
+            continue
+        for columnname in columnnames:
+            _requiredNulls(table, columnname, None, issues)
+    for tablename, conditioncolumn, value, columnnames in REQUIRED_IF:
+        table = tables.get(tablename)
+        if table is None or not len(table) or conditioncolumn not in table.columns:
+            continue
+        condition = table.columns[conditioncolumn]
+        rows = set(i for i in range(len(condition)) if condition[i] == value)
+        if not rows:
+            continue
+        for columnname in columnnames:
+            _requiredNulls(table, columnname, rows, issues)
+
+def _checkRanges(tables, issues):
+    for tablename, columnname, minimum, maximum, severity in RANGES:
+        table = tables.get(tablename)
+        if table is None or columnname not in table.columns:
+            continue
+        column = table.columns[columnname]
+        rowids = _rowids(table)
+        for rowindex, value in enumerate(column.values):
+            if column.nulls is not None and column.nulls[rowindex]:
+                continue
+            if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+                issues.append(Issue(severity, tablename, rowids[rowindex], columnname,
+                                    "value {0} is out of range".format(value)))
+    # tap positions of the transformers must be inside the range of their type
+    transformertypes = tables.get("Transformertype")
+    transformers = tables.get("Transformer")
+    if transformertypes is None or transformers is None:
+        return
+    for row in transformertypes:
+        if row.get("tapable") == 1 and None not in (row["tapMin"], row["tapNeutr"], row["tapMax"]):
+            if not row["tapMin"] <= row["tapNeutr"] <= row["tapMax"]:
+                issues.append(Issue(ERROR, "Transformertype", row["id"], "tapNeutr",
+                                    "neutral tap position is not between tapMin and tapMax"))
+    for row in transformers:
+        trafotype = transformertypes.get(row["type"])
+        if trafotype is None or trafotype.get("tapable") != 1 or row["tappos"] is None:
+            continue
+        if trafotype["tapMin"] is not None and trafotype["tapMax"] is not None and \
+                not trafotype["tapMin"] <= row["tappos"] <= trafotype["tapMax"]:
+            issues.append(Issue(WARNING, "Transformer", row["id"], "tappos",
+                                "tap position {0} is outside of the range of type '{1}'".format(row["tappos"],
+                                                                                                 row["type"])))
+
+def _checkProfiles(tables, profilenames, issues):
+    for tablename, (profilefile, suffixes) in PROFILES.items():
+        table = tables.get(tablename)
+        if table is None or not len(table) or "profile" not in table.columns:
+            continue
+        names = profilenames.get(profilefile)
+        if names is None:
+            continue    # the missing profile file is reported by the import
+        names = set(names)
+        column = table.columns["profile"]
+        for rowid, profile in zip(_rowids(table), (column[i] for i in range(len(column)))):
+            if profile is None:
+                continue
+            missing = [profile + suffix for suffix in suffixes if profile + suffix not in names]
+            if missing:
+                issues.append(Issue(WARNING, tablename, rowid, "profile",
+                                    "profile column(s) {0} do not exist in {1}.csv".format(", ".join(missing),
+                                                                                          profilefile)))
+
+# validates the tables of a SimBench folder: "tables" is a dict table name -> SimBenchTables.Table, "profilenames" a
+# dict profile file -> column names (None if the file does not exist); returns a list of Issues
+def validate(tables, profilenames = None):
+    issues = []
+    for table in tables.values():
+        if len(table):
+            _checkUniqueIds(table, issues)
+    _checkNumbers(tables, issues)
+    _checkReferences(tables, issues)
+    _checkLineTypes(tables, issues)
+    _checkRequired(tables, issues)
+    _checkRanges(tables, issues)
+    _checkProfiles(tables, profilenames or {}, issues)
+    return issues
+
+def errors(issues):
+    return [issue for issue in issues if issue.severity == ERROR]
+
+def warnings(issues):
+    return [issue for issue in issues if issue.severity == WARNING]